@@ -5,12 +5,23 @@ import sqlite3
 import os
 from discord import ui, Interaction
 from assets.utils.helpers import mention_channel, mention_role, get_config_value
+from assets.utils.commandsync import sync_commands
+from assets.utils.memprofile import MemoryProfiler, structure_sizes, live_views, format_site, format_bytes
 
 DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "data.db")
 
+# Per-guild config lookups; assets/utils/queryplans.py checks the plans of these exact strings
+GET_PREFIX_SQL = "SELECT prefix FROM prefixes WHERE guild_id = ?"
+GET_WELCOME_SQL = "SELECT channel, message, autorole, image_url FROM welcome WHERE guild_id = ?"
+GET_MUTE_ROLE_SQL = "SELECT mute_role FROM mutes WHERE guild_id = ?"
+GET_LOG_CHANNEL_SQL = "SELECT log_channel FROM logs WHERE guild_id = ?"
+GET_ANNOUNCEMENT_CHANNEL_SQL = "SELECT announcement_channel FROM announcements WHERE guild_id = ?"
+GET_MODMAIL_CHANNEL_SQL = "SELECT modmail_channel FROM modmail WHERE guild_id = ?"
+
 class ConfigCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.profiler = MemoryProfiler()
 
     def update_table(self, table, column, value, guild_id):
         conn = sqlite3.connect(DB_PATH)
@@ -163,30 +174,30 @@ class ConfigCog(commands.Cog):
         cursor = conn.cursor()
 
         # Fetch all config values
-        cursor.execute("SELECT prefix FROM prefixes WHERE guild_id = ?", (guild_id,))
+        cursor.execute(GET_PREFIX_SQL, (guild_id,))
         result = cursor.fetchone()
         prefix = get_config_value(result[0] if result else None, "Not set")
 
-        cursor.execute("SELECT channel, message, autorole, image_url FROM welcome WHERE guild_id = ?", (guild_id,))
+        cursor.execute(GET_WELCOME_SQL, (guild_id,))
         welcome = cursor.fetchone()
         welcome_channel = mention_channel(welcome[0]) if welcome and welcome[0] else "Not set"
         welcome_message = f"`{welcome[1]}`" if welcome and welcome[1] else "`Not set`"
         autorole = mention_role(welcome[2]) if welcome and welcome[2] else "Not set"
         image_url = f"`{welcome[3]}`" if welcome and welcome[3] else "`Not set`"
 
-        cursor.execute("SELECT mute_role FROM mutes WHERE guild_id = ?", (guild_id,))
+        cursor.execute(GET_MUTE_ROLE_SQL, (guild_id,))
         mute_row = cursor.fetchone()
         mute_role = mention_role(mute_row[0]) if mute_row and mute_row[0] else "Not set"
 
-        cursor.execute("SELECT log_channel FROM logs WHERE guild_id = ?", (guild_id,))
+        cursor.execute(GET_LOG_CHANNEL_SQL, (guild_id,))
         log_row = cursor.fetchone()
         log_channel = mention_channel(log_row[0]) if log_row and log_row[0] else "Not set"
 
-        cursor.execute("SELECT announcement_channel FROM announcements WHERE guild_id = ?", (guild_id,))
+        cursor.execute(GET_ANNOUNCEMENT_CHANNEL_SQL, (guild_id,))
         announce_row = cursor.fetchone()
         announce_channel = mention_channel(announce_row[0]) if announce_row and announce_row[0] else "Not set"
 
-        cursor.execute("SELECT modmail_channel FROM modmail WHERE guild_id = ?", (guild_id,))
+        cursor.execute(GET_MODMAIL_CHANNEL_SQL, (guild_id,))
         modmail_row = cursor.fetchone()
         modmail_channel = mention_channel(modmail_row[0]) if modmail_row and modmail_row[0] else "Not set"
 
@@ -214,6 +225,149 @@ class ConfigCog(commands.Cog):
         else:
             await ctx.send(embed=embed)
 
+    @commands.hybrid_command(name="synccommands", description="Force a global slash command sync (bot owner only).")
+    @commands.is_owner()
+    async def sync_commands_cmd(self, ctx):
+        try:
+            synced, count, fingerprint = await sync_commands(self.bot, force=True)
+        except discord.HTTPException as e:
+            await self.send_embed(ctx, f"Failed to sync slash commands: `{e}`", color=discord.Color.red(), ephemeral=True)
+            return
+        await self.send_embed(ctx, f"Synced {count} slash commands (tree `{fingerprint[:12]}`).", ephemeral=True)
+
+    @commands.hybrid_command(name="shards", description="Show per-shard latency, guild counts and event rates (bot owner only).")
+    @commands.is_owner()
+    async def shards(self, ctx):
+        metrics = getattr(self.bot, "shard_metrics", None)
+        if metrics is None:
+            await self.send_embed(ctx, "Shard metrics are not enabled.", color=discord.Color.orange(), ephemeral=True)
+            return
+        embed = discord.Embed(
+            title=f"Shards {getattr(self.bot, 'shard_label', 'all')}",
+            description=f"{len(self.bot.guilds)} guilds in this process.",
+            color=discord.Color.blurple()
+        )
+        for shard_id, stats in metrics.report(self.bot)[:25]:
+            latency = f"{stats['latency_ms']:.0f} ms" if stats["latency_ms"] is not None else "n/a"
+            embed.add_field(
+                name=f"Shard {shard_id}",
+                value=(
+                    f"Latency: `{latency}`\n"
+                    f"Guilds: `{stats['guilds']}`\n"
+                    f"Events: `{stats['events_per_min']:.1f}/min` ({stats['events_total']} total)\n"
+                    f"Connects/Disconnects/Resumes: `{stats['connects']}/{stats['disconnects']}/{stats['resumes']}`"
+                ),
+                inline=True
+            )
+        embed.set_footer(text=f"{datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        await ctx.send(embed=embed, ephemeral=True if hasattr(ctx, "interaction") and ctx.interaction else False)
+
+    @commands.hybrid_command(name="reapers", description="Show idle lobby, game and battle reaper stats (bot owner only).")
+    @commands.is_owner()
+    async def reapers(self, ctx):
+        reapers = []
+        for cog_name in ("MTGCog", "YGOCog"):
+            cog = self.bot.get_cog(cog_name)
+            if cog:
+                reapers.append((f"{cog_name} games", cog.sessions.reaper))
+        rpg = self.bot.get_cog("RPGCog")
+        if rpg:
+            reapers.append(("RPGCog battles", rpg.battles.battle_reaper))
+            reapers.append(("RPGCog player states", rpg.battles.player_reaper))
+        embed = discord.Embed(title="Idle Reapers", color=discord.Color.blurple())
+        now = datetime.datetime.now().timestamp()
+        for label, reaper in reapers:
+            stats = reaper.stats()
+            next_in = f"{max(0, stats['next_deadline'] - now) / 60:.1f} min" if stats["next_deadline"] else "n/a"
+            embed.add_field(
+                name=label,
+                value=(
+                    f"Tracked: `{stats['tracked']}` (heap `{stats['heap']}`)\n"
+                    f"Expired: `{stats['expired']}`, deferred: `{stats['deferred']}`\n"
+                    f"Next deadline: `{next_in}`"
+                ),
+                inline=True
+            )
+        if not reapers:
+            embed.description = "No reapers are running."
+        embed.set_footer(text=f"{datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        await ctx.send(embed=embed, ephemeral=True if hasattr(ctx, "interaction") and ctx.interaction else False)
+
+    @commands.hybrid_group(name="memprofile", description="tracemalloc memory diagnostics (bot owner only).", invoke_without_command=True)
+    @commands.is_owner()
+    async def memprofile(self, ctx):
+        state = "tracing" if self.profiler.tracing else "not tracing"
+        embed = discord.Embed(
+            title="Memory Profiler",
+            description=f"Currently **{state}**. Use the subcommands below.",
+            color=discord.Color.blurple()
+        )
+        embed.add_field(name="start", value="Start tracemalloc (adds allocation overhead until stopped).", inline=False)
+        embed.add_field(name="snapshot", value="Top allocation sites, growth since the last snapshot and cog structure sizes.", inline=False)
+        embed.add_field(name="dump", value="Write the latest snapshot to a file for offline analysis.", inline=False)
+        embed.add_field(name="stop", value="Stop tracemalloc.", inline=False)
+        await ctx.send(embed=embed, ephemeral=True if hasattr(ctx, "interaction") and ctx.interaction else False)
+
+    @memprofile.command(name="start", description="Start tracemalloc tracing.")
+    @commands.is_owner()
+    async def memprofile_start(self, ctx):
+        self.profiler.start()
+        await self.send_embed(ctx, f"tracemalloc started ({self.profiler.frames} frames per trace).", ephemeral=True)
+
+    @memprofile.command(name="stop", description="Stop tracemalloc tracing.")
+    @commands.is_owner()
+    async def memprofile_stop(self, ctx):
+        self.profiler.stop()
+        await self.send_embed(ctx, "tracemalloc stopped.", ephemeral=True)
+
+    @memprofile.command(name="snapshot", description="Show top allocation sites, the diff since the last snapshot and cog structure sizes.")
+    @commands.is_owner()
+    async def memprofile_snapshot(self, ctx):
+        embed = discord.Embed(title="Memory Snapshot", color=discord.Color.blurple())
+        if self.profiler.tracing:
+            snapshot, previous = self.profiler.take()
+            top = self.profiler.top(snapshot)
+            embed.add_field(
+                name="Top allocation sites",
+                value="\n".join(f"`{format_site(s)}` {format_bytes(s.size)} ({s.count} blocks)" for s in top) or "None",
+                inline=False
+            )
+            diff = self.profiler.diff(snapshot, previous)
+            embed.add_field(
+                name="Growth since last snapshot",
+                value="\n".join(f"`{format_site(s)}` {format_bytes(s.size_diff)} ({s.count_diff:+} blocks)" for s in diff)
+                if previous else "First snapshot; run again to see a diff.",
+                inline=False
+            )
+        else:
+            embed.description = "tracemalloc is not running; use `/memprofile start` for allocation sites."
+        sizes = structure_sizes(self.bot)
+        rpg = self.bot.get_cog("RPGCog")
+        evicted = rpg.battles.evicted if rpg else {"battles": 0, "players": 0}
+        embed.add_field(
+            name="Cog structures",
+            value="\n".join(f"`{label}` {count} entries, {format_bytes(size)}" for label, count, size in sizes)
+            + f"\nEvicted idle battles: {evicted['battles']}, player states: {evicted['players']}",
+            inline=False
+        )
+        views = live_views()
+        embed.add_field(
+            name="Live views",
+            value="\n".join(f"`{name}` {count}" for name, count in sorted(views.items())) or "None",
+            inline=False
+        )
+        embed.set_footer(text=f"{datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        await ctx.send(embed=embed, ephemeral=True if hasattr(ctx, "interaction") and ctx.interaction else False)
+
+    @memprofile.command(name="dump", description="Write the latest tracemalloc snapshot to a file.")
+    @commands.is_owner()
+    async def memprofile_dump(self, ctx):
+        if not self.profiler.tracing:
+            await self.send_embed(ctx, "tracemalloc is not running; use `/memprofile start` first.", color=discord.Color.orange(), ephemeral=True)
+            return
+        path = self.profiler.dump()
+        await self.send_embed(ctx, f"Snapshot written to `{path}`.", ephemeral=True)
+
     @commands.Cog.listener()
     async def on_command_error(self, ctx, error):
         # Ignore errors already handled by local error handlers
@@ -5,7 +5,12 @@ import os
 import random
 import asyncio
 import datetime
+import time
+import heapq
 from discord import ui
+from assets.utils.gamedata import GAME_DATA
+from assets.utils.nameindex import NameIndex, INVENTORIES, did_you_mean
+from assets.utils.gateway import guild_members_among, ensure_small_guild_chunked, ensure_guild_chunked
 
 DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "data.db")
 
@@ -15,11 +20,48 @@ STEAL_SUCCESS_CHANCE = 0.6    # 60% chance to succeed
 STEAL_BAIL_COST = 200         # Coins lost if caught
 WORK_COOLDOWN = 60  # seconds
 
+# Slots: more symbols reduce win odds
+SLOTS_SYMBOLS = ["🍒", "🍋", "🍉", "⭐", "💎", "🍀", "🍇"]
+SLOTS_JACKPOT_MULTIPLIER = 10
+SLOTS_PAIR_MULTIPLIER = 2
+SLOTS_JACKPOT_LOOTBOX_CHANCE = 0.15  # 15% chance to win a lootbox on jackpot
+SLOTS_PAIR_LOOTBOX_CHANCE = 0.05     # 5% chance to win a lootbox on small win
+SLOTS_MAX_SPINS = 50
+SLOTS_SUMMARY_ROWS = 10  # Reel rows shown in an auto-spin summary
+LEADERBOARD_BATCH = 100  # Richest players checked for guild membership per step
+LEADERBOARD_SCAN_LIMIT = 5000  # Richest players checked against a cached member list before falling back
+LEADERBOARD_GATEWAY_SCAN_LIMIT = 500  # The same when each batch needs a gateway member request
+LEADERBOARD_MEMBER_BATCH = 500  # Member ids per eco_players lookup in the fallback
+SHOP_PAGE_SIZE = 6
+SHOP_CACHE_TTL = 60  # seconds a loaded shop is trusted (other shard processes may change the same guild's shop)
+SHOP_RARITY_ORDER = {"common": 0, "uncommon": 1, "rare": 2, "epic": 3, "legendary": 4}
+
+# Statements on the hot paths; assets/utils/queryplans.py checks the plans of these exact strings
+GET_PLAYER_SQL = "SELECT coins, bank, inventory, daily_streak, last_daily FROM eco_players WHERE user_id = ?"
+UPDATE_PLAYER_SQL = {
+    column: f"UPDATE eco_players SET {column} = ? WHERE user_id = ?"
+    for column in ("coins", "bank", "inventory", "daily_streak", "last_daily", "luck_expiry")
+}
+ADD_PLAYER_SQL = "INSERT OR IGNORE INTO eco_players (user_id, coins, bank, inventory) VALUES (?, 0, 0, '')"
+GET_SHOP_ITEMS_SQL = "SELECT item_name, command_name, price, description, rarity, item_type FROM eco_shop WHERE guild_id = ?"
+GET_SHOP_ITEM_SQL = "SELECT item_name, price, description, effect, rarity, item_type FROM eco_shop WHERE guild_id = ? AND item_name = ?"
+GET_SHOP_ITEM_BY_COMMAND_SQL = "SELECT item_name, command_name, price, description, effect, rarity, item_type FROM eco_shop WHERE guild_id = ? AND command_name = ?"
+GET_SHOP_ITEM_ANY_SQL = "SELECT item_name, price, description, effect, rarity, item_type FROM eco_shop WHERE item_name = ?"
+ADD_SHOP_ITEM_SQL = "INSERT INTO eco_shop (guild_id, item_name, command_name, price, description, effect, rarity, item_type) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+REMOVE_SHOP_ITEM_SQL = "DELETE FROM eco_shop WHERE guild_id = ? AND command_name = ?"
+UPDATE_SHOP_PRICE_SQL = "UPDATE eco_shop SET price = ? WHERE guild_id = ? AND command_name = ?"
+# Prefix range instead of LIKE so the (guild_id, effect) index is used; ';' sorts right after ':'
+GET_COLLECTIBLES_SQL = "SELECT item_name, rarity FROM eco_shop WHERE guild_id = ? AND effect >= 'collectible:' AND effect < 'collectible;'"
+GET_RICHEST_PLAYERS_SQL = "SELECT user_id, coins, bank FROM eco_players ORDER BY (coins + bank) DESC LIMIT ? OFFSET ?"
+GET_LUCK_EXPIRY_SQL = "SELECT luck_expiry FROM eco_players WHERE user_id = ?"
+GET_COOLDOWN_SQL = "SELECT last_used FROM eco_cooldowns WHERE user_id = ? AND command = ?"
+SET_COOLDOWN_SQL = "INSERT OR REPLACE INTO eco_cooldowns (user_id, command, last_used) VALUES (?, ?, ?)"
+
 
 def get_player(user_id):
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
-    cursor.execute("SELECT coins, bank, inventory, daily_streak, last_daily FROM eco_players WHERE user_id = ?", (str(user_id),))
+    cursor.execute(GET_PLAYER_SQL, (str(user_id),))
     result = cursor.fetchone()
     conn.close()
     return result
@@ -28,29 +70,30 @@ def update_player(user_id, coins=None, bank=None, inventory=None, daily_streak=N
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
     if coins is not None:
-        cursor.execute("UPDATE eco_players SET coins = ? WHERE user_id = ?", (coins, str(user_id)))
+        cursor.execute(UPDATE_PLAYER_SQL["coins"], (coins, str(user_id)))
     if bank is not None:
-        cursor.execute("UPDATE eco_players SET bank = ? WHERE user_id = ?", (bank, str(user_id)))
+        cursor.execute(UPDATE_PLAYER_SQL["bank"], (bank, str(user_id)))
     if inventory is not None:
-        cursor.execute("UPDATE eco_players SET inventory = ? WHERE user_id = ?", (inventory, str(user_id)))
+        cursor.execute(UPDATE_PLAYER_SQL["inventory"], (inventory, str(user_id)))
+        INVENTORIES.invalidate(int(user_id))
     if daily_streak is not None:
-        cursor.execute("UPDATE eco_players SET daily_streak = ? WHERE user_id = ?", (daily_streak, str(user_id)))
+        cursor.execute(UPDATE_PLAYER_SQL["daily_streak"], (daily_streak, str(user_id)))
     if last_daily is not None:
-        cursor.execute("UPDATE eco_players SET last_daily = ? WHERE user_id = ?", (last_daily, str(user_id)))
+        cursor.execute(UPDATE_PLAYER_SQL["last_daily"], (last_daily, str(user_id)))
     conn.commit()
     conn.close()
 
 def add_player_if_not_exists(user_id):
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
-    cursor.execute("INSERT OR IGNORE INTO eco_players (user_id, coins, bank, inventory) VALUES (?, 0, 0, '')", (str(user_id),))
+    cursor.execute(ADD_PLAYER_SQL, (str(user_id),))
     conn.commit()
     conn.close()
 
 def get_shop_items(guild_id):
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
-    cursor.execute("SELECT item_name, command_name, price, description, rarity, item_type FROM eco_shop WHERE guild_id = ?", (str(guild_id),))
+    cursor.execute(GET_SHOP_ITEMS_SQL, (str(guild_id),))
     items = cursor.fetchall()
     conn.close()
     return items
@@ -58,7 +101,7 @@ def get_shop_items(guild_id):
 def get_shop_item(guild_id, item_name):
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
-    cursor.execute("SELECT item_name, price, description, effect, rarity, item_type FROM eco_shop WHERE item_name = ?", (item_name,))
+    cursor.execute(GET_SHOP_ITEM_SQL, (str(guild_id), item_name))
     item = cursor.fetchone()
     conn.close()
     return item
@@ -66,7 +109,7 @@ def get_shop_item(guild_id, item_name):
 def get_shop_item_by_command(guild_id, command_name):
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
-    cursor.execute("SELECT item_name, command_name, price, description, effect, rarity, item_type FROM eco_shop WHERE guild_id = ? AND command_name = ?", (str(guild_id), command_name))
+    cursor.execute(GET_SHOP_ITEM_BY_COMMAND_SQL, (str(guild_id), command_name))
     item = cursor.fetchone()
     conn.close()
     return item
@@ -74,7 +117,7 @@ def get_shop_item_by_command(guild_id, command_name):
 def get_shop_item_any(item_name):
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
-    cursor.execute("SELECT item_name, price, description, effect, rarity, item_type FROM eco_shop WHERE item_name = ?", (item_name,))
+    cursor.execute(GET_SHOP_ITEM_ANY_SQL, (item_name,))
     item = cursor.fetchone()
     conn.close()
     return item
@@ -83,7 +126,7 @@ def add_shop_item(guild_id, item_name, command_name, price, description, effect=
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
     cursor.execute(
-        "INSERT INTO eco_shop (guild_id, item_name, command_name, price, description, effect, rarity, item_type) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        ADD_SHOP_ITEM_SQL,
         (str(guild_id), item_name, command_name, price, description, effect, rarity, item_type)
     )
     conn.commit()
@@ -92,14 +135,14 @@ def add_shop_item(guild_id, item_name, command_name, price, description, effect=
 def remove_shop_item(guild_id, command_name):
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
-    cursor.execute("DELETE FROM eco_shop WHERE guild_id = ? AND command_name = ?", (str(guild_id), command_name))
+    cursor.execute(REMOVE_SHOP_ITEM_SQL, (str(guild_id), command_name))
     conn.commit()
     conn.close()
 
 def get_all_collectibles(guild_id):
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
-    cursor.execute("SELECT item_name, rarity FROM eco_shop WHERE guild_id = ? AND effect LIKE 'collectible:%'", (str(guild_id),))
+    cursor.execute(GET_COLLECTIBLES_SQL, (str(guild_id),))
     items = cursor.fetchall()
     conn.close()
     return items
@@ -114,10 +157,43 @@ def get_rarity_odds():
         "legendary": 0.03
     }
 
+def inventory_choices(user_id, current, keep=None):
+    """Autocomplete choices from the caller's cached inventory, labelled with how many they own."""
+    inventory = INVENTORIES.get(user_id, lambda uid: (get_player(uid) or (0, 0, ""))[2])
+    names = [name for name in inventory.index.complete(current, limit=None) if keep is None or keep(name)]
+    return [
+        discord.app_commands.Choice(name=f"{name} (x{inventory.counts[name]})"[:100], value=name[:100])
+        for name in names[:25]
+    ]
+
+def get_richest_players(limit, offset=0):
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute(GET_RICHEST_PLAYERS_SQL, (limit, offset))
+    result = cursor.fetchall()
+    conn.close()
+    return result
+
+def players_among_sql(count):
+    return f"SELECT user_id, coins, bank FROM eco_players WHERE user_id IN ({', '.join('?' for _ in range(count))})"
+
+def get_richest_among(user_ids, limit):
+    """The `limit` richest players among `user_ids`, looked up by primary key in batches and ranked here."""
+    user_ids = [str(uid) for uid in user_ids]
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    rows = []
+    for start in range(0, len(user_ids), LEADERBOARD_MEMBER_BATCH):
+        batch = user_ids[start:start + LEADERBOARD_MEMBER_BATCH]
+        cursor.execute(players_among_sql(len(batch)), batch)
+        rows = heapq.nlargest(limit, rows + cursor.fetchall(), key=lambda row: row[1] + row[2])
+    conn.close()
+    return rows
+
 def get_luck_expiry(user_id):
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
-    cursor.execute("SELECT luck_expiry FROM eco_players WHERE user_id = ?", (str(user_id),))
+    cursor.execute(GET_LUCK_EXPIRY_SQL, (str(user_id),))
     row = cursor.fetchone()
     conn.close()
     if row and row[0]:
@@ -130,14 +206,14 @@ def get_luck_expiry(user_id):
 def set_luck_expiry(user_id, expiry: datetime.datetime):
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
-    cursor.execute("UPDATE eco_players SET luck_expiry = ? WHERE user_id = ?", (expiry.isoformat(), str(user_id)))
+    cursor.execute(UPDATE_PLAYER_SQL["luck_expiry"], (expiry.isoformat(), str(user_id)))
     conn.commit()
     conn.close()
 
 def get_cooldown(user_id, command):
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
-    cursor.execute("SELECT last_used FROM eco_cooldowns WHERE user_id = ? AND command = ?", (str(user_id), command))
+    cursor.execute(GET_COOLDOWN_SQL, (str(user_id), command))
     row = cursor.fetchone()
     conn.close()
     if row and row[0]:
@@ -150,125 +226,210 @@ def get_cooldown(user_id, command):
 def set_cooldown(user_id, command, last_used: datetime.datetime):
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
-    cursor.execute(
-        "INSERT OR REPLACE INTO eco_cooldowns (user_id, command, last_used) VALUES (?, ?, ?)",
-        (str(user_id), command, last_used.isoformat())
+    cursor.execute(SET_COOLDOWN_SQL, (str(user_id), command, last_used.isoformat()))
+    conn.commit()
+    conn.close()
+
+def set_cooldowns(user_ids, command, last_used: datetime.datetime):
+    """Set the same cooldown for many users in one transaction."""
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    cursor.executemany(
+        SET_COOLDOWN_SQL,
+        [(str(user_id), command, last_used.isoformat()) for user_id in user_ids]
     )
     conn.commit()
     conn.close()
 
-class ShopPageView(ui.View):
-    def __init__(self, ctx, items, page=0, items_per_page=6):
-        super().__init__(timeout=60)
-        self.ctx = ctx
-        self.items = items
+def spin_slots(spins):
+    """Draw all reels for ``spins`` spins in a single batch."""
+    reels = random.choices(SLOTS_SYMBOLS, k=3 * spins)
+    return [reels[i:i + 3] for i in range(0, len(reels), 3)]
+
+def score_slots_spin(result, bet):
+    """Return (kind, net payout, lootbox won) for one spin."""
+    if result[0] == result[1] == result[2]:
+        return "jackpot", bet * SLOTS_JACKPOT_MULTIPLIER, random.random() < SLOTS_JACKPOT_LOOTBOX_CHANCE
+    if result[0] == result[1] or result[1] == result[2] or result[0] == result[2]:
+        return "pair", bet * SLOTS_PAIR_MULTIPLIER, random.random() < SLOTS_PAIR_LOOTBOX_CHANCE
+    return "loss", -bet, False
+
+def get_slots_ev_table(symbols=SLOTS_SYMBOLS):
+    """Exact odds and expected value per coin bet for three independent reels."""
+    n = len(symbols)
+    jackpot = 1 / n ** 2
+    pair = 3 * (n - 1) / n ** 2
+    loss = (n - 1) * (n - 2) / n ** 2
+    return {
+        "jackpot": {"chance": jackpot, "multiplier": SLOTS_JACKPOT_MULTIPLIER, "lootbox_chance": SLOTS_JACKPOT_LOOTBOX_CHANCE},
+        "pair": {"chance": pair, "multiplier": SLOTS_PAIR_MULTIPLIER, "lootbox_chance": SLOTS_PAIR_LOOTBOX_CHANCE},
+        "loss": {"chance": loss, "multiplier": -1, "lootbox_chance": 0.0},
+        "ev": jackpot * SLOTS_JACKPOT_MULTIPLIER + pair * SLOTS_PAIR_MULTIPLIER - loss,
+        "lootboxes_per_spin": jackpot * SLOTS_JACKPOT_LOOTBOX_CHANCE + pair * SLOTS_PAIR_LOOTBOX_CHANCE
+    }
+
+SLOTS_EV_TABLE = get_slots_ev_table()
+
+def sort_shop_items(items):
+    # By rarity, then price
+    return sorted(items, key=lambda x: (SHOP_RARITY_ORDER.get((x[4] or "").lower(), 99), x[2]))
+
+def add_shop_item_field(embed, item):
+    name, cmd, price, desc, rarity, item_type = item
+    meta = []
+    if item_type:
+        meta.append(f"Type: {item_type.capitalize()}")
+    if rarity:
+        meta.append(f"Rarity: {rarity.capitalize()}")
+    meta_str = " | ".join(meta)
+    embed.add_field(
+        name=f"{name} (`{cmd}`) - {price} coins",
+        value=f"{desc}\n{meta_str}" if meta_str else desc,
+        inline=False
+    )
+
+def shop_page(items, page):
+    """Render one page of the sorted shop; returns (embed, page, max_page) with `page` clamped."""
+    max_page = max(0, (len(items) - 1) // SHOP_PAGE_SIZE)
+    page = min(max(page, 0), max_page)
+    embed = discord.Embed(
+        title=f"Shop (Page {page + 1}/{max_page + 1})",
+        description="Use `/shop buy <command_name>` or `/shop sell <command_name>` to buy/sell.",
+        color=discord.Color.blurple()
+    )
+    for item in items[page * SHOP_PAGE_SIZE:(page + 1) * SHOP_PAGE_SIZE]:
+        add_shop_item_field(embed, item)
+    return embed, page, max_page
+
+def shop_categories(items):
+    """({category: items}, sorted categories); items without a type are filed under "misc"."""
+    items_by_cat = {}
+    for item in items:
+        items_by_cat.setdefault((item[5] or "misc").lower(), []).append(item)
+    return items_by_cat, sorted(items_by_cat)
+
+def shop_category_page(items, mode, page):
+    """Render the category overview ("main") or one category; returns (embed, page, max_page)."""
+    items_by_cat, categories = shop_categories(items)
+    max_page = max(0, len(categories) - 1)
+    page = min(max(page, 0), max_page)
+    if mode == "main" or not categories:
+        embed = discord.Embed(title="Shop", color=discord.Color.blurple())
+        embed.description = "Select a category below to view items. Use `/shop buy <command_name>` or `/shop sell <command_name>` to buy/sell."
+        for idx, cat in enumerate(categories):
+            # Display "Collectibles" for "collectible", otherwise capitalize
+            display_name = "Collectibles" if cat == "collectible" else cat.capitalize()
+            embed.add_field(name=display_name, value=f"Page {idx+1}", inline=False)
+    else:
+        cat = categories[page]
+        embed = discord.Embed(title=f"Shop - {cat.capitalize()}", color=discord.Color.blurple())
+        for item in items_by_cat[cat]:
+            add_shop_item_field(embed, item)
+    return embed, page, max_page
+
+
+# Shop views are persistent: every button carries its target page in its custom_id and is
+# registered once in EcoCog.cog_load, so pages render on demand from the cog's shop cache,
+# messages hold no per-view state and the buttons keep working across restarts.
+class ShopPageButton(ui.DynamicItem[ui.Button], template=r"shop:page:(?P<direction>prev|next):(?P<page>\d+)"):
+    def __init__(self, direction, page, disabled=False):
+        super().__init__(ui.Button(
+            label="Previous" if direction == "prev" else "Next",
+            style=discord.ButtonStyle.secondary,
+            custom_id=f"shop:page:{direction}:{page}",
+            disabled=disabled
+        ))
         self.page = page
-        self.items_per_page = items_per_page
-        self.max_page = max(0, (len(items) - 1) // items_per_page)
 
-    async def update_message(self, interaction):
-        embed = discord.Embed(
-            title=f"Shop (Page {self.page + 1}/{self.max_page + 1})",
-            description="Use `/shop buy <command_name>` or `/shop sell <command_name>` to buy/sell.",
-            color=discord.Color.blurple()
-        )
-        start = self.page * self.items_per_page
-        end = start + self.items_per_page
-        for name, cmd, price, desc, rarity, item_type in self.items[start:end]:
-            meta = []
-            if item_type:
-                meta.append(f"Type: {item_type.capitalize()}")
-            if rarity:
-                meta.append(f"Rarity: {rarity.capitalize()}")
-            meta_str = " | ".join(meta)
-            embed.add_field(
-                name=f"{name} (`{cmd}`) - {price} coins",
-                value=f"{desc}\n{meta_str}" if meta_str else desc,
-                inline=False
-            )
-        self.children[0].disabled = self.page == 0
-        self.children[1].disabled = self.page == self.max_page
-        await interaction.response.edit_message(embed=embed, view=self)
-
-    @ui.button(label="Previous", style=discord.ButtonStyle.secondary)
-    async def previous(self, interaction: discord.Interaction, button: ui.Button):
-        if self.page > 0:
-            self.page -= 1
-        await self.update_message(interaction)
-
-    @ui.button(label="Next", style=discord.ButtonStyle.secondary)
-    async def next(self, interaction: discord.Interaction, button: ui.Button):
-        if self.page < self.max_page:
-            self.page += 1
-        await self.update_message(interaction)
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        return cls(match["direction"], int(match["page"]))
 
-class ShopCategoryView(ui.View):
-    def __init__(self, ctx, categories, items_by_cat, page=0, mode="main"):
-        super().__init__(timeout=60)
-        self.ctx = ctx
-        self.categories = categories
-        self.items_by_cat = items_by_cat
+    async def callback(self, interaction: discord.Interaction):
+        items = interaction.client.get_cog("EcoCog").sorted_shop(interaction.guild_id)
+        embed, page, max_page = shop_page(items, self.page)
+        await interaction.response.edit_message(embed=embed, view=ShopPageView(page, max_page))
+
+class ShopPageView(ui.View):
+    def __init__(self, page, max_page):
+        super().__init__(timeout=None)
+        self.add_item(ShopPageButton("prev", max(page - 1, 0), disabled=page == 0))
+        self.add_item(ShopPageButton("next", min(page + 1, max_page), disabled=page == max_page))
+
+class ShopCategoryButton(ui.DynamicItem[ui.Button], template=r"shop:cat:(?P<action>prev|next|main):(?P<page>\d+)"):
+    def __init__(self, action, page, disabled=False):
+        super().__init__(ui.Button(
+            label=action.capitalize() if action != "prev" else "Previous",
+            style=discord.ButtonStyle.primary if action == "main" else discord.ButtonStyle.secondary,
+            custom_id=f"shop:cat:{action}:{page}",
+            disabled=disabled
+        ))
+        self.action = action
         self.page = page
-        self.mode = mode
-        self.max_page = len(categories) - 1
 
-    async def update_message(self, interaction):
-        embed = discord.Embed(
-            title="Shop" if self.mode == "main" else f"Shop - {self.categories[self.page].capitalize()}",
-            color=discord.Color.blurple()
-        )
-        if self.mode == "main":
-            embed.description = "Select a category below to view items. Use `/shop buy <command_name>` or `/shop sell <command_name>` to buy/sell."
-            for idx, cat in enumerate(self.categories):
-                # Display "Collectibles" for "collectible", otherwise capitalize
-                display_name = "Collectibles" if cat == "collectible" else cat.capitalize()
-                embed.add_field(name=display_name, value=f"Page {idx+1}", inline=False)
-            # Do NOT disable navigation buttons on main page
-            self.children[0].disabled = False  # Previous
-            self.children[1].disabled = False  # Next
-        else:
-            cat = self.categories[self.page]
-            items = self.items_by_cat[cat]
-            for name, cmd, price, desc, rarity, item_type in items:
-                meta = []
-                if item_type:
-                    meta.append(f"Type: {item_type.capitalize()}")
-                if rarity:
-                    meta.append(f"Rarity: {rarity.capitalize()}")
-                meta_str = " | ".join(meta)
-                embed.add_field(
-                    name=f"{name} (`{cmd}`) - {price} coins",
-                    value=f"{desc}\n{meta_str}" if meta_str else desc,
-                    inline=False
-                )
-            self.children[0].disabled = self.page == 0
-            self.children[1].disabled = self.page == self.max_page
-        await interaction.response.edit_message(embed=embed, view=self)
-
-    @ui.button(label="Previous", style=discord.ButtonStyle.secondary)
-    async def previous(self, interaction: discord.Interaction, button: ui.Button):
-        if self.page > 0:
-            self.page -= 1
-        self.mode = "category"
-        await self.update_message(interaction)
-
-    @ui.button(label="Next", style=discord.ButtonStyle.secondary)
-    async def next(self, interaction: discord.Interaction, button: ui.Button):
-        if self.page < self.max_page:
-            self.page += 1
-        self.mode = "category"
-        await self.update_message(interaction)
-
-    @ui.button(label="Main", style=discord.ButtonStyle.primary)
-    async def main(self, interaction: discord.Interaction, button: ui.Button):
-        self.mode = "main"
-        await self.update_message(interaction)
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        return cls(match["action"], int(match["page"]))
+
+    async def callback(self, interaction: discord.Interaction):
+        mode = "main" if self.action == "main" else "category"
+        items = interaction.client.get_cog("EcoCog").sorted_shop(interaction.guild_id)
+        embed, page, max_page = shop_category_page(items, mode, self.page)
+        await interaction.response.edit_message(embed=embed, view=ShopCategoryView(page, max_page, mode))
+
+class ShopCategoryView(ui.View):
+    def __init__(self, page, max_page, mode="main"):
+        super().__init__(timeout=None)
+        # Navigation stays enabled on the main page; "Main" remembers the category it came from
+        on_main = mode == "main"
+        self.add_item(ShopCategoryButton("prev", max(page - 1, 0), disabled=not on_main and page == 0))
+        self.add_item(ShopCategoryButton("next", min(page + 1, max_page), disabled=not on_main and page == max_page))
+        self.add_item(ShopCategoryButton("main", page))
 
 class EcoCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.shop_indexes = {}  # {guild_id: ({command_name: shop row}, NameIndex of command and item names, expires)}
         self.work_cooldowns = {}
 
+    async def cog_load(self):
+        # Buttons on shop messages sent before a restart are routed here by custom_id
+        self.bot.add_dynamic_items(ShopPageButton, ShopCategoryButton)
+
+    async def cog_unload(self):
+        self.bot.remove_dynamic_items(ShopPageButton, ShopCategoryButton)
+
+    def shop_index(self, guild_id):
+        """
+        The guild's shop rows by command name and a NameIndex resolving command or item names to command names.
+        Shopadmin changes made in this process update the loaded index; it is reloaded after SHOP_CACHE_TTL
+        seconds so changes made by other shard processes show up too. Purchases and sales always read the row itself.
+        """
+        cached = self.shop_indexes.get(guild_id)
+        if cached is None or cached[2] <= time.time():
+            items = get_shop_items(guild_id)
+            by_command = {item[1]: item for item in items}
+            entries = [(cmd, cmd) for cmd in by_command] + [(item[0], item[1]) for item in items]
+            cached = self.shop_indexes[guild_id] = (by_command, NameIndex(entries), time.time() + SHOP_CACHE_TTL)
+        return cached[:2]
+
+    def sorted_shop(self, guild_id):
+        return sort_shop_items(self.shop_index(guild_id)[0].values())
+
+    def update_shop(self, guild_id, command_name, row=None):
+        """Keep a loaded shop index in step with a shopadmin change; `row` is None when the item was removed."""
+        if guild_id not in self.shop_indexes:
+            return
+        by_command, index, _ = self.shop_indexes[guild_id]
+        old = by_command.pop(command_name, None)
+        if row is None or old is None or old[0] != row[0]:
+            index.discard(command_name)
+            if row is not None:
+                index.add(command_name, command_name)
+                index.add(row[0], command_name)
+        if row is not None:
+            by_command[command_name] = row
+
     @commands.hybrid_command(name="balance", description="Check your coin and bank balance.")
     async def balance(self, ctx, member: discord.Member = None):
         member = member or ctx.author
@@ -511,65 +672,119 @@ class EcoCog(commands.Cog):
         return  # <--- Always return to prevent propagation
 
     @commands.hybrid_command(name="slots", description="Play the slot machine for a chance to win coins!")
-    async def slots(self, ctx, bet: int):
+    @discord.app_commands.describe(
+        bet="Coins to bet on each spin.",
+        spins=f"Number of spins to play in one go (1-{SLOTS_MAX_SPINS}, default 1)."
+    )
+    async def slots(self, ctx, bet: int, spins: int = 1):
         add_player_if_not_exists(ctx.author.id)
         coins, bank, inv, *_ = get_player(ctx.author.id)
         if bet <= 0:
             await ctx.send("Bet must be greater than 0.")
             return
-        if coins < bet:
-            await ctx.send("You don't have enough coins to bet that amount.")
+        if spins < 1 or spins > SLOTS_MAX_SPINS:
+            await ctx.send(f"Spins must be between 1 and {SLOTS_MAX_SPINS}.")
+            return
+        if coins < bet * spins:
+            if spins == 1:
+                await ctx.send("You don't have enough coins to bet that amount.")
+            else:
+                await ctx.send(f"You need {bet * spins} coins to cover {spins} spins of {bet}.")
             return
 
-        # Add more emojis to reduce win odds
-        symbols = ["🍒", "🍋", "🍉", "⭐", "💎", "🍀", "🍇"]
-        result = [random.choice(symbols) for _ in range(3)]
-        win = False
-        payout = 0
-        lootbox_won = False
-
-        if result[0] == result[1] == result[2]:
-            # Jackpot!
-            payout = bet * 10
-            win = True
-            # 15% chance to win a lootbox on jackpot
-            if random.random() < 0.15:
-                lootbox_won = True
-        elif result[0] == result[1] or result[1] == result[2] or result[0] == result[2]:
-            # Small win
-            payout = bet * 2
-            win = True
-            # 5% chance to win a lootbox on small win
-            if random.random() < 0.05:
-                lootbox_won = True
-        else:
-            payout = -bet
+        # Draw every reel for every spin in one batch, then settle once
+        results = spin_slots(spins)
+        net = 0
+        lootboxes = 0
+        tally = {"jackpot": 0, "pair": 0, "loss": 0}
+        for result in results:
+            kind, payout, lootbox_won = score_slots_spin(result, bet)
+            tally[kind] += 1
+            net += payout
+            if lootbox_won:
+                lootboxes += 1
 
-        coins += payout
-        # Add lootbox to inventory if won
-        if lootbox_won:
+        coins += net
+        # Add lootboxes to inventory if won
+        if lootboxes:
             items = inv.split(",") if inv else []
-            items.append("Lootbox")
+            items.extend(["Lootbox"] * lootboxes)
             new_inv = ",".join(items)
             update_player(ctx.author.id, coins=coins, inventory=new_inv)
         else:
             update_player(ctx.author.id, coins=coins)
 
+        if spins == 1:
+            result = results[0]
+            win = tally["loss"] == 0
+            embed = discord.Embed(
+                title="Slots",
+                description=f"{' '.join(result)}",
+                color=discord.Color.gold() if win else discord.Color.red()
+            )
+            if win:
+                msg = f"You won {net} coins!" if net > 0 else "You broke even!"
+                if lootboxes:
+                    msg += "\n🎁 **BONUS! You also won a Lootbox!**"
+                embed.add_field(name="Result", value=msg, inline=False)
+            else:
+                embed.add_field(name="Result", value=f"You lost {bet} coins.", inline=False)
+            embed.add_field(name="Balance", value=f"💰 {coins} coins", inline=False)
+            await ctx.send(embed=embed)
+            return
+
+        # Aggregated summary for auto-spin
+        shown = results[:SLOTS_SUMMARY_ROWS]
+        reels = "\n".join(" ".join(result) for result in shown)
+        if len(results) > len(shown):
+            reels += f"\n... and {len(results) - len(shown)} more spins"
         embed = discord.Embed(
-            title="Slots",
-            description=f"{' '.join(result)}",
-            color=discord.Color.gold() if win else discord.Color.red()
+            title=f"Slots x{spins}",
+            description=reels,
+            color=discord.Color.gold() if net > 0 else discord.Color.red()
         )
-        if win:
-            msg = f"You won {payout} coins!" if payout > 0 else "You broke even!"
-            if lootbox_won:
-                msg += "\n🎁 **BONUS! You also won a Lootbox!**"
-            embed.add_field(name="Result", value=msg, inline=False)
+        embed.add_field(
+            name="Spins",
+            value=f"🎰 Jackpots: **{tally['jackpot']}**\n✨ Pairs: **{tally['pair']}**\n💨 Losses: **{tally['loss']}**",
+            inline=False
+        )
+        if net > 0:
+            msg = f"You won {net} coins over {spins} spins!"
+        elif net < 0:
+            msg = f"You lost {-net} coins over {spins} spins."
         else:
-            embed.add_field(name="Result", value=f"You lost {bet} coins.", inline=False)
+            msg = f"You broke even over {spins} spins!"
+        if lootboxes:
+            msg += f"\n🎁 **BONUS! You also won {lootboxes} Lootbox{'es' if lootboxes > 1 else ''}!**"
+        embed.add_field(name="Result", value=msg, inline=False)
         embed.add_field(name="Balance", value=f"💰 {coins} coins", inline=False)
         await ctx.send(embed=embed)
 
+    @commands.hybrid_command(name="slotsodds", description="Show the slot machine odds and expected value per coin bet.")
+    async def slotsodds(self, ctx):
+        table = SLOTS_EV_TABLE
+        embed = discord.Embed(
+            title="Slots Odds",
+            description=f"Symbols: {' '.join(SLOTS_SYMBOLS)}",
+            color=discord.Color.gold()
+        )
+        for kind, label in (("jackpot", "Jackpot (3 of a kind)"), ("pair", "Pair (2 of a kind)"), ("loss", "No match")):
+            row = table[kind]
+            embed.add_field(
+                name=label,
+                value=f"Chance: **{row['chance'] * 100:.2f}%**\nPays: **{row['multiplier']:+}x** bet\nLootbox: {row['lootbox_chance'] * 100:.0f}%",
+                inline=True
+            )
+        embed.add_field(
+            name="Expected Value",
+            value=(
+                f"**{table['ev']:+.3f}** coins per coin bet\n"
+                f"**{table['lootboxes_per_spin']:.4f}** Lootboxes per spin"
+            ),
+            inline=False
+        )
+        await ctx.send(embed=embed)
+
     @commands.hybrid_command(name="shop", description="View the shop. Use /shop buy <command_name> or /shop sell <command_name>.")
     @discord.app_commands.describe(
         action="Choose 'buy' or 'sell' to interact, or leave blank to browse the shop.",
@@ -577,7 +792,7 @@ class EcoCog(commands.Cog):
         quantity="How many to buy or sell (default 1)."
     )
     async def shop(self, ctx, action: str = None, command_name: str = None, quantity: int = 1):
-        items = get_shop_items(ctx.guild.id)
+        items = self.sorted_shop(ctx.guild.id)
         if not items:
             embed = discord.Embed(
                 title="Shop",
@@ -587,30 +802,9 @@ class EcoCog(commands.Cog):
             await ctx.send(embed=embed)
             return
 
-        # Sort items by rarity, then price (optional)
-        rarity_order = {"common": 0, "uncommon": 1, "rare": 2, "epic": 3, "legendary": 4}
-        items.sort(key=lambda x: (rarity_order.get((x[4] or "").lower(), 99), x[2]))
-
         if not action:
-            view = ShopPageView(ctx, items)
-            embed = discord.Embed(
-                title="Shop (Page 1)",
-                description="Use `/shop buy <command_name>` or `/shop sell <command_name>` to buy/sell.",
-                color=discord.Color.blurple()
-            )
-            for name, cmd, price, desc, rarity, item_type in items[:6]:
-                meta = []
-                if item_type:
-                    meta.append(f"Type: {item_type.capitalize()}")
-                if rarity:
-                    meta.append(f"Rarity: {rarity.capitalize()}")
-                meta_str = " | ".join(meta)
-                embed.add_field(
-                    name=f"{name} (`{cmd}`) - {price} coins",
-                    value=f"{desc}\n{meta_str}" if meta_str else desc,
-                    inline=False
-                )
-            await ctx.send(embed=embed, view=view)
+            embed, page, max_page = shop_page(items, 0)
+            await ctx.send(embed=embed, view=ShopPageView(page, max_page))
             return
 
         action = action.lower() if action else None
@@ -626,9 +820,14 @@ class EcoCog(commands.Cog):
             await ctx.send("Quantity must be at least 1.")
             return
 
-        item = get_shop_item_by_command(ctx.guild.id, command_name.lower())
+        # Accept the item name too, in any case or spacing
+        by_command, index = self.shop_index(ctx.guild.id)
+        resolved, suggestion = index.resolve(command_name)
+        command_name = resolved or command_name.lower()
+        item = get_shop_item_by_command(ctx.guild.id, command_name)
         if not item:
-            await ctx.send(f"Item with command name `{command_name}` not found.")
+            hint = did_you_mean(suggestion and f"{by_command[suggestion][0]} ({suggestion})")
+            await ctx.send(f"Item with command name `{command_name}` not found.{hint}")
             return
 
         item_name, cmd, price, desc, effect, rarity, item_type = item
@@ -658,7 +857,7 @@ class EcoCog(commands.Cog):
                 await ctx.send(f"You do not have {quantity}x `{item_name}` in your inventory.")
                 return
             # Try to get price from current guild shop first
-            item = get_shop_item_by_command(ctx.guild.id, command_name.lower())
+            item = get_shop_item_by_command(ctx.guild.id, command_name)
             if not item:
                 # Fallback: get price from any shop
                 item = get_shop_item_any(item_name)
@@ -679,6 +878,17 @@ class EcoCog(commands.Cog):
             )
             await ctx.send(embed=embed)
 
+    @shop.autocomplete("command_name")
+    async def shop_command_autocomplete(self, interaction: discord.Interaction, current: str):
+        by_command, index = self.shop_index(interaction.guild_id)
+        if (interaction.namespace.action or "").lower() == "sell":
+            counts = INVENTORIES.get(interaction.user.id, lambda uid: (get_player(uid) or (0, 0, ""))[2]).counts
+            owned = [cmd for cmd in index.complete(current, limit=None) if by_command[cmd][0] in counts]
+            labels = {cmd: f"{by_command[cmd][0]} ({cmd}) x{counts[by_command[cmd][0]]}" for cmd in owned[:25]}
+        else:
+            labels = {cmd: f"{by_command[cmd][0]} ({cmd}) - {by_command[cmd][2]} coins" for cmd in index.complete(current)}
+        return [discord.app_commands.Choice(name=label[:100], value=cmd[:100]) for cmd, label in labels.items()]
+
     @commands.hybrid_command(name="inventory", description="View your inventory.")
     async def inventory(self, ctx, member: discord.Member = None):
         member = member or ctx.author
@@ -847,6 +1057,7 @@ class EcoCog(commands.Cog):
             return
 
         add_shop_item(ctx.guild.id, item_name, command_name, price, description, effect, rarity, item_type)
+        self.update_shop(ctx.guild.id, command_name, (item_name, command_name, price, description, rarity, item_type))
         embed = discord.Embed(
             title="Shop Item Added",
             description=f"**{item_name}** (`{command_name}`) has been added to the shop.",
@@ -860,6 +1071,7 @@ class EcoCog(commands.Cog):
     )
     async def shopadmin_remove(self, ctx, command_name: str):
         remove_shop_item(ctx.guild.id, command_name)
+        self.update_shop(ctx.guild.id, command_name)
         embed = discord.Embed(
             title="Shop Item Removed",
             description=f"Item with command name `{command_name}` has been removed from the shop.",
@@ -875,12 +1087,12 @@ class EcoCog(commands.Cog):
     async def shopadmin_price(self, ctx, command_name: str, new_price: int):
         conn = sqlite3.connect(DB_PATH)
         cursor = conn.cursor()
-        cursor.execute(
-            "UPDATE eco_shop SET price = ? WHERE guild_id = ? AND command_name = ?",
-            (new_price, str(ctx.guild.id), command_name)
-        )
+        cursor.execute(UPDATE_SHOP_PRICE_SQL, (new_price, str(ctx.guild.id), command_name))
         conn.commit()
         conn.close()
+        row = self.shop_indexes.get(ctx.guild.id, ({}, None, 0))[0].get(command_name)
+        if row:
+            self.update_shop(ctx.guild.id, command_name, row[:2] + (new_price,) + row[3:])
         embed = discord.Embed(
             title="Shop Item Price Updated",
             description=f"Price for `{command_name}` has been set to {new_price} coins.",
@@ -915,33 +1127,21 @@ class EcoCog(commands.Cog):
         coins, bank, inv, *_ = get_player(ctx.author.id)
         items = inv.split(",") if inv else []
 
-        # Normalize input and inventory for case-insensitive, space-insensitive match
-        def normalize(s):
-            return s.replace(" ", "").lower()
-
-        normalized_input = normalize(item_name)
-        matched_item = None
-        for inv_item in items:
-            if normalize(inv_item) == normalized_input:
-                matched_item = inv_item
-                break
+        # Case- and space-insensitive match through the cached inventory's name index
+        matched_item, suggestion = INVENTORIES.store(ctx.author.id, inv).index.resolve(item_name)
 
         if not matched_item:
             embed = discord.Embed(
                 title="Item Not Found",
-                description="You do not have this item in your inventory.",
+                description=f"You do not have this item in your inventory.{did_you_mean(suggestion)}",
                 color=discord.Color.red()
             )
             await ctx.send(embed=embed)
             return
 
         # --- RPG item protection ---
-        # Load RPG item names from default_items.json except Gold Coin
-        import json
-        RPG_ITEMS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "default_items.json")
-        with open(RPG_ITEMS_PATH, "r", encoding="utf-8") as f:
-            RPG_ITEMS = json.load(f)
-        rpg_item_names = {item["item_name"] for item in RPG_ITEMS if item["item_name"] != "Gold Coin"}
+        # RPG item names from default_items.json (parsed once, on first use) except Gold Coin
+        rpg_item_names = GAME_DATA.rpg_item_names - {"Gold Coin"}
 
         if matched_item in rpg_item_names:
             if matched_item == "Gold Coin":
@@ -1019,6 +1219,12 @@ class EcoCog(commands.Cog):
             new_inv = ",".join(items)
             update_player(ctx.author.id, inventory=new_inv)
 
+    @use.autocomplete("item_name")
+    async def use_autocomplete(self, interaction: discord.Interaction, current: str):
+        # RPG items are used through the RPG commands, so only offer the rest
+        rpg_item_names = GAME_DATA.rpg_item_names - {"Gold Coin"}
+        return inventory_choices(interaction.user.id, current, keep=lambda name: name not in rpg_item_names)
+
     @commands.hybrid_command(name="lootbox", description="Open a lootbox for a chance at rare collectibles!")
     async def lootbox(self, ctx):
         add_player_if_not_exists(ctx.author.id)
@@ -1115,13 +1321,7 @@ class EcoCog(commands.Cog):
 
     @leaderboard.command(name="global", description="Show the top 5 richest users globally.")
     async def leaderboard_global(self, ctx):
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT user_id, coins, bank FROM eco_players ORDER BY (coins + bank) DESC LIMIT 5"
-        )
-        top = cursor.fetchall()
-        conn.close()
+        top = get_richest_players(5)
         embed = discord.Embed(
             title="Top 5 Richest (Global)",
             color=discord.Color.gold()
@@ -1140,30 +1340,47 @@ class EcoCog(commands.Cog):
 
     @leaderboard.command(name="local", description="Show the top 5 richest users in this server.")
     async def leaderboard_local(self, ctx):
-        guild_member_ids = {str(m.id) for m in ctx.guild.members}
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT user_id, coins, bank FROM eco_players"
-        )
-        all_players = cursor.fetchall()
-        conn.close()
-        # Filter for members in this guild
-        local_players = [row for row in all_players if row[0] in guild_member_ids]
-        local_players.sort(key=lambda row: row[1] + row[2], reverse=True)
+        # Walk players richest-first and check membership one batch at a time, so the
+        # guild's member list never has to be fully cached (lean mode skips chunking).
+        # Without a cached member list each batch is a gateway request, so that walk is shorter.
+        await ensure_small_guild_chunked(ctx.guild)
+        scan_limit = LEADERBOARD_SCAN_LIMIT if ctx.guild.chunked else LEADERBOARD_GATEWAY_SCAN_LIMIT
+        local_players = []
+        offset = 0
+        exhausted = False
+        while len(local_players) < 5 and offset < scan_limit:
+            batch = get_richest_players(LEADERBOARD_BATCH, offset)
+            if not batch:
+                exhausted = True
+                break
+            offset += len(batch)
+            members = await guild_members_among(ctx.guild, [row[0] for row in batch])
+            for user_id, coins, bank in batch:
+                member = members.get(int(user_id))
+                if member:
+                    local_players.append((member, coins + bank))
+        capped = False
+        if len(local_players) < 5 and not exhausted:
+            # The guild's richest members rank below the walk: rank its member list directly
+            if await ensure_guild_chunked(ctx.guild):
+                rows = get_richest_among([member.id for member in ctx.guild.members], 5)
+                local_players = [
+                    (ctx.guild.get_member(int(user_id)), coins + bank) for user_id, coins, bank in rows
+                ]
+            else:
+                capped = True
         embed = discord.Embed(
             title=f"Top 5 Richest in {ctx.guild.name}",
             color=discord.Color.gold()
         )
+        if capped:
+            embed.set_footer(text=f"Only the {offset} richest players overall were checked for membership.")
         if not local_players:
             embed.description = "No players found."
         else:
             lines = []
-            for idx, (user_id, coins, bank) in enumerate(local_players[:5], 1):
-                member = ctx.guild.get_member(int(user_id))
-                name = member.display_name if member else f"User ID {user_id}"
-                total = coins + bank
-                lines.append(f"**{idx}. {name}** — 💰 **{total}** coins")
+            for idx, (member, total) in enumerate(local_players[:5], 1):
+                lines.append(f"**{idx}. {member.display_name}** — 💰 **{total}** coins")
             embed.description = "\n".join(lines)
         await ctx.send(embed=embed)
 
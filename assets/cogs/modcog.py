@@ -2,36 +2,25 @@ import discord
 from discord.ext import commands
 import sqlite3
 import os
+from assets.cogs.configcog import GET_MUTE_ROLE_SQL, GET_MODMAIL_CHANNEL_SQL
 
 DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "data.db")
 
+ADD_BAN_SQL = "INSERT INTO bans (guild_id, user_id, user_tag, reason) VALUES (?, ?, ?, ?)"
+REMOVE_BAN_SQL = "DELETE FROM bans WHERE guild_id = ? AND user_id = ?"
+
 def get_mute_role_id(guild_id):
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
-    cursor.execute("SELECT mute_role FROM mutes WHERE guild_id = ?", (str(guild_id),))
+    cursor.execute(GET_MUTE_ROLE_SQL, (str(guild_id),))
     result = cursor.fetchone()
     conn.close()
     return int(result[0]) if result and result[0] else None
 
-def ensure_bans_table():
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS bans (
-            guild_id TEXT,
-            user_id TEXT,
-            user_tag TEXT,
-            reason TEXT,
-            banned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    conn.commit()
-    conn.close()
-
 def get_modmail_channel_id(guild_id):
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
-    cursor.execute("SELECT modmail_channel FROM modmail WHERE guild_id = ?", (str(guild_id),))
+    cursor.execute(GET_MODMAIL_CHANNEL_SQL, (str(guild_id),))
     result = cursor.fetchone()
     conn.close()
     return int(result[0]) if result and result[0] else None
@@ -39,7 +28,6 @@ def get_modmail_channel_id(guild_id):
 class ModCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        ensure_bans_table()
 
     @commands.hybrid_command(name="modmail", description="Send an anonymous message to the server moderators.")
     async def modmail(self, ctx, *, message: str):
@@ -189,7 +177,7 @@ class ModCog(commands.Cog):
             conn = sqlite3.connect(DB_PATH)
             cursor = conn.cursor()
             cursor.execute(
-                "INSERT INTO bans (guild_id, user_id, user_tag, reason) VALUES (?, ?, ?, ?)",
+                ADD_BAN_SQL,
                 (str(ctx.guild.id), str(member.id), f"{member.name}#{member.discriminator}", reason)
             )
             conn.commit()
@@ -237,7 +225,7 @@ class ModCog(commands.Cog):
             conn = sqlite3.connect(DB_PATH)
             cursor = conn.cursor()
             cursor.execute(
-                "DELETE FROM bans WHERE guild_id = ? AND user_id = ?",
+                REMOVE_BAN_SQL,
                 (str(ctx.guild.id), str(user_obj.id))
             )
             conn.commit()
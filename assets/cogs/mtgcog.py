@@ -1,46 +1,96 @@
 import discord
 from discord.ext import commands
 import random
+from assets.utils.helpers import mention_user
+import asyncio
+import functools
+from assets.utils.gamesessions import GameSessionManager, FINISHED_UNDO_WINDOW
+from assets.utils.gamestate import GameSessionStore
+from assets.utils.mtgcards import card_db_available, get_card, search_cards, complete_names
+from assets.utils.helpers import truncate
+
+CARD_EMBED_CACHE_SIZE = 512  # rendered /mtgcard embeds kept in memory
+CARD_COLORS = {
+    "W": discord.Color.from_rgb(248, 231, 185), "U": discord.Color.blue(), "B": discord.Color.from_rgb(21, 11, 0),
+    "R": discord.Color.red(), "G": discord.Color.green()
+}
+
+@functools.lru_cache(maxsize=CARD_EMBED_CACHE_SIZE)
+def card_embed(oracle_id):
+    """Render a card once; callers copy the cached embed before adding anything to it."""
+    card = get_card(oracle_id)
+    title = f"{card['name']} {card['mana_cost']}" if card["mana_cost"] else card["name"]
+    colors = card["colors"] or ""
+    embed = discord.Embed(
+        title=truncate(title, 256),
+        url=card["scryfall_uri"],
+        description=truncate(f"**{card['type_line'] or ''}**\n\n{card['oracle_text'] or ''}", 4096),
+        color=CARD_COLORS.get(colors, discord.Color.gold()) if len(colors) <= 1 else discord.Color.gold()
+    )
+    if card["power"] is not None:
+        embed.add_field(name="P/T", value=f"{card['power']}/{card['toughness']}", inline=True)
+    if card["loyalty"] is not None:
+        embed.add_field(name="Loyalty", value=card["loyalty"], inline=True)
+    if card["set_name"]:
+        embed.add_field(name="Latest Printing", value=f"{card['set_name']} ({(card['set_code'] or '').upper()}), {(card['rarity'] or '').capitalize()}", inline=True)
+    if card["image_url"]:
+        embed.set_thumbnail(url=card["image_url"])
+    embed.set_footer(text=f"{card['printings']} printing(s)")
+    return embed
 
 class MTGCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        # {guild_id: {game_id: {"format": str, "players": {user_id: {...}}, "active": bool, "owner": user_id, "lobby": bool}}}
-        self.games = {}
-        # {guild_id: {user_id: game_id}}
-        self.player_games = {}
-
-    def get_next_game_id(self, guild_id):
-        if guild_id not in self.games or not self.games[guild_id]:
-            return 1
-        return max(self.games[guild_id].keys()) + 1
+        # Lobbies/games ({"format": str, "players": {user_id: {...}}, ...}), queued by format
+        self.sessions = GameSessionManager()
+        self.game_store = GameSessionStore(self.sessions, "mtg", getattr(bot, "shard_label", "all"))  # Snapshot + life journal, written in batches
+
+    async def cog_load(self):
+        # Restore lobbies and games in one bulk read before any command runs
+        try:
+            self.sessions.restore(*await asyncio.to_thread(self.game_store.load))
+        except Exception as e:
+            print(f"Failed to restore MTG games: {e}")
+        self.game_store.start()
+        self.sessions.reaper.start(self.expire_game)
+
+    async def cog_unload(self):
+        # Write any queued life changes before shutting down
+        self.sessions.reaper.stop()
+        await self.game_store.stop()
+
+    async def expire_game(self, key):
+        # Close a lobby/game the reaper found idle and tell its channel once
+        guild_id, game_id = key
+        game = self.sessions.get(guild_id, game_id)
+        if game is None:
+            return
+        self.cleanup_game(guild_id, game_id)
+        channel = self.bot.get_channel(game["channel_id"]) if game.get("channel_id") else None
+        if channel is None:
+            return
+        what = "Lobby" if game["lobby"] else "Game"
+        minutes = self.sessions.idle_ttl(game) // 60
+        embed = discord.Embed(
+            title=f"MTG {what} {game_id} Expired",
+            description=f"{what} {game_id} had no activity for {minutes} minutes and was closed.\n"
+                        f"Players: {', '.join(mention_user(pid) for pid in game['players'])}",
+            color=discord.Color.orange()
+        )
+        await channel.send(embed=embed)
 
     def get_player_game(self, guild_id, user_id):
-        return self.player_games.get(guild_id, {}).get(user_id)
+        return self.sessions.player_game(guild_id, user_id)
 
     def cleanup_game(self, guild_id, game_id):
-        # Remove game from games dict
-        if guild_id in self.games and game_id in self.games[guild_id]:
-            del self.games[guild_id][game_id]
-            # If no more games, remove the guild entry
-            if not self.games[guild_id]:
-                del self.games[guild_id]
-        # Remove all player references to this game
-        if guild_id in self.player_games:
-            to_remove = [uid for uid, gid in self.player_games[guild_id].items() if gid == game_id]
-            for uid in to_remove:
-                del self.player_games[guild_id][uid]
-            # If no more player refs, remove the guild entry
-            if not self.player_games[guild_id]:
-                del self.player_games[guild_id]
+        self.sessions.cleanup(guild_id, game_id)
 
     def pick_first_player(self, ctx, game):
         player_ids = list(game["players"].keys())
         if not player_ids:
             return None
         first_id = random.choice(player_ids)
-        member = ctx.guild.get_member(first_id)
-        return member
+        return mention_user(first_id)
 
     @commands.hybrid_command(name="mtgstart", description="Create or join a lobby for a new MTG game (strd for Standard, cmdr for Commander).")
     @discord.app_commands.describe(
@@ -68,8 +118,8 @@ class MTGCog(commands.Cog):
             return
 
         # Check if user is already in a game or lobby
-        if guild_id in self.player_games and user_id in self.player_games[guild_id]:
-            game_id = self.player_games[guild_id][user_id]
+        game_id = self.sessions.player_game(guild_id, user_id)
+        if game_id is not None:
             embed = discord.Embed(
                 title="Already in a Game or Lobby",
                 description=f"You are already in Game {game_id}. You must scoop or wait for it to end before joining/starting another.",
@@ -78,36 +128,29 @@ class MTGCog(commands.Cog):
             await ctx.send(embed=embed)
             return
 
-        # Find an open lobby for this format
-        open_lobby_id = None
-        if guild_id in self.games:
-            for gid, game in self.games[guild_id].items():
-                if game["format"] == format_key and game.get("lobby", False) and len(game["players"]) < max_players:
-                    open_lobby_id = gid
-                    break
+        # Oldest open lobby for this format, if any
+        open_lobby_id = self.sessions.find_open_lobby(guild_id, format_key)
 
         if open_lobby_id is not None:
             # Join the open lobby
-            game = self.games[guild_id][open_lobby_id]
+            game = self.sessions.get(guild_id, open_lobby_id)
             if format_key == "commander":
-                game["players"][user_id] = {"life": 40, "commander": {}, "active": True}
+                player = {"life": 40, "commander": {}, "active": True}
             else:
-                game["players"][user_id] = {"life": 20, "active": True}
-            self.player_games[guild_id][user_id] = open_lobby_id
+                player = {"life": 20, "active": True}
 
             # If lobby is now full, start the game
-            if len(game["players"]) == max_players:
-                game["active"] = True
-                game["lobby"] = False
+            if self.sessions.add_player(guild_id, open_lobby_id, user_id, player):
+                self.sessions.start(guild_id, open_lobby_id)
                 embed = discord.Embed(
                     title=f"MTG Game {open_lobby_id} Started",
-                    description=f"Format: **{format_key.capitalize()}**\nPlayers: {', '.join(ctx.guild.get_member(pid).mention for pid in game['players'])}",
+                    description=f"Format: **{format_key.capitalize()}**\nPlayers: {', '.join(mention_user(pid) for pid in game['players'])}",
                     color=discord.Color.green()
                 )
                 await ctx.send(embed=embed)
                 first = self.pick_first_player(ctx, game)
                 if first:
-                    await ctx.send(f"🎲 {first.mention} goes first!")
+                    await ctx.send(f"🎲 {first} goes first!")
                 await self.show_game_life_totals(ctx, guild_id, open_lobby_id)
             else:
                 embed = discord.Embed(
@@ -119,25 +162,11 @@ class MTGCog(commands.Cog):
             return
 
         # No open lobby, create a new one
-        if guild_id not in self.games:
-            self.games[guild_id] = {}
-        if guild_id not in self.player_games:
-            self.player_games[guild_id] = {}
-
-        game_id = self.get_next_game_id(guild_id)
         if format_key == "commander":
-            players = {user_id: {"life": 40, "commander": {}, "active": True}}
+            player = {"life": 40, "commander": {}, "active": True}
         else:
-            players = {user_id: {"life": 20, "active": True}}
-
-        self.games[guild_id][game_id] = {
-            "format": format_key,
-            "players": players,
-            "active": False,
-            "owner": user_id,
-            "lobby": True
-        }
-        self.player_games[guild_id][user_id] = game_id
+            player = {"life": 20, "active": True}
+        game_id, game = self.sessions.create(guild_id, user_id, format_key, max_players, player, format=format_key, channel_id=ctx.channel.id)
 
         embed = discord.Embed(
             title=f"Lobby Created for Game {game_id}",
@@ -155,7 +184,7 @@ class MTGCog(commands.Cog):
         user_id = ctx.author.id
 
         # Check if user is already in a game or lobby
-        if guild_id in self.player_games and user_id in self.player_games[guild_id]:
+        if self.sessions.player_game(guild_id, user_id) is not None:
             embed = discord.Embed(
                 title="Already in a Game or Lobby",
                 description="You must scoop or wait for your current game to end before joining another.",
@@ -164,7 +193,8 @@ class MTGCog(commands.Cog):
             await ctx.send(embed=embed)
             return
 
-        if guild_id not in self.games or game_id not in self.games[guild_id]:
+        game = self.sessions.get(guild_id, game_id)
+        if game is None:
             embed = discord.Embed(
                 title="Lobby Not Found",
                 description=f"Game {game_id} does not exist.",
@@ -173,7 +203,6 @@ class MTGCog(commands.Cog):
             await ctx.send(embed=embed)
             return
 
-        game = self.games[guild_id][game_id]
         if not game.get("lobby", False):
             embed = discord.Embed(
                 title="Not a Lobby",
@@ -195,24 +224,22 @@ class MTGCog(commands.Cog):
 
         # Add player to lobby
         if game["format"] == "commander":
-            game["players"][user_id] = {"life": 40, "commander": {}, "active": True}
+            player = {"life": 40, "commander": {}, "active": True}
         else:
-            game["players"][user_id] = {"life": 20, "active": True}
-        self.player_games[guild_id][user_id] = game_id
+            player = {"life": 20, "active": True}
 
         # If lobby is now full, start the game
-        if len(game["players"]) == max_players:
-            game["active"] = True
-            game["lobby"] = False
+        if self.sessions.add_player(guild_id, game_id, user_id, player):
+            self.sessions.start(guild_id, game_id)
             embed = discord.Embed(
                 title=f"MTG Game {game_id} Started",
-                description=f"Format: **{game['format'].capitalize()}**\nPlayers: {', '.join(ctx.guild.get_member(pid).mention for pid in game['players'])}",
+                description=f"Format: **{game['format'].capitalize()}**\nPlayers: {', '.join(mention_user(pid) for pid in game['players'])}",
                 color=discord.Color.green()
             )
             await ctx.send(embed=embed)
             first = self.pick_first_player(ctx, game)
             if first:
-                await ctx.send(f"🎲 {first.mention} goes first!")
+                await ctx.send(f"🎲 {first} goes first!")
             await self.show_game_life_totals(ctx, guild_id, game_id)
         else:
             embed = discord.Embed(
@@ -245,7 +272,7 @@ class MTGCog(commands.Cog):
 
         # If game_id is provided, show stats for that game (view only)
         if game_id is not None:
-            if guild_id not in self.games or game_id not in self.games[guild_id]:
+            if self.sessions.get(guild_id, game_id) is None:
                 embed = discord.Embed(
                     title="Game Not Found",
                     description=f"Game {game_id} does not exist.",
@@ -253,7 +280,7 @@ class MTGCog(commands.Cog):
                 )
                 await ctx.send(embed=embed)
                 return
-            game = self.games[guild_id][game_id]
+            game = self.sessions.get(guild_id, game_id)
             embed = discord.Embed(
                 title=f"MTG Game {game_id} Life Totals",
                 color=discord.Color.blurple()
@@ -274,7 +301,8 @@ class MTGCog(commands.Cog):
 
         # Otherwise, default to user's current game (update/view)
         game_id = self.get_player_game(guild_id, user_id)
-        if not game_id or not self.games[guild_id][game_id]["active"] or user_id not in self.games[guild_id][game_id]["players"] or not self.games[guild_id][game_id]["players"][user_id]["active"]:
+        game = self.sessions.get(guild_id, game_id)
+        if not game or not game["active"] or user_id not in game["players"] or not game["players"][user_id]["active"]:
             embed = discord.Embed(
                 title="No Game Running",
                 description="You are not in an active game. Start one with `/mtgstart`.",
@@ -283,7 +311,7 @@ class MTGCog(commands.Cog):
             await ctx.send(embed=embed)
             return
 
-        game = self.games[guild_id][game_id]
+        game = self.sessions.get(guild_id, game_id)
         player = game["players"][user_id]
 
         # Commander format: allow updating commander damage
@@ -296,14 +324,11 @@ class MTGCog(commands.Cog):
                 )
                 await ctx.send(embed=embed)
                 return
-            if "commander" not in player:
-                player["commander"] = {}
-            if from_player.id not in player["commander"]:
-                player["commander"][from_player.id] = 0
-            player["commander"][from_player.id] += amount
+            self.sessions.change_life(guild_id, game_id, user_id, amount, from_player.id)
             # Win condition: 21 or more commander damage from a single commander
             if player["commander"][from_player.id] >= 21:
                 player["active"] = False
+                self.sessions.touch(guild_id, game_id)
                 embed = discord.Embed(
                     title="Player Eliminated",
                     description=f"{ctx.author.mention} has received 21 or more commander damage from {from_player.mention} and is eliminated!",
@@ -313,15 +338,17 @@ class MTGCog(commands.Cog):
                 # Check if only one player remains
                 active_players = [uid for uid, pdata in game["players"].items() if pdata["active"]]
                 if len(active_players) == 1:
-                    winner = ctx.guild.get_member(active_players[0])
+                    winner = mention_user(active_players[0])
                     game["active"] = False
                     win_embed = discord.Embed(
                         title="Game Over",
-                        description=f"{winner.mention} is the last player standing and wins the game!",
+                        description=f"{winner} is the last player standing and wins the game!\n"
+                                    f"Entered the wrong amount? `/mtgundo` within {FINISHED_UNDO_WINDOW // 60} minutes reopens the game.",
                         color=discord.Color.green()
                     )
                     await ctx.send(embed=win_embed)
-                    self.cleanup_game(guild_id, game_id)
+                    # Kept for the undo window instead of cleaned up, so a mistyped lethal change can be undone
+                    self.sessions.finish(guild_id, game_id)
                     return  # Prevent further code from running after cleanup
                 await self.show_game_life_totals(ctx, guild_id, game_id)
                 return
@@ -331,10 +358,11 @@ class MTGCog(commands.Cog):
 
         # Normal life update/view
         if amount is not None:
-            player["life"] += amount
+            self.sessions.change_life(guild_id, game_id, user_id, amount)
             # Win condition check for Standard and Commander (life <= 0)
             if player["life"] <= 0:
                 player["active"] = False
+                self.sessions.touch(guild_id, game_id)
                 embed = discord.Embed(
                     title="Player Eliminated",
                     description=f"{ctx.author.mention} has lost all their life and is eliminated!",
@@ -344,15 +372,17 @@ class MTGCog(commands.Cog):
                 # Check if only one player remains
                 active_players = [uid for uid, pdata in game["players"].items() if pdata["active"]]
                 if len(active_players) == 1:
-                    winner = ctx.guild.get_member(active_players[0])
+                    winner = mention_user(active_players[0])
                     game["active"] = False
                     win_embed = discord.Embed(
                         title="Game Over",
-                        description=f"{winner.mention} is the last player standing and wins the game!",
+                        description=f"{winner} is the last player standing and wins the game!\n"
+                                    f"Entered the wrong amount? `/mtgundo` within {FINISHED_UNDO_WINDOW // 60} minutes reopens the game.",
                         color=discord.Color.green()
                     )
                     await ctx.send(embed=win_embed)
-                    self.cleanup_game(guild_id, game_id)
+                    # Kept for the undo window instead of cleaned up, so a mistyped lethal change can be undone
+                    self.sessions.finish(guild_id, game_id)
                     return  # Prevent further code from running after cleanup
                 await self.show_game_life_totals(ctx, guild_id, game_id)
                 return
@@ -360,7 +390,7 @@ class MTGCog(commands.Cog):
         await self.show_game_life_totals(ctx, guild_id, game_id)
 
     async def show_game_life_totals(self, ctx, guild_id, game_id):
-        game = self.games[guild_id][game_id]
+        game = self.sessions.get(guild_id, game_id)
         embed = discord.Embed(
             title=f"MTG Game {game_id} Life Totals",
             color=discord.Color.blurple()
@@ -378,10 +408,134 @@ class MTGCog(commands.Cog):
             embed.add_field(name=member.display_name if member else str(pid), value=value, inline=False)
         await ctx.send(embed=embed)
 
+    @commands.hybrid_command(name="mtgundo", description="Undo your last life or commander damage change in your current MTG game.")
+    async def mtgundo(self, ctx):
+        guild_id = ctx.guild.id
+        user_id = ctx.author.id
+
+        game_id = self.get_player_game(guild_id, user_id)
+        game = self.sessions.get(guild_id, game_id)
+        finished = False
+        if game is None:
+            # A game that just ended on a life change can still be reopened by undoing it
+            game_id, game = self.sessions.finished_game(guild_id, user_id)
+            finished = game is not None
+        if not game or not (game["active"] or finished) or user_id not in game["players"]:
+            embed = discord.Embed(
+                title="No Game Running",
+                description="You are not in an active game. Start one with `/mtgstart`.",
+                color=discord.Color.red()
+            )
+            await ctx.send(embed=embed)
+            return
+
+        undone = self.sessions.undo_life(guild_id, game_id, user_id)
+        if undone is None:
+            embed = discord.Embed(
+                title="Nothing to Undo",
+                description=f"You have no life changes to undo in Game {game_id}.",
+                color=discord.Color.yellow()
+            )
+            await ctx.send(embed=embed)
+            return
+
+        amount, source, value = undone
+        what = f"commander damage from {mention_user(source)}" if source else "life"
+        description = f"Reverted **{amount:+d}** {what}, now **{value}**."
+        # Undoing the change that eliminated the player puts them back in the game
+        player = game["players"][user_id]
+        was_lethal = value + amount >= 21 if source else value + amount <= 0
+        if not player["active"] and was_lethal and player["life"] > 0 and all(dmg < 21 for dmg in player.get("commander", {}).values()):
+            player["active"] = True
+            if finished:
+                self.sessions.revive(guild_id, game_id)
+                description += f"\nGame {game_id} is reopened."
+            else:
+                self.sessions.touch(guild_id, game_id)
+            description += f"\n{ctx.author.mention} is back in the game."
+        embed = discord.Embed(
+            title="Life Change Undone",
+            description=description,
+            color=discord.Color.green()
+        )
+        await ctx.send(embed=embed)
+        if self.sessions.get(guild_id, game_id) is not None:
+            await self.show_game_life_totals(ctx, guild_id, game_id)
+
+    @commands.hybrid_command(name="mtghistory", description="Show recent life and commander damage changes in an MTG game.")
+    @discord.app_commands.describe(
+        game_id="Game ID to show (optional, defaults to your current game)"
+    )
+    async def mtghistory(self, ctx, game_id: int = None):
+        guild_id = ctx.guild.id
+        if game_id is None:
+            game_id = self.get_player_game(guild_id, ctx.author.id)
+        game = self.sessions.get(guild_id, game_id)
+        if game is None:
+            embed = discord.Embed(
+                title="Game Not Found",
+                description="You are not in a game or the game does not exist.",
+                color=discord.Color.red()
+            )
+            await ctx.send(embed=embed)
+            return
+
+        embed = discord.Embed(
+            title=f"MTG Game {game_id} Life History",
+            color=discord.Color.blurple()
+        )
+        for pid, history in self.sessions.life_history(guild_id, game_id).items():
+            pdata = game["players"].get(pid)
+            if pdata is None or not history:
+                continue
+            # Walk back from the current totals so each line shows the total after that change
+            totals = {0: pdata["life"], **pdata.get("commander", {})}
+            lines = []
+            for amount, source, at in history.newest_first():
+                label = f"commander damage from {mention_user(source)}" if source else "life"
+                lines.append(f"`{amount:+d}` {label} → **{totals[source]}** <t:{int(at)}:R>")
+                totals[source] -= amount
+            member = ctx.guild.get_member(pid)
+            embed.add_field(name=member.display_name if member else str(pid), value="\n".join(lines[:10]), inline=False)
+        if not embed.fields:
+            embed.description = "No life changes have been recorded for this game yet."
+        await ctx.send(embed=embed)
+
+    @commands.hybrid_command(name="mtgcard", description="Look up a Magic: The Gathering card by name (prefix and fuzzy search).")
+    @discord.app_commands.describe(name="Card name, the start of it, or a close spelling")
+    async def mtgcard(self, ctx, *, name: str):
+        if not card_db_available():
+            embed = discord.Embed(
+                title="Card Database Missing",
+                description="The card database has not been imported yet. The bot owner can build it with `python -m assets.utils.mtgcards <Scryfall bulk file>`.",
+                color=discord.Color.red()
+            )
+            await ctx.send(embed=embed)
+            return
+
+        matches = search_cards(name)
+        if not matches:
+            embed = discord.Embed(
+                title="Card Not Found",
+                description=f"No card matches **{truncate(name, 100)}**.",
+                color=discord.Color.red()
+            )
+            await ctx.send(embed=embed)
+            return
+
+        embed = card_embed(matches[0][0]).copy()
+        if matches[0][2] != "exact" and len(matches) > 1:
+            embed.add_field(name="Other Matches", value="\n".join(match[1] for match in matches[1:]), inline=False)
+        await ctx.send(embed=embed)
+
+    @mtgcard.autocomplete("name")
+    async def mtgcard_autocomplete(self, interaction: discord.Interaction, current: str):
+        return [discord.app_commands.Choice(name=card[:100], value=card[:100]) for card in complete_names(current)]
+
     @commands.hybrid_command(name="mtglobbies", description="List all MTG lobbies and active games in this server.")
     async def mtglobbies(self, ctx):
         guild_id = ctx.guild.id
-        if guild_id not in self.games or not self.games[guild_id]:
+        if not self.sessions.guild_games(guild_id):
             embed = discord.Embed(
                 title="No Lobbies or Games",
                 description="There are currently no lobbies or active games.",
@@ -395,8 +549,8 @@ class MTGCog(commands.Cog):
             color=discord.Color.blurple()
         )
         found = False
-        for game_id, game in self.games[guild_id].items():
-            players = [ctx.guild.get_member(pid).mention for pid in game["players"]]
+        for game_id, game in self.sessions.guild_games(guild_id).items():
+            players = [mention_user(pid) for pid in game["players"]]
             max_players = 6 if game["format"] == "commander" else 2
             if game.get("lobby", False):
                 status = f"Lobby (waiting: {len(players)}/{max_players})"
@@ -421,7 +575,7 @@ class MTGCog(commands.Cog):
 
         # Check if user is in a game/lobby
         game_id = self.get_player_game(guild_id, user_id)
-        if not game_id or guild_id not in self.games or game_id not in self.games[guild_id]:
+        if not game_id or self.sessions.get(guild_id, game_id) is None:
             embed = discord.Embed(
                 title="Not in a Lobby",
                 description="You are not currently in any lobby.",
@@ -430,7 +584,7 @@ class MTGCog(commands.Cog):
             await ctx.send(embed=embed)
             return
 
-        game = self.games[guild_id][game_id]
+        game = self.sessions.get(guild_id, game_id)
         if not game.get("lobby", False):
             embed = discord.Embed(
                 title="Game Already Started",
@@ -440,11 +594,8 @@ class MTGCog(commands.Cog):
             await ctx.send(embed=embed)
             return
 
-        # Remove player from lobby
-        if user_id in game["players"]:
-            del game["players"][user_id]
-        if user_id in self.player_games[guild_id]:
-            del self.player_games[guild_id][user_id]
+        # Remove player from lobby (an emptied lobby is deleted)
+        self.sessions.remove_player(guild_id, game_id, user_id)
 
         embed = discord.Embed(
             title="Left Lobby",
@@ -453,10 +604,6 @@ class MTGCog(commands.Cog):
         )
         await ctx.send(embed=embed)
 
-        # If lobby is empty, delete it
-        if not game["players"]:
-            del self.games[guild_id][game_id]
-
     @commands.hybrid_command(name="mtgforcestart", description="Force start a lobby before max players are reached (owner only).")
     @discord.app_commands.describe(
         game_id="Game ID of the lobby you want to start (optional, defaults to your current lobby)"
@@ -468,7 +615,7 @@ class MTGCog(commands.Cog):
         # Determine which lobby to start
         if game_id is None:
             game_id = self.get_player_game(guild_id, user_id)
-        if not game_id or guild_id not in self.games or game_id not in self.games[guild_id]:
+        if not game_id or self.sessions.get(guild_id, game_id) is None:
             embed = discord.Embed(
                 title="Lobby Not Found",
                 description="You are not in a lobby or the lobby does not exist.",
@@ -477,7 +624,7 @@ class MTGCog(commands.Cog):
             await ctx.send(embed=embed)
             return
 
-        game = self.games[guild_id][game_id]
+        game = self.sessions.get(guild_id, game_id)
         if not game.get("lobby", False):
             embed = discord.Embed(
                 title="Game Already Started",
@@ -498,17 +645,16 @@ class MTGCog(commands.Cog):
             return
 
         # Start the game
-        game["active"] = True
-        game["lobby"] = False
+        self.sessions.start(guild_id, game_id)
         embed = discord.Embed(
             title=f"MTG Game {game_id} Started (Forced)",
-            description=f"Format: **{game['format'].capitalize()}**\nPlayers: {', '.join(ctx.guild.get_member(pid).mention for pid in game['players'])}",
+            description=f"Format: **{game['format'].capitalize()}**\nPlayers: {', '.join(mention_user(pid) for pid in game['players'])}",
             color=discord.Color.green()
         )
         await ctx.send(embed=embed)
         first = self.pick_first_player(ctx, game)
         if first:
-            await ctx.send(f"🎲 {first.mention} goes first!")
+            await ctx.send(f"🎲 {first} goes first!")
         await self.show_game_life_totals(ctx, guild_id, game_id)
 
     @commands.hybrid_command(name="mtgscoop", description="Forfeit (scoop) from your current MTG game.")
@@ -517,7 +663,7 @@ class MTGCog(commands.Cog):
         user_id = ctx.author.id
 
         game_id = self.get_player_game(guild_id, user_id)
-        if not game_id or guild_id not in self.games or game_id not in self.games[guild_id]:
+        if not game_id or self.sessions.get(guild_id, game_id) is None:
             embed = discord.Embed(
                 title="Not in a Game",
                 description="You are not currently in any game.",
@@ -526,7 +672,7 @@ class MTGCog(commands.Cog):
             await ctx.send(embed=embed)
             return
 
-        game = self.games[guild_id][game_id]
+        game = self.sessions.get(guild_id, game_id)
         if not game.get("active", False):
             embed = discord.Embed(
                 title="Game Not Started",
@@ -555,17 +701,16 @@ class MTGCog(commands.Cog):
         await ctx.send(embed=embed)
 
         # Remove player from player_games
-        if user_id in self.player_games.get(guild_id, {}):
-            del self.player_games[guild_id][user_id]
+        self.sessions.release_player(guild_id, user_id, game_id)
 
         # Check if only one player remains
         active_players = [uid for uid, pdata in game["players"].items() if pdata.get("active", True)]
         if len(active_players) == 1:
-            winner = ctx.guild.get_member(active_players[0])
+            winner = mention_user(active_players[0])
             game["active"] = False
             win_embed = discord.Embed(
                 title="Game Over",
-                description=f"{winner.mention} is the last player standing and wins the game!",
+                description=f"{winner} is the last player standing and wins the game!",
                 color=discord.Color.green()
             )
             await ctx.send(embed=win_embed)
@@ -5,83 +5,64 @@ import sqlite3
 import os
 import random
 import asyncio
-import json
 import datetime
-from assets.cogs.ecocog import get_cooldown, set_cooldown  # Adjust import if needed
+import secrets
+import functools
+from contextlib import asynccontextmanager
+from assets.cogs.ecocog import get_cooldown, set_cooldown, set_cooldowns, inventory_choices  # Adjust import if needed
+from assets.cogs.ecocog import UPDATE_PLAYER_SQL, ADD_PLAYER_SQL
+from assets.utils.raidstate import RaidStateManager
+from assets.utils.locks import LockManager
+from assets.utils.battlestate import BattleStateStore
+from assets.utils.battles import BattleRegistry
+from assets.utils.battlelog import BattleLog, BattleLogHistory
+from assets.utils import battlelog as ev
+from assets.utils.combatregistry import CombatHit, UNCONDITIONAL_SIGNATURES
+from assets.utils.gamedata import GAME_DATA
+from assets.utils.nameindex import INVENTORIES, did_you_mean
 
 DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "data.db")
 
 RAID_COOLDOWN_COMMAND = "rpgraid"
+MARKET_PAGE_SIZE = 6
 
-# Load SPELLS from JSON file
-SPELLS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "spells.json")
-with open(SPELLS_PATH, "r", encoding="utf-8") as f:
-    SPELLS = json.load(f)
+RPG_STAT_COLUMNS = (
+    "level", "exp", "hp", "max_hp", "atk", "defense", "char_class", "weapon", "quest", "quest_progress",
+    "skill_points", "strength", "dexterity", "intelligence", "exp_to_next", "hp_regen", "mana", "mana_regen",
+    "max_mana", "crit_chance", "crit_damage", "evasion_chance", "bonus_spell_dmg"
+)
+RPG_STAT_FIELDS = set(RPG_STAT_COLUMNS)
 
-QUESTS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "default_quests.json")
-with open(QUESTS_PATH, "r", encoding="utf-8") as f:
-    QUESTS = json.load(f)
+# Statements on the hot paths; assets/utils/queryplans.py checks the plans of these exact strings
+GET_WALLET_SQL = "SELECT coins, bank, inventory FROM eco_players WHERE user_id = ?"
+GET_RPG_STATS_SQL = f"SELECT {', '.join(RPG_STAT_COLUMNS)} FROM rpg_stats WHERE user_id = ?"
+RPG_STATS_EXISTS_SQL = "SELECT 1 FROM rpg_stats WHERE user_id = ?"
+CREATE_RPG_STATS_SQL = f"""
+    INSERT INTO rpg_stats (user_id, {', '.join(RPG_STAT_COLUMNS)})
+    VALUES (?, 1, 0, 20, 20, 5, 2, NULL, '', '', 0, 5, 0, 0, 0, 27, 0.5, 5, 0.2, 5, 0.01, 1.0, 0.01, 0)
+"""
+DELETE_RPG_STATS_SQL = "DELETE FROM rpg_stats WHERE user_id = ?"
+GET_EQUIPPED_SPELLS_SQL = "SELECT equipped_spells FROM rpg_stats WHERE user_id = ?"
+SET_EQUIPPED_SPELLS_SQL = "UPDATE rpg_stats SET equipped_spells = ? WHERE user_id = ?"
 
-ITEMS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "default_items.json")
-with open(ITEMS_PATH, "r", encoding="utf-8") as f:
-    DEFAULT_ITEMS = json.load(f)
 
-# Build a lookup for weapons from default_items.json
-WEAPON_ITEMS = {
-    item["item_name"]: item
-    for item in DEFAULT_ITEMS
-    if item.get("item_type") == "weapons"
-}
+def placeholders(count):
+    return ", ".join("?" for _ in range(count))
 
-def load_raid_state(guild_id):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("SELECT boss_name, boss_hp, boss_max_hp, boss_data, participants, last_spawn FROM rpg_raid_state WHERE guild_id = ?", (str(guild_id),))
-    row = cursor.fetchone()
-    conn.close()
-    if not row:
-        return None
-    boss_name, boss_hp, boss_max_hp, boss_data, participants, last_spawn = row
-    return {
-        "boss_name": boss_name,
-        "boss_hp": boss_hp,
-        "boss_max_hp": boss_max_hp,
-        "boss_data": json.loads(boss_data),
-        "participants": set(json.loads(participants)),
-        "last_spawn": datetime.datetime.fromisoformat(last_spawn) if last_spawn else None
-    }
-
-def save_raid_state(guild_id, state):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute(
-        """INSERT OR REPLACE INTO rpg_raid_state
-        (guild_id, boss_name, boss_hp, boss_max_hp, boss_data, participants, last_spawn)
-        VALUES (?, ?, ?, ?, ?, ?, ?)""",
-        (
-            str(guild_id),
-            state["boss_name"],
-            state["boss_hp"],
-            state["boss_max_hp"],
-            json.dumps(state["boss_data"]),
-            json.dumps(list(state["participants"])),
-            state["last_spawn"].isoformat() if state["last_spawn"] else None
-        )
-    )
-    conn.commit()
-    conn.close()
+def many_inventories_sql(count):
+    return f"SELECT user_id, inventory FROM eco_players WHERE user_id IN ({placeholders(count)})"
+
+def many_rpg_stats_sql(count):
+    return f"SELECT user_id, {', '.join(RPG_STAT_COLUMNS)} FROM rpg_stats WHERE user_id IN ({placeholders(count)})"
+
+def update_rpg_stats_sql(fields):
+    return f"UPDATE rpg_stats SET {', '.join(f'{field} = ?' for field in fields)} WHERE user_id = ?"
 
-def clear_raid_state(guild_id):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM rpg_raid_state WHERE guild_id = ?", (str(guild_id),))
-    conn.commit()
-    conn.close()
 
 def get_player(user_id):
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
-    cursor.execute("SELECT coins, bank, inventory FROM eco_players WHERE user_id = ?", (str(user_id),))
+    cursor.execute(GET_WALLET_SQL, (str(user_id),))
     result = cursor.fetchone()
     conn.close()
     if result:
@@ -93,48 +74,93 @@ def get_player(user_id):
 def update_player_inventory(user_id, inventory):
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
-    cursor.execute("UPDATE eco_players SET inventory = ? WHERE user_id = ?", (inventory, str(user_id)))
+    cursor.execute(UPDATE_PLAYER_SQL["inventory"], (inventory, str(user_id)))
+    conn.commit()
+    conn.close()
+    INVENTORIES.invalidate(int(user_id))
+
+def add_item_to_inventories(user_ids, item):
+    """Append `item` to many players' inventories with one read and one executemany write."""
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute(many_inventories_sql(len(user_ids)), [str(uid) for uid in user_ids])
+    updates = []
+    for user_id, inv in cursor.fetchall():
+        items = inv.split(",") if inv else []
+        items.append(item)
+        updates.append((",".join(items), user_id))
+    cursor.executemany(UPDATE_PLAYER_SQL["inventory"], updates)
     conn.commit()
     conn.close()
+    for user_id in user_ids:
+        INVENTORIES.invalidate(int(user_id))
 
 def add_player_if_not_exists(user_id):
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
-    cursor.execute("INSERT OR IGNORE INTO eco_players (user_id, coins, bank, inventory) VALUES (?, 0, 0, '')", (str(user_id),))
+    cursor.execute(ADD_PLAYER_SQL, (str(user_id),))
     conn.commit()
     conn.close()
 
 def get_rpg_stats(user_id):
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
-    cursor.execute(
-        """SELECT level, exp, hp, max_hp, atk, defense, char_class, weapon, quest, quest_progress, skill_points, strength, dexterity, intelligence, exp_to_next,
-                  hp_regen, mana, mana_regen, max_mana, crit_chance, crit_damage, evasion_chance, bonus_spell_dmg
-           FROM rpg_stats WHERE user_id = ?""",
-        (str(user_id),)
-    )
+    cursor.execute(GET_RPG_STATS_SQL, (str(user_id),))
     stats = cursor.fetchone()
     conn.close()
     return stats
 
+def get_many_rpg_stats(user_ids):
+    """Fetch stats for many users with one query; returns {user_id: stats} for users that have a profile."""
+    user_ids = list(user_ids)
+    if not user_ids:
+        return {}
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute(many_rpg_stats_sql(len(user_ids)), [str(uid) for uid in user_ids])
+    rows = {row[0]: row[1:] for row in cursor.fetchall()}
+    conn.close()
+    return {uid: rows[str(uid)] for uid in user_ids if str(uid) in rows}
+
+def get_alive_members(user_ids):
+    """Return the members with HP left, plus their stats, from a single batched fetch."""
+    stats = get_many_rpg_stats(user_ids)
+    return [uid for uid in user_ids if uid in stats and stats[uid][2] > 0], stats
+
 def update_rpg_stats(user_id, **kwargs):
-    ALLOWED_FIELDS = {
-        "level", "exp", "hp", "max_hp", "atk", "defense", "char_class", "weapon", "quest", "quest_progress",
-        "skill_points", "strength", "dexterity", "intelligence", "exp_to_next", "hp_regen", "mana", "mana_regen",
-        "max_mana", "crit_chance", "crit_damage", "evasion_chance", "bonus_spell_dmg"
-    }
     # Filter only allowed fields
-    kwargs = {k: v for k, v in kwargs.items() if k in ALLOWED_FIELDS}
+    kwargs = {k: v for k, v in kwargs.items() if k in RPG_STAT_FIELDS}
     if "quest_progress" in kwargs and kwargs["quest_progress"] is None:
         kwargs["quest_progress"] = 0
     if not kwargs:
         return
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
-    fields = ", ".join(f"{k} = ?" for k in kwargs)
     values = list(kwargs.values())
     values.append(str(user_id))
-    cursor.execute(f"UPDATE rpg_stats SET {fields} WHERE user_id = ?", values)
+    cursor.execute(update_rpg_stats_sql(kwargs), values)
+    conn.commit()
+    conn.close()
+
+def update_many_rpg_stats(updates):
+    """Apply {user_id: {field: value}} updates, one executemany per distinct set of fields."""
+    groups = {}
+    for user_id, fields in updates.items():
+        fields = {k: v for k, v in fields.items() if k in RPG_STAT_FIELDS}
+        if "quest_progress" in fields and fields["quest_progress"] is None:
+            fields["quest_progress"] = 0
+        if fields:
+            keys = tuple(sorted(fields))
+            groups.setdefault(keys, []).append([fields[k] for k in keys] + [str(user_id)])
+    if not groups:
+        return
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    for keys, rows in groups.items():
+        cursor.executemany(update_rpg_stats_sql(keys), rows)
     conn.commit()
     conn.close()
 
@@ -156,77 +182,127 @@ def remove_all_rpg_items_from_inventory(user_id):
     """
     coins, bank, inv = get_player(user_id)
     items = inv.split(",") if inv else []
-    # Load all RPG item names from DEFAULT_ITEMS
-    rpg_item_names = {item["item_name"] for item in DEFAULT_ITEMS}
+    rpg_item_names = GAME_DATA.rpg_item_names
     # Remove all items that are in the RPG item list
     items = [item for item in items if item not in rpg_item_names]
     update_player_inventory(user_id, ",".join(items))
     # Unequip weapon in rpg_stats
     update_rpg_stats(user_id, weapon="")
 
-class RPGMarketPageView(discord.ui.View):
-    def __init__(self, ctx, items, page=0, items_per_page=6):
-        super().__init__(timeout=60)
-        self.ctx = ctx
-        self.items = items
+@functools.lru_cache(maxsize=None)
+def market_page(page):
+    """Render one page of GAME_DATA.market_items once; returns (embed, page, max_page) with `page` clamped."""
+    items = GAME_DATA.market_items
+    max_page = max(0, (len(items) - 1) // MARKET_PAGE_SIZE)
+    page = min(max(page, 0), max_page)
+    embed = discord.Embed(
+        title=f"RPG Marketplace (Page {page + 1}/{max_page + 1})",
+        description="Use `/rpgmarket buy <item name> [quantity]` or `/rpgmarket sell <item name> [quantity]`.\n",
+        color=discord.Color.blurple()
+    )
+    for item in items[page * MARKET_PAGE_SIZE:(page + 1) * MARKET_PAGE_SIZE]:
+        price = item.get("price", 0)
+        desc = item.get("description", "")
+        rarity = item.get("rarity", "common").capitalize()
+        item_type = item.get("item_type", "misc").capitalize()
+        embed.add_field(
+            name=f"{item['item_name']} ({item_type}) - {price} coins",
+            value=f"{desc}\nRarity: {rarity}",
+            inline=False
+        )
+    return embed, page, max_page
+
+# Persistent like the shop views: the owner and target page live in the custom_id and the
+# button is registered in RPGCog.cog_load, so it outlives both the message's view and restarts.
+class RPGMarketPageButton(discord.ui.DynamicItem[discord.ui.Button], template=r"rpgmarket:(?P<user_id>\d+):(?P<direction>prev|next):(?P<page>\d+)"):
+    def __init__(self, user_id, direction, page, disabled=False):
+        super().__init__(discord.ui.Button(
+            label="Previous" if direction == "prev" else "Next",
+            style=discord.ButtonStyle.primary,
+            custom_id=f"rpgmarket:{user_id}:{direction}:{page}",
+            disabled=disabled,
+            row=0
+        ))
+        self.user_id = user_id
         self.page = page
-        self.items_per_page = items_per_page
-        self.max_page = max(0, (len(items) - 1) // items_per_page)
 
-    async def interaction_check(self, interaction: discord.Interaction) -> bool:
-        return interaction.user.id == self.ctx.author.id
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        return cls(int(match["user_id"]), match["direction"], int(match["page"]))
 
-    @discord.ui.button(label="Previous", style=discord.ButtonStyle.primary, row=0)
-    async def previous(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if self.page > 0:
-            self.page -= 1
-            await self.update_message(interaction)
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return interaction.user.id == self.user_id
 
-    @discord.ui.button(label="Next", style=discord.ButtonStyle.primary, row=0)
-    async def next(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if self.page < self.max_page:
-            self.page += 1
-            await self.update_message(interaction)
+    async def callback(self, interaction: discord.Interaction):
+        embed, page, max_page = market_page(self.page)
+        await interaction.response.edit_message(embed=embed, view=RPGMarketPageView(self.user_id, page, max_page))
 
-    async def update_message(self, interaction):
-        embed = discord.Embed(
-            title=f"RPG Marketplace (Page {self.page + 1}/{self.max_page + 1})",
-            description="Use `/rpgmarket buy <item name> [quantity]` or `/rpgmarket sell <item name> [quantity]`.\n",
-            color=discord.Color.blurple()
-        )
-        start = self.page * self.items_per_page
-        end = start + self.items_per_page
-        for item in self.items[start:end]:
-            price = item.get("price", 0)
-            desc = item.get("description", "")
-            rarity = item.get("rarity", "common").capitalize()
-            item_type = item.get("item_type", "misc").capitalize()
-            embed.add_field(
-                name=f"{item['item_name']} ({item_type}) - {price} coins",
-                value=f"{desc}\nRarity: {rarity}",
-                inline=False
-            )
-        # Update button states
-        self.children[0].disabled = self.page == 0
-        self.children[1].disabled = self.page == self.max_page
-        await interaction.response.edit_message(embed=embed, view=self)
+class RPGMarketPageView(discord.ui.View):
+    def __init__(self, user_id, page, max_page):
+        super().__init__(timeout=None)
+        self.add_item(RPGMarketPageButton(user_id, "prev", max(page - 1, 0), disabled=page == 0))
+        self.add_item(RPGMarketPageButton(user_id, "next", min(page + 1, max_page), disabled=page == max_page))
 
 class RPGCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.active_battles = {}
         self.active_parties = {}
         self.parties = {}
         self.party_counter = 1
         self.raid_turn_actions = {}  # {guild_id: set(user_ids who attacked this turn)}
-
-        # Load default monsters JSON once at cog init
-        monsters_path = os.path.join(
-            os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
-            "data", "default_monsters.json"
+        self.raid_states = RaidStateManager()  # Authoritative in-memory raid state per guild
+        self.locks = LockManager()  # Per-battle, per-party and per-guild-raid locks
+        # Solo and party fights plus per-player buffs/regen; idle fights are swept after a TTL
+        self.battles = BattleRegistry(is_busy=lambda key: self.locks.is_locked(*key), on_evict=self.notify_battle_evicted)
+        self.battle_store = BattleStateStore(self, getattr(bot, "shard_label", "all"))  # Snapshot + journal of parties and battles
+        self.battle_logs = BattleLogHistory()  # Recent rendered combat logs per user, for /rpglog
+
+    async def cog_load(self):
+        # Restore parties and in-progress fights in one bulk read before any command runs
+        try:
+            (battles, players, legacy_battles, self.active_parties,
+             self.parties, self.party_counter) = await asyncio.to_thread(self.battle_store.load)
+            self.battles.restore(battles, players)
+            self.battles.restore_legacy(legacy_battles, self.parties)
+        except Exception as e:
+            print(f"Failed to restore battle state: {e}")
+        self.battle_store.start()
+        self.raid_states.start()
+        self.battles.start()
+        # Marketplace and confirmation buttons are routed by custom_id, including those sent before a restart
+        self.bot.add_dynamic_items(RPGMarketPageButton, ConfirmButton)
+
+    async def cog_unload(self):
+        self.bot.remove_dynamic_items(RPGMarketPageButton, ConfirmButton)
+        # Checkpoint any unsaved raid, party and battle progress before shutting down
+        self.battles.stop()
+        await self.raid_states.stop()
+        await self.battle_store.stop()
+
+    async def notify_battle_evicted(self, battle):
+        # Tell the channel the fight started in that it was dropped for inactivity
+        channel = self.bot.get_channel(battle.channel_id) if battle.channel_id else None
+        if channel is None:
+            return
+        mentions = ", ".join(f"<@{uid}>" for uid in battle.participants)
+        await channel.send(
+            f"**{battle.monster['name']}** lost interest and wandered off after {self.battles.ttl // 60} minutes without an attack. ({mentions})"
         )
-        with open(monsters_path, "r", encoding="utf-8") as f:
-            self.default_monsters = json.load(f)
+
+    def battle_lock_key(self, user_id):
+        if user_id in self.active_parties:
+            return "party", self.active_parties[user_id]
+        return "battle", user_id
+
+    @asynccontextmanager
+    async def battle_lock(self, user_id):
+        """Hold the lock for the user's party (or solo battle), retrying if their party changed while waiting."""
+        while True:
+            kind, key = self.battle_lock_key(user_id)
+            async with self.locks.hold(kind, key):
+                if self.battle_lock_key(user_id) == (kind, key):
+                    yield
+                    return
 
     @commands.hybrid_command(name="treasurechest", description="Open a Treasure Chest for a random RPG reward!")
     @rpg_started()
@@ -268,7 +344,7 @@ class RPGCog(commands.Cog):
             update_player_inventory(user_id, ",".join(items))
             conn = sqlite3.connect(DB_PATH)
             cursor = conn.cursor()
-            cursor.execute("UPDATE eco_players SET coins = ? WHERE user_id = ?", (coins, str(user_id)))
+            cursor.execute(UPDATE_PLAYER_SQL["coins"], (coins, str(user_id)))
             conn.commit()
             conn.close()
             embed.description = f"You found **{reward['amount']} coins** inside the chest!"
@@ -277,7 +353,7 @@ class RPGCog(commands.Cog):
             # If "Random Weapon", pick a random buyable weapon
             if item_name == "Random Weapon":
                 weapon_items = [
-                    item for item in DEFAULT_ITEMS
+                    item for item in GAME_DATA.items
                     if item.get("item_type") == "weapons" and item.get("rarity") in ("common", "uncommon", "rare")
                 ]
                 if weapon_items:
@@ -298,36 +374,10 @@ class RPGCog(commands.Cog):
         coins, bank, inv = get_player(user_id)
         items = inv.split(",") if inv else []
 
-        # --- Define buyable and sellable items ---
-        # Buyable: common/rare consumables, common/uncommon weapons
-        buyable_items = [
-            item for item in DEFAULT_ITEMS
-            if (
-                (item.get("item_type") == "consumables" and item.get("rarity") in ("common", "uncommon", "rare") and not item.get("shop_hidden", False))
-                or (item.get("item_type") == "weapons" and item.get("rarity") in ("common", "uncommon") and not item.get("shop_hidden", False))
-            )
-        ]
-        # Sellable: all items in default_items.json
-        sellable_items = [item for item in DEFAULT_ITEMS]
-
         # Show marketplace if no action
         if not action:
-            view = RPGMarketPageView(ctx, buyable_items)
-            embed = discord.Embed(
-                title="RPG Marketplace (Page 1)",
-                description="Use `/rpgmarket buy <item name> [quantity]` or `/rpgmarket sell <item name> [quantity]`.",
-                color=discord.Color.blurple()
-            )
-            for item in buyable_items[:6]:
-                price = item.get("price", 0)
-                desc = item.get("description", "")
-                rarity = item.get("rarity", "common").capitalize()
-                embed.add_field(
-                    name=f"{item['item_name']} ({item['item_type'].capitalize()}) - {price} coins",
-                    value=f"{desc}\nRarity: {rarity}",
-                    inline=False
-                )
-            await ctx.send(embed=embed, view=view)
+            embed, page, max_page = market_page(0)
+            await ctx.send(embed=embed, view=RPGMarketPageView(user_id, page, max_page))
             return
 
         action = action.lower()
@@ -339,16 +389,18 @@ class RPGCog(commands.Cog):
             await ctx.send("Please specify the item name to buy or sell.")
             return
 
-        # Find the item (case-insensitive)
+        # Find the item (case- and space-insensitive); buyable: GAME_DATA.market_items, sellable: every RPG item
         if action == "buy":
-            item = next((i for i in buyable_items if i["item_name"].lower() == item_name.lower()), None)
+            name, suggestion = GAME_DATA.market_names.resolve(item_name)
+            item = GAME_DATA.items_by_name.get(name)
             if not item:
-                await ctx.send("That item is not available for purchase in the marketplace.")
+                await ctx.send(f"That item is not available for purchase in the marketplace.{did_you_mean(suggestion)}")
                 return
         else:  # sell
-            item = next((i for i in sellable_items if i["item_name"].lower() == item_name.lower()), None)
+            name, suggestion = GAME_DATA.item_names.resolve(item_name)
+            item = GAME_DATA.items_by_name.get(name)
             if not item:
-                await ctx.send("That item cannot be sold.")
+                await ctx.send(f"That item cannot be sold.{did_you_mean(suggestion)}")
                 return
 
         if quantity < 1:
@@ -369,7 +421,7 @@ class RPGCog(commands.Cog):
             new_coins = coins - total_price
             conn = sqlite3.connect(DB_PATH)
             cursor = conn.cursor()
-            cursor.execute("UPDATE eco_players SET coins = ? WHERE user_id = ?", (new_coins, str(user_id)))
+            cursor.execute(UPDATE_PLAYER_SQL["coins"], (new_coins, str(user_id)))
             conn.commit()
             conn.close()
 
@@ -393,12 +445,21 @@ class RPGCog(commands.Cog):
             new_coins = coins + sell_price
             conn = sqlite3.connect(DB_PATH)
             cursor = conn.cursor()
-            cursor.execute("UPDATE eco_players SET coins = ? WHERE user_id = ?", (new_coins, str(user_id)))
+            cursor.execute(UPDATE_PLAYER_SQL["coins"], (new_coins, str(user_id)))
             conn.commit()
             conn.close()
 
             await ctx.send(f"You sold {quantity}x **{item['item_name']}** for {sell_price} coins! (Coins now: {new_coins})")
 
+    @rpgmarket.autocomplete("item_name")
+    async def rpgmarket_autocomplete(self, interaction: discord.Interaction, current: str):
+        if (interaction.namespace.action or "").lower() == "sell":
+            return inventory_choices(interaction.user.id, current, keep=lambda name: name in GAME_DATA.items_by_name)
+        return [
+            discord.app_commands.Choice(name=f"{name} - {GAME_DATA.items_by_name[name].get('price', 0)} coins"[:100], value=name[:100])
+            for name in GAME_DATA.market_names.complete(current)
+        ]
+
     @commands.hybrid_command(name="rpgraid", description="Challenge a random weekly raid boss with your party!")
     @rpg_started()
     async def rpgraid(self, ctx):
@@ -416,19 +477,19 @@ class RPGCog(commands.Cog):
             return
 
         # Check for existing raid state
-        raid_state = load_raid_state(guild_id)
+        raid_state = self.raid_states.get(guild_id)
         now = datetime.datetime.utcnow()
-        if raid_state and raid_state["last_spawn"] and (now - raid_state["last_spawn"]).days < 7:
-            boss = raid_state["boss_data"]
+        if raid_state and raid_state.last_spawn and (now - raid_state.last_spawn).days < 7:
+            boss = raid_state.boss
             await ctx.send(
                 f"A raid boss (**{boss['name']}**) is already active!\n"
-                f"HP: {raid_state['boss_hp']}/{raid_state['boss_max_hp']}\n"
+                f"HP: {raid_state.hp}/{raid_state.max_hp}\n"
                 "Use `/rpgraidattack` to join the fight!"
             )
             return
 
         # Randomly select a raid boss from your monsters
-        raid_bosses = [m for m in self.default_monsters if m.get("rarity") == "raid"]
+        raid_bosses = [m for m in GAME_DATA.monsters if m.get("rarity") == "raid"]
         if not raid_bosses:
             await ctx.send("No raid boss is configured. Please ask an admin to add one to the monsters file.")
             return
@@ -439,19 +500,9 @@ class RPGCog(commands.Cog):
         boss = dict(raid_boss)
         boss["hp"] = boss["max_hp"] = int(boss["max_hp"] * (1 + 0.8 * (party_size - 1)))
 
-        # Set raid state
-        raid_state = {
-            "boss_name": boss["name"],
-            "boss_hp": boss["hp"],
-            "boss_max_hp": boss["max_hp"],
-            "boss_data": boss,
-            "participants": set(party["members"]),
-            "last_spawn": now
-        }
-        save_raid_state(guild_id, raid_state)
-        self.active_battles[f"raid_{guild_id}"] = boss
-        self.active_battles[f"raid_{guild_id}_regen_remainder"] = 0.0
-        boss["regen_remainder"] = 0.0
+        # Set raid state (the manager's copy is the only live boss)
+        raid_state = self.raid_states.create(guild_id, boss, party["members"], now)
+        boss = raid_state.boss
 
         member_mentions = ", ".join(f"<@{uid}>" for uid in party["members"])
         await ctx.send(
@@ -464,6 +515,11 @@ class RPGCog(commands.Cog):
     @commands.hybrid_command(name="rpgraidattack", description="Attack the weekly raid boss!")
     @rpg_started()
     async def rpgraidattack(self, ctx, spell_name: str = None, target: str = None):
+        # Serialize actions on this guild's raid so turn sets and boss HP stay consistent
+        async with self.locks.hold("raid", ctx.guild.id):
+            await self._raid_attack(ctx, spell_name, target)
+
+    async def _raid_attack(self, ctx, spell_name, target):
         guild_id = ctx.guild.id
         user_id = ctx.author.id
 
@@ -475,18 +531,18 @@ class RPGCog(commands.Cog):
             await ctx.send(f"You have already participated in a raid in the last 24 hours. Try again in {hours} hour(s).")
             return
 
-        raid_state = load_raid_state(guild_id)
-        if not raid_state or raid_state["boss_hp"] <= 0:
+        raid_state = self.raid_states.get(guild_id)
+        if not raid_state or raid_state.hp <= 0:
             await ctx.send("There is no active raid boss right now. Use `/rpgraid` to start one!")
             return
-        boss = raid_state["boss_data"]
+        boss = raid_state.boss
         stats = get_rpg_stats(user_id)
         if not stats:
             await ctx.send("You haven't started your adventure yet. Use `/rpgstart`.")
             return
 
         # Only allow party members who participated
-        if user_id not in raid_state["participants"]:
+        if user_id not in raid_state.participants:
             await ctx.send("You are not a participant in this week's raid.")
             return
 
@@ -495,7 +551,7 @@ class RPGCog(commands.Cog):
             await ctx.send("The current boss is not a raid-class monster.")
             return
 
-        party_members = raid_state["participants"]
+        party_members = raid_state.participants
 
         # --- Turn-based raid logic ---
         if guild_id not in self.raid_turn_actions:
@@ -507,9 +563,13 @@ class RPGCog(commands.Cog):
         # --- Player's attack logic ---
         target_type, target_user_id = self.resolve_attack_target(ctx, target, party_members)
         if spell_name:
-            msg = await self.handle_spell_attack(ctx, user_id, stats, spell_name, target_type, target_user_id, boss, party_members, raid_mode=True)
+            log = await self.handle_spell_attack(ctx, user_id, stats, spell_name, target_type, target_user_id, boss, party_members, raid_mode=True)
         else:
-            msg = await self.handle_player_attack(ctx, user_id, stats, boss, party_members, target_type, target_user_id, raid_mode=True)
+            log = await self.handle_player_attack(ctx, user_id, stats, boss, party_members, target_type, target_user_id, raid_mode=True)
+        if log.cancelled:
+            if log.events:
+                await ctx.send(log.render())
+            return
 
         # Save that this user has acted this turn
         self.raid_turn_actions[guild_id].add(user_id)
@@ -524,46 +584,50 @@ class RPGCog(commands.Cog):
             f"Waiting: {', '.join(not_attacked_mentions) if not_attacked_mentions else 'None'}"
         )
 
-        # Update persistent HP
-        raid_state["boss_hp"] = boss["hp"]
-        save_raid_state(guild_id, raid_state)
+        # HP lives on the in-memory boss; the manager checkpoints it in the background
+        self.raid_states.mark_dirty(guild_id)
 
         # If boss defeated, reward all participants and clear state
         if boss["hp"] <= 0:
-            for pid in raid_state["participants"]:
-                coins, bank, inv = get_player(pid)
-                items = inv.split(",") if inv else []
-                items.append(boss.get("loot", "Titan Relic"))
-                update_player_inventory(pid, ",".join(items))
+            participants = list(raid_state.participants)
+            # One batched write for loot and one for cooldowns, however large the raid
+            add_item_to_inventories(participants, boss.get("loot", "Titan Relic"))
+            set_cooldowns(participants, f"{RAID_COOLDOWN_COMMAND}_{guild_id}", now)
+            for pid in participants:
                 member = self.bot.get_user(pid)
                 if member:
                     try:
                         asyncio.create_task(member.send(f"You received a **{boss.get('loot', 'Titan Relic')}** for defeating the weekly raid boss!"))
                     except Exception:
                         pass
-                # Set raid cooldown for all participants
-                set_cooldown(pid, f"{RAID_COOLDOWN_COMMAND}_{guild_id}", now)
-            clear_raid_state(guild_id)
+            self.raid_states.clear(guild_id)
             self.raid_turn_actions[guild_id] = set()
-            msg += "\n**Your party has conquered the Weekly Raid Boss! All participants receive the reward!**"
-            await ctx.send(self.format_battle_message(msg))
+            log.add(ev.VICTORY, "**Your party has conquered the Weekly Raid Boss! All participants receive the reward!**")
+            text = log.render()
+            self.battle_logs.record(participants, boss["name"], text)
+            await ctx.send(text)
             return
 
         # Show the result of the player's attack and party turn status
-        await ctx.send(self.format_battle_message(msg) + "\n" + status_msg)
+        text = log.render()
+        self.battle_logs.record([user_id], boss["name"], text)
+        await ctx.send(text + "\n" + status_msg)
 
         # --- Only after all party members have acted, boss attacks and regen happens ---
         if self.raid_turn_actions[guild_id] >= set(party_members):
             # Boss attacks a random alive party member
-            alive_members = [pid for pid in party_members if get_rpg_stats(pid)[2] > 0]
+            alive_members, member_stats = get_alive_members(party_members)
             if alive_members:
-                target_id = random.choice(list(alive_members))
-                target_stats = get_rpg_stats(target_id)
-                boss_msg = f"\n**Raid Boss's Turn!**\n"
-                boss_msg = self.monster_attack_phase(ctx, target_id, boss, target_stats, boss_msg)
+                target_id = random.choice(alive_members)
+                target_stats = member_stats[target_id]
+                boss_log = BattleLog()
+                boss_log.add(ev.TURN, "**Raid Boss's Turn!**")
+                self.monster_attack_phase(ctx, boss_log, target_id, boss, target_stats)
                 # Boss regen phase (after attack)
-                boss_msg += self.regen_phase(target_id, boss, target_stats, target_stats[2], target_stats[3], target_stats[16], target_stats[18], target_stats[15], target_stats[17])
-                await ctx.send(boss_msg)
+                self.regen_phase(boss_log, target_id, boss, target_stats, target_stats[2], target_stats[3], target_stats[16], target_stats[18], target_stats[15], target_stats[17])
+                text = boss_log.render()
+                self.battle_logs.record(party_members, boss["name"], text)
+                await ctx.send(text)
             # Reset for next turn
             self.raid_turn_actions[guild_id] = set()
     
@@ -588,7 +652,8 @@ class RPGCog(commands.Cog):
             "leader": user_id,
             "quest": None,
             "progress": 0,
-            "invited": set()
+            "invited": set(),
+            "guild_id": ctx.guild.id if ctx.guild else None
         }
         self.active_parties[user_id] = party_id
         await ctx.send(f"Party created! You are the leader. Party ID: {party_id}")
@@ -596,6 +661,10 @@ class RPGCog(commands.Cog):
     @rpgparty.command(name="invite")
     @rpg_started()
     async def party_invite(self, ctx, member: discord.Member):
+        async with self.battle_lock(ctx.author.id):
+            await self._party_invite(ctx, member)
+
+    async def _party_invite(self, ctx, member):
         user_id = ctx.author.id
         if user_id not in self.active_parties:
             await ctx.send("You are not in a party.")
@@ -621,6 +690,10 @@ class RPGCog(commands.Cog):
     @rpgparty.command(name="join")
     @rpg_started()
     async def party_join(self, ctx, party_id: int):
+        async with self.locks.hold("party", party_id):
+            await self._party_join(ctx, party_id)
+
+    async def _party_join(self, ctx, party_id):
         user_id = ctx.author.id
         if user_id in self.active_parties:
             await ctx.send("You are already in a party.")
@@ -640,6 +713,10 @@ class RPGCog(commands.Cog):
     @rpgparty.command(name="leave")
     @rpg_started()
     async def party_leave(self, ctx):
+        async with self.battle_lock(ctx.author.id):
+            await self._party_leave(ctx)
+
+    async def _party_leave(self, ctx):
         user_id = ctx.author.id
         if user_id not in self.active_parties:
             await ctx.send("You are not in a party.")
@@ -661,6 +738,10 @@ class RPGCog(commands.Cog):
     @rpgparty.command(name="kick")
     @rpg_started()
     async def party_kick(self, ctx, member: discord.Member):
+        async with self.battle_lock(ctx.author.id):
+            await self._party_kick(ctx, member)
+
+    async def _party_kick(self, ctx, member):
         user_id = ctx.author.id
         if user_id not in self.active_parties:
             await ctx.send("You are not in a party.")
@@ -684,6 +765,10 @@ class RPGCog(commands.Cog):
     @rpgparty.command(name="promote")
     @rpg_started()
     async def party_promote(self, ctx, member: discord.Member):
+        async with self.battle_lock(ctx.author.id):
+            await self._party_promote(ctx, member)
+
+    async def _party_promote(self, ctx, member):
         user_id = ctx.author.id
         if user_id not in self.active_parties:
             await ctx.send("You are not in a party.")
@@ -732,7 +817,7 @@ class RPGCog(commands.Cog):
         Ignores guild_id (all guilds get the same default quests).
         """
         quests = {}
-        for q in QUESTS:
+        for q in GAME_DATA.quests:
             quests[q["quest_name"]] = {
                 "desc": q["description"],
                 "target": q["target"],
@@ -767,8 +852,10 @@ class RPGCog(commands.Cog):
 
         action = action.lower()
         if action == "accept":
+            name, suggestion = GAME_DATA.quest_names.resolve(quest)
+            quest = name or quest
             if not quest or quest not in quests:
-                await ctx.send(f"Specify a valid quest to accept. Available: {', '.join(quests.keys())}")
+                await ctx.send(f"Specify a valid quest to accept.{did_you_mean(suggestion)} Available: {', '.join(quests.keys())}")
                 return
             if current_quest:
                 await ctx.send(f"You already have an active quest: **{current_quest}**. Use `/rpgquest abandon` to abandon it first.")
@@ -808,22 +895,29 @@ class RPGCog(commands.Cog):
         else:
             await ctx.send("Usage: `/rpgquest`, `/rpgquest accept <quest name>`, `/rpgquest status`, `/rpgquest abandon`")
 
+    @rpgquest.autocomplete("quest")
+    async def rpgquest_autocomplete(self, interaction: discord.Interaction, current: str):
+        if (interaction.namespace.action or "").lower() != "accept":
+            return []
+        return [discord.app_commands.Choice(name=name[:100], value=name[:100]) for name in GAME_DATA.quest_names.complete(current)]
+
     # Example: Party quest progress update (call this in your battle logic)
     async def update_party_quest_progress(self, user_id, monster_name):
+        # Takes the party lock itself, so do not call it while already holding that lock
         if user_id not in self.active_parties:
             return
         party_id = self.active_parties[user_id]
-        party = self.parties[party_id]
+        async with self.locks.hold("party", party_id):
+            party = self.parties.get(party_id)
+            if party is None:
+                return
+            await self._update_party_quest_progress(user_id, party, monster_name)
+
+    async def _update_party_quest_progress(self, user_id, party, monster_name):
         if not party["quest"]:
             return
-        guild_id = None
-        for g in self.bot.guilds:
-            if g.get_member(user_id):
-                guild_id = g.id
-                break
-        if not guild_id:
-            return
-        quests = self.get_quests(guild_id)
+        # The party remembers its guild; scanning self.bot.guilds breaks when the guild lives on another shard process
+        quests = self.get_quests(party.get("guild_id"))
         quest = quests.get(party["quest"])
         if not quest:
             return
@@ -841,13 +935,10 @@ class RPGCog(commands.Cog):
                         pass
             # Complete quest
             if party["progress"] >= int(quest["amount"]):
+                # Give reward to each member in one batch
+                add_item_to_inventories(party["members"], quest["reward"])
+                update_many_rpg_stats({m_id: {"quest": None, "quest_progress": 0} for m_id in party["members"]})
                 for m_id in party["members"]:
-                    # Give reward to each member
-                    coins, bank, inv = get_player(m_id)
-                    items = inv.split(",") if inv else []
-                    items.append(quest["reward"])
-                    update_player_inventory(m_id, ",".join(items))
-                    update_rpg_stats(m_id, quest=None, quest_progress=0)
                     member = self.bot.get_user(m_id)
                     if member:
                         try:
@@ -865,7 +956,7 @@ class RPGCog(commands.Cog):
         def add_player_if_not_exists(user_id):
             conn = sqlite3.connect(DB_PATH)
             cursor = conn.cursor()
-            cursor.execute("INSERT OR IGNORE INTO eco_players (user_id, coins, bank, inventory) VALUES (?, 0, 0, '')", (str(user_id),))
+            cursor.execute(ADD_PLAYER_SQL, (str(user_id),))
             conn.commit()
             conn.close()
         add_player_if_not_exists(user_id)
@@ -873,7 +964,7 @@ class RPGCog(commands.Cog):
         # Check if user already exists in rpg_stats
         conn = sqlite3.connect(DB_PATH)
         cursor = conn.cursor()
-        cursor.execute("SELECT 1 FROM rpg_stats WHERE user_id = ?", (str(user_id),))
+        cursor.execute(RPG_STATS_EXISTS_SQL, (str(user_id),))
         exists = cursor.fetchone()
         if exists:
             conn.close()
@@ -883,13 +974,7 @@ class RPGCog(commands.Cog):
         exp_to_next = exp_to_next_level(1)
         conn = sqlite3.connect(DB_PATH)
         cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO rpg_stats (
-                user_id, level, exp, hp, max_hp, atk, defense, char_class, weapon, quest, quest_progress, skill_points,
-                strength, dexterity, intelligence, exp_to_next, hp_regen, mana, mana_regen, max_mana, crit_chance,
-                crit_damage, evasion_chance, bonus_spell_dmg
-            ) VALUES (?, 1, 0, 20, 20, 5, 2, NULL, '', '', 0, 5, 0, 0, 0, 27, 0.5, 5, 0.2, 5, 0.01, 1.0, 0.01, 0)
-        """, (str(user_id),))
+        cursor.execute(CREATE_RPG_STATS_SQL, (str(user_id),))
         conn.commit()
         conn.close()
         await ctx.send(
@@ -964,11 +1049,11 @@ class RPGCog(commands.Cog):
         embed.set_footer(text=f"Coins: {coins} | Bank: {bank}")
 
         # --- Add equipped spells if class is chosen ---
-        if char_class and char_class in SPELLS:
+        if char_class and char_class in GAME_DATA.spells:
             # Load equipped spells from DB
             conn = sqlite3.connect(DB_PATH)
             cursor = conn.cursor()
-            cursor.execute("SELECT equipped_spells FROM rpg_stats WHERE user_id = ?", (str(user_id),))
+            cursor.execute(GET_EQUIPPED_SPELLS_SQL, (str(user_id),))
             row = cursor.fetchone()
             conn.close()
             if row and row[0]:
@@ -1192,7 +1277,7 @@ class RPGCog(commands.Cog):
         if user_id in self.active_parties:
             party_id = self.active_parties[user_id]
             party = self.parties[party_id]
-            if party_id in self.active_battles:
+            if ("party", party_id) in self.battles:
                 await ctx.send("Your party is already in a battle! Use `/rpgattack`.")
                 return
             if party["leader"] != user_id:
@@ -1200,14 +1285,10 @@ class RPGCog(commands.Cog):
                 return
             party_members = party["members"]
             # Calculate average party level
-            levels = []
-            for pid in party_members:
-                pstats = get_rpg_stats(pid)
-                if pstats:
-                    levels.append(pstats[0])
+            levels = [pstats[0] for pstats in get_many_rpg_stats(party_members).values()]
             avg_level = int(sum(levels) / len(levels)) if levels else 1
         else:
-            if user_id in self.active_battles:
+            if ("battle", user_id) in self.battles:
                 await ctx.send("You are already in a battle! Use `/rpgattack`.")
                 return
             party_members = {user_id}
@@ -1318,29 +1399,35 @@ class RPGCog(commands.Cog):
                 return
 
         # --- Start the encounter ---
-        if party_size > 1:
-            party_id = self.active_parties[user_id]
-            self.active_battles[party_id] = monster
-            self.active_battles[f"{party_id}_regen_remainder"] = 0.0
-            monster["regen_remainder"] = 0.0
-            member_mentions = ", ".join(f"<@{uid}>" for uid in party_members)
-            await ctx.send(
-                f"Your party ({member_mentions}) encounters **{monster['name']}** ({monster['rarity'].capitalize()})!\n"
-                f"HP: {monster['hp']}, ATK: {monster['atk']}\n"
-                "All party members can use `/rpgattack` to fight!"
-            )
-        else:
-            self.active_battles[user_id] = monster
-            self.active_battles[f"{user_id}_regen_remainder"] = 0.0
+        async with self.battle_lock(user_id):
+            # Re-check under the lock: another encounter may have started while we waited
+            battle_key = self.battle_lock_key(user_id)
+            if battle_key in self.battles:
+                await ctx.send("You are already in a battle! Use `/rpgattack`.")
+                return
             monster["regen_remainder"] = 0.0
-            await ctx.send(
-                f"A wild **{monster['name']}** ({monster['rarity'].capitalize()}) appears! (HP: {monster['hp']}, ATK: {monster['atk']})\n"
-                "Use `/rpgattack` to fight!"
-            )
+            self.battles.start_battle(battle_key, monster, party_members, ctx.channel.id)
+            if party_size > 1:
+                member_mentions = ", ".join(f"<@{uid}>" for uid in party_members)
+                await ctx.send(
+                    f"Your party ({member_mentions}) encounters **{monster['name']}** ({monster['rarity'].capitalize()})!\n"
+                    f"HP: {monster['hp']}, ATK: {monster['atk']}\n"
+                    "All party members can use `/rpgattack` to fight!"
+                )
+            else:
+                await ctx.send(
+                    f"A wild **{monster['name']}** ({monster['rarity'].capitalize()}) appears! (HP: {monster['hp']}, ATK: {monster['atk']})\n"
+                    "Use `/rpgattack` to fight!"
+                )
 
     @commands.hybrid_command(name="rpgattack", description="Attack the monster! (Use /rpgattack [spell name] [target] to cast a spell)")
     @rpg_started()
     async def rpgattack(self, ctx, spell_name: str = None, target: str = None):
+        # Same-battle actions are serialized; different battles run in parallel
+        async with self.battle_lock(ctx.author.id):
+            await self._attack(ctx, spell_name, target)
+
+    async def _attack(self, ctx, spell_name, target):
         user_id = ctx.author.id
         stats = get_rpg_stats(user_id)
         if not stats:
@@ -1348,19 +1435,15 @@ class RPGCog(commands.Cog):
             return
 
         # --- Party/monster setup ---
-        if user_id in self.active_parties:
-            party_id = self.active_parties[user_id]
-            monster = self.active_battles.get(party_id)
-            party_members = self.parties[party_id]["members"]
-            turn_key = f"party_{party_id}"
-        else:
-            monster = self.active_battles.get(user_id)
-            party_members = {user_id}
-            turn_key = f"solo_{user_id}"
-
-        if not monster:
+        battle = self.battles.get(self.battle_lock_key(user_id))
+        if battle is None:
             await ctx.send("You are not in a battle. Use `/rpgencounter`.")
             return
+        monster = battle.monster
+        if battle.kind == "party":
+            party_members = self.parties[battle.owner_id]["members"]
+        else:
+            party_members = {user_id}
 
         # Prevent solo players from attacking raid monsters
         if monster and monster.get("rarity") == "raid" and user_id not in self.active_parties:
@@ -1369,12 +1452,7 @@ class RPGCog(commands.Cog):
 
         # --- Turn-based logic for parties ---
         if len(party_members) > 1:
-            if not hasattr(self, "party_turn_actions"):
-                self.party_turn_actions = {}
-            # Defensive: always initialize the turn set
-            if turn_key not in self.party_turn_actions:
-                self.party_turn_actions[turn_key] = set()
-            if user_id in self.party_turn_actions[turn_key]:
+            if user_id in battle.acted:
                 await ctx.send("You have already attacked this turn. Wait for your party to finish their moves!")
                 return
 
@@ -1383,15 +1461,20 @@ class RPGCog(commands.Cog):
 
         # --- Spell casting logic ---
         if spell_name:
-            msg = await self.handle_spell_attack(ctx, user_id, stats, spell_name, target_type, target_user_id, monster, party_members)
+            log = await self.handle_spell_attack(ctx, user_id, stats, spell_name, target_type, target_user_id, monster, party_members)
         else:
-            msg = await self.handle_player_attack(ctx, user_id, stats, monster, party_members, target_type, target_user_id)
+            log = await self.handle_player_attack(ctx, user_id, stats, monster, party_members, target_type, target_user_id)
+        if log.cancelled:
+            # Nothing happened; the player keeps their turn
+            if log.events:
+                await ctx.send(log.render())
+            return
 
         # Save that this user has acted this turn (for parties)
         if len(party_members) > 1:
-            self.party_turn_actions[turn_key].add(user_id)
+            battle.acted.add(user_id)
             # Display party turn progress
-            attacked_ids = self.party_turn_actions[turn_key]
+            attacked_ids = battle.acted
             attacked_mentions = [f"<@{uid}>" for uid in attacked_ids]
             not_attacked_mentions = [f"<@{uid}>" for uid in party_members if uid not in attacked_ids]
             status_msg = (
@@ -1403,28 +1486,29 @@ class RPGCog(commands.Cog):
             status_msg = ""
 
         # Show the result of the player's attack and party turn status
-        await ctx.send(self.format_battle_message(msg) + ("\n" + status_msg if status_msg else ""))
+        text = log.render()
+        self.battle_logs.record(party_members, monster["name"], text)
+        await ctx.send(text + ("\n" + status_msg if status_msg else ""))
 
         # If monster is defeated, clean up and return
-        if monster["hp"] <= 0:
-            if len(party_members) > 1:
-                self.active_battles.pop(party_id, None)
-                self.party_turn_actions.pop(turn_key, None)
-            else:
-                self.active_battles.pop(user_id, None)
+        if log.monster_defeated:
+            self.battles.end(battle.key)
             return
 
         # If all party members have acted, monster attacks a random alive party member
-        if len(party_members) > 1 and self.party_turn_actions[turn_key] >= set(party_members):
-            alive_members = [pid for pid in party_members if get_rpg_stats(pid)[2] > 0]
+        if len(party_members) > 1 and battle.acted >= set(party_members):
+            alive_members, member_stats = get_alive_members(party_members)
             if alive_members:
-                target_id = random.choice(list(alive_members))
-                target_stats = get_rpg_stats(target_id)
-                boss_msg = f"\n**Monster's Turn!**\n"
-                boss_msg = self.monster_attack_phase(ctx, target_id, monster, target_stats, boss_msg)
-                await ctx.send(boss_msg)
+                target_id = random.choice(alive_members)
+                target_stats = member_stats[target_id]
+                boss_log = BattleLog()
+                boss_log.add(ev.TURN, "**Monster's Turn!**")
+                self.monster_attack_phase(ctx, boss_log, target_id, monster, target_stats)
+                text = boss_log.render()
+                self.battle_logs.record(party_members, monster["name"], text)
+                await ctx.send(text)
             # Reset for next turn
-            self.party_turn_actions[turn_key] = set()
+            battle.acted = set()
 
     def resolve_attack_target(self, ctx, target, party_members):
         user_id = ctx.author.id
@@ -1456,44 +1540,47 @@ class RPGCog(commands.Cog):
             crit_damage, evasion_chance, bonus_spell_dmg
         ) = stats
 
-        if not char_class or char_class not in SPELLS:
-            return "You must choose a class to use spells. Use `/rpgclass`."
-        spell = next((s for s in SPELLS[char_class] if s["name"].lower() == spell_name.lower()), None)
-        if not spell:
-            return "Spell not found. Use `/rpgspells` to see your available spells."
-        if mana < spell["mana"]:
-            return f"Not enough mana! You have {mana:.1f}/{max_mana:.1f} mana."
+        log = BattleLog()
+        if not char_class or char_class not in GAME_DATA.spells:
+            log.add(ev.INFO, "You must choose a class to use spells. Use `/rpgclass`.")
+        else:
+            name, suggestion = GAME_DATA.spell_names[char_class].resolve(spell_name)
+            spell = GAME_DATA.spells_by_name[char_class].get(name)
+            if not spell:
+                log.add(ev.INFO, f"Spell not found.{did_you_mean(suggestion)} Use `/rpgspells` to see your available spells.")
+            elif mana < spell["mana"]:
+                log.add(ev.INFO, f"Not enough mana! You have {mana:.1f}/{max_mana:.1f} mana.")
+        if log.events:
+            log.cancelled = True
+            return log
 
         msg, updates = await self.handle_spell_cast(
             ctx, user_id, spell, spell_name, char_class, atk, strength, dexterity, intelligence,
             bonus_spell_dmg, max_hp, hp, max_mana, mana, weapon, party_members, target_type, target_user_id, monster
         )
+        if updates is None:
+            # The cast was rejected and already explained to the player
+            log.cancelled = True
+            return log
+        log.add(ev.SPELL, msg)
         updates["mana"] = updates.get("mana", mana - spell["mana"])
         update_rpg_stats(user_id, **updates)
 
         # Monster debuffs and defeat check
         msg_debuff, monster_dead = self.process_monster_debuffs(monster)
-        msg += msg_debuff
+        log.add(ev.DEBUFF, msg_debuff)
         if monster_dead or monster["hp"] <= 0:
-            msg += self.handle_monster_defeat(ctx, user_id, monster, stats, msg, weapon, quest, quest_progress)
-            return msg
+            log.monster_defeated = True
+            log.add(ev.VICTORY, self.handle_monster_defeat(ctx, user_id, monster, stats, msg, weapon, quest, quest_progress))
+            return log
 
         if raid_mode:
             # In raid mode, do not process monster attack or regen here
-            return self.format_battle_message(msg)
+            return log
 
-        msg += self.monster_attack_phase(ctx, user_id, monster, stats, "")
-        msg += self.regen_phase(user_id, monster, stats, hp, max_hp, mana, max_mana, hp_regen, mana_regen)
-        return self.format_battle_message(msg)
-
-    def format_battle_message(self, msg):
-        import re
-        # Remove accidental newlines after decimals
-        msg = re.sub(r'(\d+)\.\n(\d+)', r'\1.\2', msg)
-        # Remove accidental double newlines
-        msg = re.sub(r'\n{2,}', r'\n', msg)
-        # Strip leading/trailing whitespace and ensure single newline between events
-        return msg.strip()
+        self.monster_attack_phase(ctx, log, user_id, monster, stats)
+        self.regen_phase(log, user_id, monster, stats, hp, max_hp, mana, max_mana, hp_regen, mana_regen)
+        return log
 
     async def handle_player_attack(self, ctx, user_id, stats, monster, party_members, target_type, target_user_id, raid_mode=False):
         (
@@ -1502,92 +1589,92 @@ class RPGCog(commands.Cog):
             crit_damage, evasion_chance, bonus_spell_dmg
         ) = stats
 
-        msg = ""
+        log = BattleLog()
         # --- Player buffs/debuffs ---
-        player_state = self.active_battles.setdefault(f"{user_id}_state", {})
-        atk_mod, def_mod, evasion_mod, spell_dmg_mod = self.process_player_buffs(user_id, player_state)
+        player_state = self.battles.player_effects(user_id)
+        atk_mod, def_mod, evasion_mod, spell_dmg_mod = self.process_player_buffs(user_id, player_state, stats)
         str_bonus = strength // 2
         int_bonus = intelligence // 2
 
         # --- Monster debuffs and defeat check ---
         msg_debuff, monster_dead = self.process_monster_debuffs(monster)
-        msg += msg_debuff
+        log.add(ev.DEBUFF, msg_debuff)
         if monster_dead:
-            msg += self.handle_monster_defeat(ctx, user_id, monster, stats, msg, weapon, quest, quest_progress)
-            return msg
+            log.monster_defeated = True
+            log.add(ev.VICTORY, self.handle_monster_defeat(ctx, user_id, monster, stats, msg_debuff, weapon, quest, quest_progress))
+            return log
 
         # --- Initiative roll: who attacks first? ---
         if raid_mode:
             # Only do the player's attack, skip monster attack and regen
-            msg += await self._player_attack_sequence(
-                ctx, user_id, stats, monster, party_members, target_type, target_user_id,
+            await self._player_attack_sequence(
+                ctx, log, user_id, stats, monster, party_members, target_type, target_user_id,
                 atk_mod, str_bonus, crit_chance, crit_damage, weapon, bonus_spell_dmg,
                 hp, max_hp, mana, max_mana, hp_regen, mana_regen, quest, quest_progress
             )
-            return msg
+            return log
 
         player_first = random.choice([True, False])
         if player_first:
             # Player attacks first
-            msg += await self._player_attack_sequence(
-                ctx, user_id, stats, monster, party_members, target_type, target_user_id,
+            await self._player_attack_sequence(
+                ctx, log, user_id, stats, monster, party_members, target_type, target_user_id,
                 atk_mod, str_bonus, crit_chance, crit_damage, weapon, bonus_spell_dmg,
                 hp, max_hp, mana, max_mana, hp_regen, mana_regen, quest, quest_progress
             )
             # If monster is defeated, skip monster attack and regen
-            if monster["hp"] <= 0:
-                return msg
+            if log.monster_defeated:
+                return log
             # Monster attacks
-            msg += self.monster_attack_phase(ctx, user_id, monster, stats, "")
-            # If monster is defeated after monster attack, skip regen
-            if monster["hp"] <= 0:
-                return msg
+            self.monster_attack_phase(ctx, log, user_id, monster, stats)
+            # If player is defeated, skip regen
+            if log.player_defeated:
+                return log
             # Regen phase
-            msg += self.regen_phase(user_id, monster, stats, hp, max_hp, mana, max_mana, hp_regen, mana_regen)
+            self.regen_phase(log, user_id, monster, stats, hp, max_hp, mana, max_mana, hp_regen, mana_regen)
         else:
             # Monster attacks first
-            msg += self.monster_attack_phase(ctx, user_id, monster, stats, "")
+            self.monster_attack_phase(ctx, log, user_id, monster, stats)
             # If player is defeated, skip player attack and regen
-            if "You have been defeated!" in msg:
-                return msg
+            if log.player_defeated:
+                return log
             # Player attacks
-            msg += await self._player_attack_sequence(
-                ctx, user_id, stats, monster, party_members, target_type, target_user_id,
+            await self._player_attack_sequence(
+                ctx, log, user_id, stats, monster, party_members, target_type, target_user_id,
                 atk_mod, str_bonus, crit_chance, crit_damage, weapon, bonus_spell_dmg,
                 hp, max_hp, mana, max_mana, hp_regen, mana_regen, quest, quest_progress
             )
             # If monster is defeated after player attack, skip regen
-            if monster["hp"] <= 0:
-                return msg
+            if log.monster_defeated:
+                return log
             # Regen phase
-            msg += self.regen_phase(user_id, monster, stats, hp, max_hp, mana, max_mana, hp_regen, mana_regen)
-        return self.format_battle_message(msg)
+            self.regen_phase(log, user_id, monster, stats, hp, max_hp, mana, max_mana, hp_regen, mana_regen)
+        return log
     
     async def _player_attack_sequence(
-        self, ctx, user_id, stats, monster, party_members, target_type, target_user_id,
+        self, ctx, log, user_id, stats, monster, party_members, target_type, target_user_id,
         atk_mod, str_bonus, crit_chance, crit_damage, weapon, bonus_spell_dmg,
         hp, max_hp, mana, max_mana, hp_regen, mana_regen, quest, quest_progress
     ):
-        msg = ""
         crit = random.random() < crit_chance
         monster_evasion = monster.get("evasion_chance", 0.0)
 
         # --- FIX: Case-insensitive weapon lookup ---
-        actual_weapon = next((w for w in WEAPON_ITEMS if w.lower() == (weapon or "").lower()), None)
+        actual_weapon = GAME_DATA.weapon_names.get(weapon)
         if not actual_weapon:
             weapon_bonus = 0
             attack_flavor = "You have no weapon equipped! You attack bare-handed with your base strength.\n"
             weapon_item = {"damage": 0, "rarity": "common"}
         else:
-            weapon_item = WEAPON_ITEMS[actual_weapon]
+            weapon_item = GAME_DATA.weapon_items[actual_weapon]
             weapon_bonus = weapon_item.get("damage", 0)
             attack_flavor = ""
 
         if weapon_item.get("effect") == "never_miss":
             monster_evasion = 0
         if random.random() < monster_evasion:
-            msg += f"The {monster['name']} evaded your attack!\n"
-            return msg
+            log.add(ev.EVADE, f"The {monster['name']} evaded your attack!")
+            return
 
         effect_msgs = []
         # --- More randomized damage ---
@@ -1613,21 +1700,15 @@ class RPGCog(commands.Cog):
 
         monster["hp"] -= base_dmg
 
-        # Always start player's attack on a new line
-        if msg and not msg.endswith('\n'):
-            msg += '\n'
-        msg += f"You attack the {monster['name']} for {round(base_dmg, 1)} damage! (Monster HP: {max(round(monster['hp'], 1), 0)})\n"
+        log.add(ev.ATTACK, f"You attack the {monster['name']} for {round(base_dmg, 1)} damage! (Monster HP: {max(round(monster['hp'], 1), 0)})")
         if crit:
-            msg += "**Critical hit!**\n"
-        if effect_msgs:
-            msg += "\n".join(effect_msgs) + "\n"
+            log.add(ev.CRIT, "**Critical hit!**")
+        for effect_msg in effect_msgs:
+            log.add(ev.EFFECT, effect_msg)
 
         if monster["hp"] <= 0:
-            msg += self.handle_monster_defeat(ctx, user_id, monster, stats, msg, weapon, quest, quest_progress)
-            return msg
-        if msg and not msg.endswith('\n'):
-            msg += '\n'
-        return msg
+            log.monster_defeated = True
+            log.add(ev.VICTORY, self.handle_monster_defeat(ctx, user_id, monster, stats, log.render(), weapon, quest, quest_progress))
 
     async def handle_spell_cast(
         self, ctx, user_id, spell, spell_name, char_class, atk, strength, dexterity, intelligence,
@@ -1639,7 +1720,7 @@ class RPGCog(commands.Cog):
         """
         updates = {}
         msg = ""
-        player_state = self.active_battles.setdefault(f"{user_id}_state", {})
+        player_state = self.battles.player_effects(user_id)
 
         # Prevent self-targeting with damaging spells
         if spell["spell_type"] == "damage" and target_type == "self":
@@ -1671,13 +1752,13 @@ class RPGCog(commands.Cog):
                 monster["stunned"] = True
                 msg += "The enemy is stunned!\n"
             if spell["effect"] == "assassin_poison_blade":
-                monster.setdefault("debuffs", {})["poison"] = 3
+                GAME_DATA.effects.apply(monster, "poison", 3, monster=True)
                 msg += "The enemy is poisoned for 3 turns!\n"
             if spell["effect"] == "mage_frost_nova":
-                monster.setdefault("debuffs", {})["frost_nova"] = 2
+                GAME_DATA.effects.apply(monster, "frost_nova", 2, monster=True)
                 msg += "The enemy's attack is reduced for 2 turns!\n"
             if spell["effect"] == "assassin_mark_for_death":
-                monster.setdefault("debuffs", {})["mark_for_death"] = 2
+                GAME_DATA.effects.apply(monster, "mark_for_death", 2, monster=True)
                 msg += "The enemy is marked for death for 2 turns!\n"
 
         # --- Buff Spells ---
@@ -1685,7 +1766,7 @@ class RPGCog(commands.Cog):
             if spell["effect"] in ("warrior_battle_cry", "warrior_iron_wall", "warrior_taunt", "assassin_smoke_bomb", "assassin_adrenaline_rush", "mage_ice_barrier", "mage_arcane_surge", "mage_mana_shield", "mage_haste", "assassin_vanish"):
                 # Use spell.amount as turns or value
                 buff_name = spell["effect"].replace(f"{char_class.lower()}_", "")
-                player_state.setdefault("buffs", {})[buff_name] = int(spell.get("amount", 2))
+                GAME_DATA.effects.apply(player_state, buff_name, int(spell.get("amount", 2)))
                 msg += f"You cast {spell['name']}! Buff applied for {spell.get('amount', 2)} turns.\n"
             elif spell["effect"] == "warrior_second_wind":
                 heal = int(max_hp * spell.get("amount", 0.25)) + strength + bonus_spell_dmg
@@ -1697,12 +1778,11 @@ class RPGCog(commands.Cog):
                 if user_id in self.active_parties:
                     party_id = self.active_parties[user_id]
                     party_members = self.parties[party_id]["members"]
-                    for pid in party_members:
-                        p_stats = get_rpg_stats(pid)
-                        if p_stats:
-                            p_hp, p_max_hp = p_stats[2], p_stats[3]
-                            new_hp = min(p_max_hp, p_hp + heal)
-                            update_rpg_stats(pid, hp=new_hp)
+                    party_stats = get_many_rpg_stats(party_members)
+                    update_many_rpg_stats({
+                        pid: {"hp": min(p_stats[3], p_stats[2] + heal)}
+                        for pid, p_stats in party_stats.items()
+                    })
                     msg += f"You rally your party! All members heal {round(heal,1):.1f} HP.\n"
                 else:
                     hp = min(max_hp, hp + heal)
@@ -1728,35 +1808,35 @@ class RPGCog(commands.Cog):
                     updates["hp"] = hp
                     msg += f"You cast Heal and restore {round(heal,1):.1f} HP to yourself! (Your HP: {round(hp,1):.1f}/{round(max_hp,1):.1f})\n"
             elif spell["effect"] == "assassin_vanish":
-                player_state.setdefault("buffs", {})["vanish"] = 1
+                GAME_DATA.effects.apply(player_state, "vanish", 1)
                 heal = spell.get("amount", 8) + bonus_spell_dmg
                 hp = min(max_hp, hp + heal)
                 updates["hp"] = hp
                 msg += f"You vanish into the shadows, becoming untargetable for 1 turn and healing {round(heal,1):.1f} HP! (Your HP: {round(hp,1):.1f}/{round(max_hp,1):.1f})\n"
             elif spell["effect"] == "assassin_adrenaline_rush":
-                player_state.setdefault("buffs", {})["adrenaline_rush"] = spell.get("amount", 2)
+                GAME_DATA.effects.apply(player_state, "adrenaline_rush", spell.get("amount", 2))
                 mana_restored = min(max_mana - mana, 5 + bonus_spell_dmg)
                 updates["mana"] = mana + mana_restored
                 msg += f"You surge with adrenaline! Restored {round(mana_restored,1):.1f} mana and increased crit chance for 2 turns.\n"
             elif spell["effect"] == "mage_arcane_surge":
                 mana_restored = min(max_mana - mana, 8 + bonus_spell_dmg)
                 updates["mana"] = mana + mana_restored
-                player_state.setdefault("buffs", {})["arcane_surge"] = spell.get("amount", 3)
+                GAME_DATA.effects.apply(player_state, "arcane_surge", spell.get("amount", 3))
                 msg += f"You surge with arcane power! Restored {round(mana_restored,1):.1f} mana and increased spell damage for 3 turns.\n"
 
         # --- Debuff Spells ---
         elif spell["spell_type"] == "debuff":
             if spell["effect"] == "warrior_taunt":
                 monster["taunted"] = user_id
-                player_state.setdefault("buffs", {})["taunt"] = spell.get("amount", 2)
+                GAME_DATA.effects.apply(player_state, "taunt", spell.get("amount", 2))
                 msg += f"You taunt the {monster['name']}! It will focus attacks on you and you take reduced damage for {spell.get('amount', 2)} turns.\n"
             elif spell["effect"] == "assassin_mark_for_death":
-                monster.setdefault("debuffs", {})["mark_for_death"] = spell.get("amount", 2)
+                GAME_DATA.effects.apply(monster, "mark_for_death", spell.get("amount", 2), monster=True)
                 msg += f"You mark the {monster['name']} for death! It will take increased damage for {spell.get('amount', 2)} turns.\n"
             else:
                 # Generic debuff: apply to monster
                 debuff_name = spell["effect"].replace(f"{char_class.lower()}_", "")
-                monster.setdefault("debuffs", {})[debuff_name] = spell.get("amount", 2)
+                GAME_DATA.effects.apply(monster, debuff_name, spell.get("amount", 2), monster=True)
                 msg += f"You cast {spell['name']}! Debuff applied for {spell.get('amount', 2)} turns.\n"
 
         else:
@@ -1797,7 +1877,7 @@ class RPGCog(commands.Cog):
             defeat_msg += f"\n**Level up!** You are now level {level}. You gained 2 skill points."
             if level == 3 and (char_class is None or char_class == ""):
                 defeat_msg += "\nYou can now choose a class! Use `/rpgclass <class>`."
-            self.active_battles[f"{user_id}_regen_remainder"] = 0.0
+            self.battles.player(user_id).regen_remainder = 0.0
 
         defeat_msg += f"\nYou now have {skill_points} skill points."
 
@@ -1880,21 +1960,11 @@ class RPGCog(commands.Cog):
         )
 
         # Remove from active battles/cleanup
-        if user_id in self.active_parties:
-            party_id = self.active_parties[user_id]
-            if party_id in self.active_battles:
-                del self.active_battles[party_id]
-            self.active_battles.pop(f"{party_id}_regen_remainder", None)
-            self.active_battles.pop(f"{party_id}_state", None)
-        else:
-            if user_id in self.active_battles:
-                del self.active_battles[user_id]
-            self.active_battles.pop(f"{user_id}_regen_remainder", None)
-            self.active_battles.pop(f"{user_id}_state", None)
+        self.battles.end(self.battle_lock_key(user_id))
 
         return defeat_msg
 
-    def regen_phase(self, user_id, monster, stats, hp, max_hp, mana, max_mana, hp_regen, mana_regen):
+    def regen_phase(self, log, user_id, monster, stats, hp, max_hp, mana, max_mana, hp_regen, mana_regen):
         # Always fetch the latest HP and Mana from the DB to avoid using stale values
         db_stats = get_rpg_stats(user_id)
         if db_stats:
@@ -1902,15 +1972,15 @@ class RPGCog(commands.Cog):
             max_hp = db_stats[3]
             mana = db_stats[16]
             max_mana = db_stats[18]
-        msg = ""
 
         # --- Prevent regen if player is dead ---
         if hp <= 0:
-            return msg
+            return
 
         # --- HP Regeneration for Player (accumulating fractional) ---
         regen_factor = 0.5  # Reduce regen to 50% (adjust as desired)
-        player_regen_rem = self.active_battles.get(f"{user_id}_regen_remainder", 0.0)
+        player = self.battles.player(user_id)
+        player_regen_rem = player.regen_remainder
         total_regen = hp_regen * regen_factor + player_regen_rem
         regen_amt = round(total_regen, 2)
         regen_int = int(regen_amt)
@@ -1919,13 +1989,13 @@ class RPGCog(commands.Cog):
         if hp > 0 and hp < max_hp and regen_amt > 0:
             hp_gain = min(regen_amt, max_hp - hp)
             hp = min(max_hp, hp + hp_gain)
-            msg += f"\nYou regenerate {hp_gain:.1f} HP! (Your HP: {hp:.1f}/{max_hp:.1f})"
+            log.add(ev.REGEN, f"You regenerate {hp_gain:.1f} HP! (Your HP: {hp:.1f}/{max_hp:.1f})")
             update_rpg_stats(user_id, hp=hp)
-        self.active_battles[f"{user_id}_regen_remainder"] = player_regen_rem
+        player.regen_remainder = player_regen_rem
 
         # --- Mana Regeneration for Player (accumulating fractional) ---
         mana_regen_factor = 0.5  # Reduce mana regen to 50% (adjust as desired)
-        player_mana_regen_rem = self.active_battles.get(f"{user_id}_mana_regen_remainder", 0.0)
+        player_mana_regen_rem = player.mana_regen_remainder
         total_mana_regen = mana_regen * mana_regen_factor + player_mana_regen_rem
         mana_regen_amt = round(total_mana_regen, 2)
         mana_regen_int = int(mana_regen_amt)
@@ -1934,9 +2004,9 @@ class RPGCog(commands.Cog):
         if hp > 0 and mana < max_mana and mana_regen_amt > 0:
             mana_gain = min(mana_regen_amt, max_mana - mana)
             mana = min(max_mana, mana + mana_gain)
-            msg += f"\nYou regenerate {mana_gain:.1f} Mana! (Your Mana: {mana:.1f}/{max_mana:.1f})"
+            log.add(ev.REGEN, f"You regenerate {mana_gain:.1f} Mana! (Your Mana: {mana:.1f}/{max_mana:.1f})")
             update_rpg_stats(user_id, mana=mana)
-        self.active_battles[f"{user_id}_mana_regen_remainder"] = player_mana_regen_rem
+        player.mana_regen_remainder = player_mana_regen_rem
 
         # --- HP Regeneration for Monster (accumulating fractional) ---
         monster_regen_rem = monster.get("regen_remainder", 0.0)
@@ -1949,17 +2019,11 @@ class RPGCog(commands.Cog):
         if monster["hp"] > 0 and mregen_amt > 0 and monster["hp"] < monster["max_hp"]:
             m_gain = min(mregen_amt, monster["max_hp"] - monster["hp"])
             monster["hp"] = min(monster["max_hp"], monster["hp"] + m_gain)
-            msg += f"\nThe {monster['name']} regenerates {m_gain:.1f} HP! (Monster HP: {monster['hp']:.1f}/{monster['max_hp']:.1f})"
+            log.add(ev.REGEN, f"The {monster['name']} regenerates {m_gain:.1f} HP! (Monster HP: {monster['hp']:.1f}/{monster['max_hp']:.1f})")
         monster["regen_remainder"] = monster_regen_rem
-
-        if msg and not msg.startswith('\n'):
-            msg = '\n' + msg
-        return msg
     
-    def monster_attack_phase(self, ctx, user_id, monster, stats, msg):
-        # Always end previous message with a newline
-        if msg and not msg.endswith('\n'):
-            msg += '\n'
+    def monster_attack_phase(self, ctx, log, user_id, monster, stats):
+        """Resolve one monster attack into `log`, setting `log.player_defeated` if the player falls."""
         # Unpack player stats
         (
             level, exp, hp, max_hp, atk, defense, char_class, weapon, quest, quest_progress, skill_points,
@@ -1968,18 +2032,18 @@ class RPGCog(commands.Cog):
         ) = stats
 
         # Get player buffs/debuffs
-        player_state = self.active_battles.setdefault(f"{user_id}_state", {})
-        atk_mod, def_mod, evasion_mod, spell_dmg_mod = self.process_player_buffs(user_id, player_state)
+        player_state = self.battles.player_effects(user_id)
+        atk_mod, def_mod, evasion_mod, spell_dmg_mod = self.process_player_buffs(user_id, player_state, stats)
 
         # Evasion check
         evasion_total = min(0.25, 0.01 * dexterity + evasion_chance + evasion_mod)
         if monster.get("stunned", False):
-            msg += f"The {monster['name']} is stunned and cannot attack this turn!\n"
+            log.add(ev.DEBUFF, f"The {monster['name']} is stunned and cannot attack this turn!")
             monster["stunned"] = False
-            return msg
+            return
         elif random.random() < evasion_total:
-            msg += f"You evaded the {monster['name']}'s attack!\n"
-            return msg
+            log.add(ev.EVADE, f"You evaded the {monster['name']}'s attack!")
+            return
 
         # Monster attack
         monster_crit = random.random() < monster.get("crit_chance", 0.0)
@@ -1990,16 +2054,16 @@ class RPGCog(commands.Cog):
         monster_dmg = max(1, monster_base_dmg)
         hp -= monster_dmg
 
-        msg += f"The {monster['name']} attacks you for {round(monster_dmg, 1)} damage! (Your HP: {max(round(hp, 1), 0)})\n"
+        log.add(ev.ATTACK, f"The {monster['name']} attacks you for {round(monster_dmg, 1)} damage! (Your HP: {max(round(hp, 1), 0)})")
         if monster_crit:
-            msg += "**Critical hit!**\n"
+            log.add(ev.CRIT, "**Critical hit!**")
 
         # --- Monster Signature Attack Logic ---
         sign_attack = monster.get("sign_attack")
         rarity = monster.get("rarity", "common")
         sign_chance = {"rare": 0.25, "epic": 0.33, "legendary": 0.5}.get(rarity, 0)
         if sign_attack and random.random() < sign_chance:
-            msg, hp = self.handle_signature_attack(user_id, monster, sign_attack, hp, max_hp, msg)
+            hp = self.handle_signature_attack(log, user_id, monster, sign_attack, hp, max_hp)
 
         # Revive/defeat logic
         if hp <= 0:
@@ -2016,304 +2080,61 @@ class RPGCog(commands.Cog):
                 items.remove(revive_item)
                 update_player_inventory(user_id, ",".join(items))
                 update_rpg_stats(user_id, hp=hp)
-                msg += (
-                    f"\nYou were defeated, but your **{revive_item}** activates!"
-                    f"\nYou revive with {hp:.1f}/{max_hp:.1f} HP and continue the fight!\n"
-                )
+                log.add(ev.REVIVE, (
+                    f"You were defeated, but your **{revive_item}** activates!"
+                    f"\nYou revive with {hp:.1f}/{max_hp:.1f} HP and continue the fight!"
+                ))
             else:
+                log.player_defeated = True
                 # --- Only remove weapons/items if NOT a raid boss ---
                 if monster.get("rarity") == "raid":
                     mana = max_mana  # Restore Mana to max after raid defeat
                     hp = max_hp  # Restore HP to max after raid defeat
                     update_rpg_stats(user_id, hp=hp, mana=mana)
-                    msg += "\nYou have been defeated by the raid boss! Your HP and Mana has been restored. You keep your items and can try again tomorrow.\n"
+                    log.add(ev.DEFEAT, "You have been defeated by the raid boss! Your HP and Mana has been restored. You keep your items and can try again tomorrow.")
                     # --- Set 24-hour raid cooldown for this user ---
                     set_cooldown(user_id, f"{RAID_COOLDOWN_COMMAND}_{ctx.guild.id}", datetime.datetime.utcnow())
                     # --- Remove defeated player from raid participants ---
-                    raid_state = load_raid_state(ctx.guild.id)
-                    if raid_state and user_id in raid_state["participants"]:
-                        raid_state["participants"].remove(user_id)
-                        save_raid_state(ctx.guild.id, raid_state)
+                    self.raid_states.remove_participant(ctx.guild.id, user_id)
                 else:
                     remove_all_rpg_items_from_inventory(user_id)
-                    msg += "\nYou have been defeated! Use `/rpgstart` to try again.\n"
+                    log.add(ev.DEFEAT, "You have been defeated! Use `/rpgstart` to try again.")
                     conn = sqlite3.connect(DB_PATH)
                     cursor = conn.cursor()
-                    cursor.execute("DELETE FROM rpg_stats WHERE user_id = ?", (str(user_id),))
+                    cursor.execute(DELETE_RPG_STATS_SQL, (str(user_id),))
                     conn.commit()
                     conn.close()
-                if user_id in self.active_battles:
-                    del self.active_battles[user_id]
-                self.active_battles.pop(f"{user_id}_regen_remainder", None)
-                self.active_battles.pop(f"{user_id}_state", None)
+                self.battles.end(("battle", user_id))
+                self.battles.drop_player(user_id)
         update_rpg_stats(user_id, hp=hp)
-        return msg
-
-    def handle_signature_attack(self, user_id, monster, sign_attack, hp, max_hp, msg):
-        # Define effect parameters for each signature attack
-        effects = {
-            "Regenerating Smash": lambda: (
-                f"\n**Signature Attack!** The {monster['name']} uses Regenerating Smash and regenerates {int(monster['max_hp'] * 0.15)} HP!",
-                None,
-                lambda: monster.update({"hp": min(monster["max_hp"], monster["hp"] + int(monster["max_hp"] * 0.15))})
-            ),
-            "Labyrinth Charge": lambda: (
-                f"\n**Signature Attack!** The {monster['name']} charges and lowers your defense!",
-                int(monster["atk"] * 0.7),
-                lambda: self.active_battles.setdefault(f'{user_id}_state', {}).setdefault("debuffs", {}).update({"defense_down": 2})
-            ),
-            "Commanding Strike": lambda: (
-                f"\n**Signature Attack!** The {monster['name']} uses Commanding Strike for {int(monster['atk'] * 0.5)} bonus damage!",
-                int(monster["atk"] * 0.5),
-                None
-            ),
-            "Arcane Blast": lambda: (
-                f"\n**Signature Attack!** The {monster['name']} unleashes Arcane Blast for {int(monster['atk'] * 0.7 + 10)} magic damage!",
-                int(monster["atk"] * 0.7 + 10),
-                None
-            ),
-            "Frost Nova": lambda: (
-                f"\n**Signature Attack!** The {monster['name']} uses Frost Nova and chills you, lowering your defense!",
-                None,
-                lambda: None  # You can apply a debuff here if needed
-            ),
-            "Flame Burst": lambda: (
-                f"\n**Signature Attack!** The {monster['name']} uses Flame Burst and burns you for 3 turns!",
-                None,
-                lambda: self.active_battles.setdefault(f"{user_id}_state", {}).setdefault("debuffs", {}).update({"burn": 3})
-            ),
-            "Surprise Chomp": lambda: (
-                f"\n**Signature Attack!** The {monster['name']} uses Surprise Chomp for {int(monster['atk'] * 0.8)} surprise damage!",
-                int(monster["atk"] * 0.8),
-                None
-            ),
-            "Venom Breath": lambda: (
-                f"\n**Signature Attack!** The {monster['name']} uses Venom Breath and poisons you for 3 turns!",
-                None,
-                lambda: self.active_battles.setdefault(f"{user_id}_state", {}).setdefault("debuffs", {}).update({"poison": 3})
-            ),
-            "Earthquake": lambda: (
-                f"\n**Signature Attack!** The {monster['name']} uses Earthquake for {int(monster['atk'] * 0.6)} earth-shaking damage!",
-                int(monster["atk"] * 0.6),
-                 lambda: self.active_battles.setdefault(f'{user_id}_state', {}).setdefault("debuffs", {}).update({"defense_down": 2})
-            ),
-            "Death Ray": lambda: (
-                f"\n**Signature Attack!** The {monster['name']} uses Death Ray for {int(monster['atk'] * 1.2)} necrotic damage!",
-                int(monster["atk"] * 1.2),
-                None
-            ),
-            "Multi-Strike": lambda: (
-                f"\n**Signature Attack!** The {monster['name']} uses Multi-Strike and hits you {hits} times for {total} total damage!",
-                None,
-                None
-            ),
-            "Hellfire": lambda: (
-                f"\n**Signature Attack!** The {monster['name']} uses Hellfire for {int(monster['atk'] * 0.7)} fire damage!",
-                int(monster["atk"] * 0.7),
-                None
-            ),
-            "Aerial Assault": lambda: (
-                f"\n**Signature Attack!** The {monster['name']} uses Aerial Assault and increases its evasion!",
-                None,
-                lambda: monster.update({"evasion_chance": monster.get("evasion_chance", 0) + 0.1})
-            ),
-            "Blood Drain": lambda: (
-                f"\n**Signature Attack!** The {monster['name']} uses Blood Drain, draining {int(monster['atk'] * 0.5)} HP from you!",
-                int(monster["atk"] * 0.5),
-                lambda: monster.update({"hp": min(monster["max_hp"], monster["hp"] + int(monster["atk"] * 0.5))})
-            ),
-            "Inferno Breath": lambda: (
-                f"\n**Signature Attack!** The {monster['name']} breathes inferno for {int(monster['atk'] * 1.0)} damage!",
-                int(monster["atk"] * 1.0),
-                None
-            ),
-            "Titanic Slam": lambda: (
-                f"\n**Signature Attack!** The {monster['name']} uses Titanic Slam for {int(monster['atk'] * 0.9)} crushing damage!",
-                int(monster["atk"] * 0.9),
-                None
-            ),
-            "Rebirth Flame": lambda: (
-                f"\n**Signature Attack!** The {monster['name']} uses Rebirth Flame and revives itself for {int(monster['max_hp'] * 0.5)} HP!",
-                None,
-                lambda: monster.update({"hp": min(monster["max_hp"], monster["hp"] + int(monster["max_hp"] * 0.5))}) if monster["hp"] <= monster["max_hp"] // 2 else None
-            ),
-            "Shadow Slash": lambda: (
-                f"\n**Signature Attack!** The {monster['name']} uses Shadow Slash for {int(monster['atk'] * 0.8)} shadow damage!",
-                int(monster["atk"] * 0.8),
-                None
-            ),
-            "Cataclysm": lambda: (
-                f"\n**Signature Attack!** The {monster['name']} uses Cataclysm for {int(monster['atk'] * 1.5)} catastrophic damage!",
-                int(monster["atk"] * 1.5),
-                None
-            ),
-            "Tsunami": lambda: (
-                f"\n**Signature Attack!** The {monster['name']} unleashes Tsunami, dealing {int(monster['atk'] * 1.2)} water damage to all party members!",
-                int(monster["atk"] * 1.2),
-                None
-            ),
-            "Judgment Ray": lambda: (
-                f"\n**Signature Attack!** The {monster['name']} fires Judgment Ray, dealing {int(monster['atk'] * 1.3)} holy damage and lowering defense!",
-                int(monster["atk"] * 1.3),
-                lambda: self.active_battles.setdefault(f'{user_id}_state', {}).setdefault("debuffs", {}).update({"defense_down": 2})
-            ),
-            "Volcanic Eruption": lambda: (
-                f"\n**Signature Attack!** The {monster['name']} causes a Volcanic Eruption, burning you for 3 turns!",
-                int(monster["atk"] * 1.1),
-                lambda: self.active_battles.setdefault(f'{user_id}_state', {}).setdefault("debuffs", {}).update({"burn": 3})
-            ),
-            "Thunderstorm": lambda: (
-                f"\n**Signature Attack!** The {monster['name']} summons a Thunderstorm, stunning you for 1 turn!",
-                int(monster["atk"] * 1.0),
-                lambda: self.active_battles.setdefault(f'{user_id}_state', {}).setdefault("debuffs", {}).update({"stun": 1})
-            ),
-            "Armor Break": lambda: (
-                f"\n**Signature Attack!** The {monster['name']} uses Armor Break, lowering your defense!",
-                int(monster["atk"] * 0.5),
-                lambda: self.active_battles.setdefault(f'{user_id}_state', {}).setdefault("debuffs", {}).update({"defense_down": 2})
-            ),
-        }
+
+    def handle_signature_attack(self, log, user_id, monster, sign_attack, hp, max_hp):
+        handler = GAME_DATA.signature_attacks.get(sign_attack)
+        if handler is None:
+            return hp
 
         # Set chance based on rarity
-        rarity = monster.get("rarity", "common")
         sign_chance = {
             "rare": 0.25,
             "epic": 0.33,
             "legendary": 0.5,
             "raid": 0.10  # much lower chance for raid bosses
-        }.get(rarity, 0)
-
-        # Multi-Strike needs special handling for hits/total
-        if sign_attack == "Multi-Strike":
-            hits = random.randint(2, 4)
-            total = 0
-            for _ in range(hits):
-                hit_dmg = max(1, int(monster["atk"] * 0.5))
-                hp -= hit_dmg
-                total += hit_dmg
-            msg += f"\n**Signature Attack!** The {monster['name']} uses Multi-Strike and hits you {hits} times for {total} total damage!"
-        elif sign_attack in effects and random.random() < sign_chance:
-            effect_msg, dmg, extra = effects[sign_attack]()
-            msg += effect_msg
-            if dmg:
-                hp -= dmg
-            if extra:
-                extra()
-        return msg, hp
+        }.get(monster.get("rarity", "common"), 0)
+        if sign_attack not in UNCONDITIONAL_SIGNATURES and random.random() >= sign_chance:
+            return hp
+
+        hit = CombatHit(self, user_id, monster, hp=hp, max_hp=max_hp)
+        handler(hit)
+        for message in hit.messages:
+            log.add(ev.SIGNATURE, message)
+        return hit.hp
 
     def apply_weapon_special_effects(self, user_id, weapon, monster, base_dmg, hp, max_hp, crit, bonus_spell_dmg):
-        effect_msgs = []
-        weapon_item = WEAPON_ITEMS.get(weapon, {"damage": 0, "rarity": "common"})
-        special_effect = weapon_item.get("effect")
-        rarity = weapon_item.get("rarity", "common")
-        # Use a single effect_amount for scaling
-        effect_amount = weapon_item.get("effect_amount", 1)
-
-        # Rarity scaling factors
-        rarity_scale = {
-            "common": 1.0,
-            "uncommon": 1.2,
-            "rare": 1.5,
-            "epic": 2.0,
-            "legendary": 3.0,
-            "raid": 4.0
-        }
-        scale = rarity_scale.get(rarity, 1.0)
-        scaled_amount = effect_amount * scale
-
-        if not special_effect:
-            return base_dmg, hp, effect_msgs
-
-        # Effects that may modify base_dmg, hp, or monster state
-        if special_effect == "bonus_vs_dragon" and "dragon" in monster["name"].lower():
-            bonus = int(scaled_amount)
-            base_dmg += bonus
-            effect_msgs.append(f"Bonus damage vs Dragon! (+{bonus})")
-        elif special_effect == "stun" and random.random() < 0.25 * scale:
-            monster["stunned"] = True
-            effect_msgs.append("You stunned the monster!")
-        elif special_effect == "heal_on_crit" and crit:
-            heal = int(max_hp * 0.2 * scale)
-            hp = min(max_hp, hp + heal)
-            self.update_rpg_stats(user_id, hp=hp)
-            effect_msgs.append(f"You healed {heal} HP on crit!")
-        elif special_effect == "burn" and random.random() < 0.3 * scale:
-            monster.setdefault("debuffs", {})["burn"] = int(3 * scale)
-            effect_msgs.append("The monster is burning!")
-        elif special_effect == "lifesteal":
-            heal = int(base_dmg * 0.5 * scale)
-            hp = min(max_hp, hp + heal)
-            self.update_rpg_stats(user_id, hp=hp)
-            effect_msgs.append(f"You lifesteal {heal} HP!")
-        elif special_effect == "ignore_defense":
-            bonus = int(monster.get("defense", 0) * scale)
-            base_dmg += bonus
-            effect_msgs.append("You ignore the monster's defense!")
-        elif special_effect == "multi_hit":
-            extra_hits = random.randint(1, int(2 * scale))
-            extra_dmg = extra_hits * int(effect_amount)
-            base_dmg += extra_dmg
-            effect_msgs.append(f"Multi-hit! You strike {1 + extra_hits} times for {extra_dmg} bonus damage!")
-        elif special_effect == "curse" and random.random() < 0.2 * scale:
-            monster.setdefault("debuffs", {})["curse"] = int(2 * scale)
-            effect_msgs.append("The monster is cursed and will take extra damage!")
-        elif special_effect == "bleed" and random.random() < 0.3 * scale:
-            monster.setdefault("debuffs", {})["bleed"] = int(3 * scale)
-            effect_msgs.append("The monster is bleeding!")
-        elif special_effect == "reap" and monster["hp"] < monster["max_hp"] * 0.25:
-            bonus = int(monster["max_hp"] * 0.2 * scale)
-            base_dmg += bonus
-            effect_msgs.append("Reap! Extra damage to weakened foes!")
-        elif special_effect == "smite" and "undead" in monster["name"].lower():
-            bonus = int(scaled_amount)
-            base_dmg += bonus
-            effect_msgs.append("Smite! Bonus damage to undead!")
-        elif special_effect == "never_miss":
-            monster["evasion_chance"] = 0
-            effect_msgs.append("Your attack cannot miss!")
-        elif special_effect == "leadership":
-            if user_id in self.active_parties:
-                party_id = self.active_parties[user_id]
-                for pid in self.parties[party_id]["members"]:
-                    if pid != user_id:
-                        state = self.active_battles.setdefault(f"{pid}_state", {})
-                        state.setdefault("buffs", {})["leadership"] = int(2 * scale)
-                effect_msgs.append("Your leadership inspires your party!")
-        elif special_effect == "instant_kill" and random.random() < 0.05 * scale:
-            monster["hp"] = 0
-            effect_msgs.append("**INSTANT KILL!**")
-        elif special_effect == "memory_wipe" and random.random() < 0.15 * scale:
-            monster.setdefault("debuffs", {})["memory_wipe"] = int(2 * scale)
-            effect_msgs.append("The monster is confused and loses its next turn!")
-        elif special_effect == "blind" and random.random() < 0.2 * scale:
-            monster.setdefault("debuffs", {})["blind"] = int(2 * scale)
-            effect_msgs.append("The monster is blinded and its accuracy drops!")
-        elif special_effect == "infinite_power":
-            bonus = int(scaled_amount)
-            base_dmg += bonus
-            effect_msgs.append("Infinite Power! Massive bonus damage!")
-        elif special_effect == "bonus_spell":
-            bonus = int(bonus_spell_dmg * 1.5 * scale)
-            base_dmg += bonus
-            effect_msgs.append("Your spell power surges with this weapon!")
-        elif special_effect == "pierce":
-            bonus = int(scaled_amount)
-            base_dmg += bonus
-            effect_msgs.append("Piercing attack! Ignores some defense.")
-        elif special_effect == "revive_on_death" and hp <= 0:
-            hp = int(max_hp * 0.5 * scale)
-            self.update_rpg_stats(user_id, hp=hp)
-            effect_msgs.append("You are revived by the Phoenix Bow!")
-        elif special_effect == "sleep" and random.random() < 0.2 * scale:
-            monster.setdefault("debuffs", {})["sleep"] = int(2 * scale)
-            effect_msgs.append("The monster is put to sleep!")
-        elif special_effect == "double_damage_night":
-            from datetime import datetime
-            if 0 <= datetime.utcnow().hour < 6:
-                base_dmg *= 2 * scale
-                effect_msgs.append("It's night! Double damage!")
-
-        return base_dmg, hp, effect_msgs
+        hit = CombatHit(self, user_id, monster, base_dmg, hp, max_hp, crit, bonus_spell_dmg)
+        GAME_DATA.weapon_effects.apply(weapon, hit)
+        if hit.hp != hp:
+            update_rpg_stats(user_id, hp=hit.hp)
+        return hit.base_dmg, hit.hp, hit.messages
 
     @commands.hybrid_command(name="rpgheal", description="Use a consumable to heal yourself.")
     @rpg_started()
@@ -2348,9 +2169,10 @@ class RPGCog(commands.Cog):
             )
             return
 
-        item_name = item_name.strip().title()
+        name, suggestion = INVENTORIES.store(user_id, inv).index.resolve(item_name)
+        item_name = name or item_name.strip().title()
         if item_name not in items:
-            await ctx.send(f"You don't have a **{item_name}** in your inventory!")
+            await ctx.send(f"You don't have a **{item_name}** in your inventory!{did_you_mean(suggestion)}")
             return
 
         # --- Consumable logic ---
@@ -2391,7 +2213,7 @@ class RPGCog(commands.Cog):
             heal = random.randint(6, 12) + int(strength)
             hp = min(max_hp, hp + heal)
             # Remove 'bleed' debuff if present
-            player_state = self.active_battles.setdefault(f"{user_id}_state", {})
+            player_state = self.battles.player_effects(user_id)
             debuffs = player_state.setdefault("debuffs", {})
             if "bleed" in debuffs:
                 del debuffs["bleed"]
@@ -2429,7 +2251,7 @@ class RPGCog(commands.Cog):
             update_rpg_stats(user_id, hp=hp)
             msg = f"You ate **Rotten Flesh** and healed {heal:.1f} HP! (Your HP: {hp:.1f}/{max_hp:.1f})"
             if poisoned:
-                player_state = self.active_battles.setdefault(f"{user_id}_state", {})
+                player_state = self.battles.player_effects(user_id)
                 debuffs = player_state.setdefault("debuffs", {})
                 debuffs["poison"] = 2
                 msg += " But you got **poisoned**!"
@@ -2449,20 +2271,22 @@ class RPGCog(commands.Cog):
     @commands.hybrid_command(name="rpgquit", description="End your RPG adventure (keeps your inventory).")
     @rpg_started()
     async def rpgquit(self, ctx):
+        async with self.battle_lock(ctx.author.id):
+            await self._quit(ctx)
+
+    async def _quit(self, ctx):
         user_id = ctx.author.id
         # Remove weapons from inventory and unequip
         remove_all_rpg_items_from_inventory(user_id)
         # Remove from rpg_stats table
         conn = sqlite3.connect(DB_PATH)
         cursor = conn.cursor()
-        cursor.execute("DELETE FROM rpg_stats WHERE user_id = ?", (str(user_id),))
+        cursor.execute(DELETE_RPG_STATS_SQL, (str(user_id),))
         conn.commit()
         conn.close()
         # Remove from active battles and parties
-        if user_id in self.active_battles:
-            del self.active_battles[user_id]
-        if f"{user_id}_state" in self.active_battles:
-            del self.active_battles[f"{user_id}_state"]
+        self.battles.end(("battle", user_id))
+        self.battles.drop_player(user_id)
         if user_id in self.active_parties:
             party_id = self.active_parties[user_id]
             party = self.parties.get(party_id)
@@ -2472,8 +2296,6 @@ class RPGCog(commands.Cog):
                 if not party["members"]:
                     del self.parties[party_id]
             del self.active_parties[user_id]
-        self.active_battles.pop(f"{user_id}_regen_remainder", None)
-        self.active_battles.pop(f"{user_id}_state", None)
         await ctx.send("Your adventure has ended and your RPG stats have been removed. All your weapons have been lost. Use `/rpgstart` to begin a new one.")
     
     @commands.hybrid_command(name="rpgspells", description="List your available spells and manage your equipped spells (max 5).")
@@ -2485,29 +2307,30 @@ class RPGCog(commands.Cog):
             await ctx.send("You haven't started your adventure yet. Use `/rpgstart`.")
             return
         char_class = stats[6]
-        if not char_class or char_class not in SPELLS:
+        if not char_class or char_class not in GAME_DATA.spells:
             await ctx.send("You must choose a class to use spells. Use `/rpgclass`.")
             return
 
         # --- Load equipped spells from DB (add a new column if needed) ---
         conn = sqlite3.connect(DB_PATH)
         cursor = conn.cursor()
-        cursor.execute("SELECT equipped_spells FROM rpg_stats WHERE user_id = ?", (str(user_id),))
+        cursor.execute(GET_EQUIPPED_SPELLS_SQL, (str(user_id),))
         row = cursor.fetchone()
         if row and row[0]:
             equipped_spells = row[0].split(",")
         else:
             equipped_spells = []
 
-        available_spells = SPELLS[char_class]
+        available_spells = GAME_DATA.spells[char_class]
 
         # --- Equip/unequip logic ---
         if action:
             action = action.lower()
             if action == "equip" and spell_name:
-                spell = next((s for s in available_spells if s["name"].lower() == spell_name.lower()), None)
+                name, suggestion = GAME_DATA.spell_names[char_class].resolve(spell_name)
+                spell = GAME_DATA.spells_by_name[char_class].get(name)
                 if not spell:
-                    await ctx.send("Spell not found. Use `/rpgspells` to see your available spells.")
+                    await ctx.send(f"Spell not found.{did_you_mean(suggestion)} Use `/rpgspells` to see your available spells.")
                     return
                 if spell["name"] in equipped_spells:
                     await ctx.send(f"**{spell['name']}** is already equipped.")
@@ -2516,18 +2339,18 @@ class RPGCog(commands.Cog):
                     await ctx.send("You can only equip up to 5 spells. Use `/rpgspells unequip <spell name>` to remove one.")
                     return
                 equipped_spells.append(spell["name"])
-                cursor.execute("UPDATE rpg_stats SET equipped_spells = ? WHERE user_id = ?", (",".join(equipped_spells), str(user_id)))
+                cursor.execute(SET_EQUIPPED_SPELLS_SQL, (",".join(equipped_spells), str(user_id)))
                 conn.commit()
                 await ctx.send(f"Equipped **{spell['name']}**.")
                 conn.close()
                 return
             elif action == "unequip" and spell_name:
-                spell = next((s for s in available_spells if s["name"].lower() == spell_name.lower()), None)
+                spell = GAME_DATA.spells_by_name[char_class].get(GAME_DATA.spell_names[char_class].get(spell_name))
                 if not spell or spell["name"] not in equipped_spells:
                     await ctx.send("That spell is not equipped.")
                     return
                 equipped_spells.remove(spell["name"])
-                cursor.execute("UPDATE rpg_stats SET equipped_spells = ? WHERE user_id = ?", (",".join(equipped_spells), str(user_id)))
+                cursor.execute(SET_EQUIPPED_SPELLS_SQL, (",".join(equipped_spells), str(user_id)))
                 conn.commit()
                 await ctx.send(f"Unequipped **{spell['name']}**.")
                 conn.close()
@@ -2559,161 +2382,32 @@ class RPGCog(commands.Cog):
         await ctx.send(embed=embed)
         conn.close()
 
-    def process_player_buffs(self, user_id, player_state):
-        """Apply and decrement player buffs/debuffs at the start of their turn, including bonus_spell_dmg scaling."""
-        buffs = player_state.setdefault("buffs", {})
-        debuffs = player_state.setdefault("debuffs", {})
-        atk_mod = 0
-        def_mod = 0
-        evasion_mod = 0
-        spell_dmg_mod = 0
+    @rpgspells.autocomplete("spell_name")
+    async def rpgspells_autocomplete(self, interaction: discord.Interaction, current: str):
+        stats = get_rpg_stats(interaction.user.id)
+        char_class = stats[6] if stats else None
+        if char_class not in GAME_DATA.spell_names:
+            return []
+        mana = {spell["name"]: spell["mana"] for spell in GAME_DATA.spells[char_class]}
+        return [
+            discord.app_commands.Choice(name=f"{name} (Mana: {mana[name]})"[:100], value=name[:100])
+            for name in GAME_DATA.spell_names[char_class].complete(current)
+        ]
 
-        stats = get_rpg_stats(user_id)
+    def process_player_buffs(self, user_id, player_state, stats):
+        """Apply and decrement player buffs/debuffs at the start of their turn, including bonus_spell_dmg scaling."""
         bonus_spell_dmg = stats[22] if stats and len(stats) > 22 else 0
-
-        # --- Buffs ---
-        if buffs.get("battle_cry", 0) > 0:
-            atk_mod += 3 + int(bonus_spell_dmg * 0.5)
-            def_mod += 2 + int(bonus_spell_dmg * 0.3)
-            buffs["battle_cry"] -= 1
-        if buffs.get("iron_wall", 0) > 0:
-            def_mod += 8 + int(bonus_spell_dmg * 0.7)
-            buffs["iron_wall"] -= 1
-        if buffs.get("taunt", 0) > 0:
-            def_mod += 3 + int(bonus_spell_dmg * 0.2)
-            buffs["taunt"] -= 1
-        if buffs.get("vanish", 0) > 0:
-            evasion_mod += 1.0
-            buffs["vanish"] -= 1
-        if buffs.get("smoke_bomb", 0) > 0:
-            evasion_mod += 0.25 + min(0.15, bonus_spell_dmg * 0.01)
-            buffs["smoke_bomb"] -= 1
-        if buffs.get("adrenaline_rush", 0) > 0:
-            atk_mod += 2 + int(bonus_spell_dmg * 0.2)
-            buffs["adrenaline_rush"] -= 1
-        if buffs.get("arcane_surge", 0) > 0:
-            spell_dmg_mod += 5 + int(bonus_spell_dmg * 0.5)
-            buffs["arcane_surge"] -= 1
-        if buffs.get("ice_barrier", 0) > 0:
-            def_mod += 5 + int(bonus_spell_dmg * 0.5)
-            buffs["ice_barrier"] -= 1
-        if buffs.get("mana_shield", 0) > 0:
-            def_mod += 7 + int(bonus_spell_dmg * 0.7)
-            buffs["mana_shield"] -= 1
-        if buffs.get("haste", 0) > 0:
-            evasion_mod += 0.15 + min(0.1, bonus_spell_dmg * 0.01)
-            spell_dmg_mod += 2 + int(bonus_spell_dmg * 0.2)
-            buffs["haste"] -= 1
-        # New: Leadership (King's Claymore)
-        if buffs.get("leadership", 0) > 0:
-            atk_mod += 4
-            buffs["leadership"] -= 1
-
-        # --- Debuffs ---
-        if debuffs.get("burn", 0) > 0:
-            atk_mod -= 2 + int(bonus_spell_dmg * 0.2)
-            debuffs["burn"] -= 1
-        if debuffs.get("poison", 0) > 0:
-            def_mod -= 2 + int(bonus_spell_dmg * 0.2)
-            debuffs["poison"] -= 1
-        if debuffs.get("curse", 0) > 0:
-            atk_mod -= 2 + int(bonus_spell_dmg * 0.2)
-            def_mod -= 2 + int(bonus_spell_dmg * 0.2)
-            evasion_mod -= 0.05 + min(0.05, bonus_spell_dmg * 0.002)
-            debuffs["curse"] -= 1
-        if debuffs.get("frost_nova", 0) > 0:
-            def_mod += 2 + int(bonus_spell_dmg * 0.2)
-            debuffs["frost_nova"] -= 1
-        if debuffs.get("mark_for_death", 0) > 0:
-            def_mod -= 3 + int(bonus_spell_dmg * 0.3)
-            debuffs["mark_for_death"] -= 1
-        # New: Bleed (Shadow Blade, Bloodletter)
-        if debuffs.get("bleed", 0) > 0:
-            bleed_dmg = int(stats[3] * 0.07)
-            stats = list(stats)
-            stats[2] = max(1, stats[2] - bleed_dmg)
-            update_rpg_stats(user_id, hp=stats[2])
-            debuffs["bleed"] -= 1
-        # New: Sleep (Nightshade Dagger)
-        if debuffs.get("sleep", 0) > 0:
-            atk_mod -= 1000  # Effectively skip turn
-            debuffs["sleep"] -= 1
-        # New: Blind (Eclipse Whip)
-        if debuffs.get("blind", 0) > 0:
-            evasion_mod += 0.2
-            debuffs["blind"] -= 1
-        # New: Memory Wipe (Oblivion Blade)
-        if debuffs.get("memory_wipe", 0) > 0:
-            atk_mod -= 1000  # Skip turn
-            debuffs["memory_wipe"] -= 1
-        # New: Defense Down (Judgment Ray)
-        if debuffs.get("defense_down", 0) > 0:
-            def_mod -= 5  # Reduce defense by 5 (adjust as needed)
-            debuffs["defense_down"] -= 1
-        # New: Stun (Thunderstorm)
-        if debuffs.get("stun", 0) > 0:
-            atk_mod -= 1000  # Effectively skip turn
-            debuffs["stun"] -= 1
-
-        # Clean up expired buffs/debuffs
-        for k in list(buffs):
-            if buffs[k] <= 0:
-                del buffs[k]
-        for k in list(debuffs):
-            if debuffs[k] <= 0:
-                del debuffs[k]
-
-        return atk_mod, def_mod, evasion_mod, spell_dmg_mod
+        mods, hp_loss = GAME_DATA.effects.process_player(player_state, stats[3], bonus_spell_dmg)
+        if hp_loss:
+            update_rpg_stats(user_id, hp=max(1, stats[2] - hp_loss))
+        return mods
 
     def process_monster_debuffs(self, monster):
-        debuffs = monster.setdefault("debuffs", {})
-        msg = ""
-        dead = False
-        # Poison
-        if debuffs.get("poison", 0) > 0:
-            poison_dmg = int(0.05 * monster["max_hp"])
-            monster["hp"] -= poison_dmg
-            debuffs["poison"] -= 1
-            msg += f"\nThe monster takes {poison_dmg} poison damage!"
-        # Burn
-        if debuffs.get("burn", 0) > 0:
-            burn_dmg = int(0.05 * monster["max_hp"])
-            monster["hp"] -= burn_dmg
-            debuffs["burn"] -= 1
-            msg += f"\nThe monster takes {burn_dmg} burn damage!"
-        # New: Bleed
-        if debuffs.get("bleed", 0) > 0:
-            bleed_dmg = int(0.07 * monster["max_hp"])
-            monster["hp"] -= bleed_dmg
-            debuffs["bleed"] -= 1
-            msg += f"\nThe monster bleeds for {bleed_dmg} damage!"
-        # New: Curse (already handled in player attack, but decrement here)
-        if debuffs.get("curse", 0) > 0:
-            debuffs["curse"] -= 1
-        # New: Sleep (skip monster turn)
-        if debuffs.get("sleep", 0) > 0:
-            debuffs["sleep"] -= 1
-            msg += "\nThe monster is asleep and skips its turn!"
-        # New: Blind (reduce accuracy)
-        if debuffs.get("blind", 0) > 0:
-            debuffs["blind"] -= 1
-            msg += "\nThe monster is blinded and its accuracy is reduced!"
-        # New: Memory Wipe (skip monster turn)
-        if debuffs.get("memory_wipe", 0) > 0:
-            debuffs["memory_wipe"] -= 1
-            msg += "\nThe monster is confused and loses its turn!"
-
-        # Clean up expired debuffs
-        for k in list(debuffs):
-            if debuffs[k] <= 0:
-                del debuffs[k]
-        if monster["hp"] <= 0:
-            dead = True
-        return msg, dead
+        return GAME_DATA.effects.process_monster(monster)
 
     def load_monsters(self, guild_id=None):
         # Ignore guild_id, always load from JSON file
-        return [dict(m) for m in self.default_monsters]
+        return [dict(m) for m in GAME_DATA.monsters]
 
     @commands.hybrid_group(name="rpgweapon", description="Manage your weapons.")
     @rpg_started()
@@ -2732,16 +2426,13 @@ class RPGCog(commands.Cog):
             return
         coins, bank, inv = get_player(user_id)
         items = inv.split(",") if inv else []
-        weapon_name = weapon_name.strip().lower()
-        owned_weapons = [w.lower() for w in items if w in WEAPON_ITEMS]
-        if weapon_name not in [w.lower() for w in WEAPON_ITEMS]:
-            await ctx.send("That weapon does not exist.")
+        actual_weapon, suggestion = GAME_DATA.weapon_names.resolve(weapon_name)
+        if not actual_weapon:
+            await ctx.send(f"That weapon does not exist.{did_you_mean(suggestion)}")
             return
-        if weapon_name not in owned_weapons:
+        if actual_weapon not in items:
             await ctx.send("You do not have that weapon in your inventory.")
             return
-        # Find the actual weapon name for update
-        actual_weapon = next(w for w in WEAPON_ITEMS if w.lower() == weapon_name)
         # Remove the previously equipped weapon from inventory (if any)
         current_weapon = stats[7]
         if current_weapon and current_weapon in items:
@@ -2756,6 +2447,10 @@ class RPGCog(commands.Cog):
         update_rpg_stats(user_id, weapon=actual_weapon)
         await ctx.send(f"You have equipped **{actual_weapon}**!")
 
+    @weapon_equip.autocomplete("weapon_name")
+    async def weapon_equip_autocomplete(self, interaction: discord.Interaction, current: str):
+        return inventory_choices(interaction.user.id, current, keep=lambda name: name in GAME_DATA.weapon_items)
+
     @rpgweapon.command(name="unequip")
     @rpg_started()
     async def weapon_unequip(self, ctx):
@@ -2785,7 +2480,7 @@ class RPGCog(commands.Cog):
         if not weapon:
             await ctx.send("You have no weapon equipped.")
             return
-        weapon_stats = WEAPON_ITEMS.get(weapon)
+        weapon_stats = GAME_DATA.weapon_items.get(weapon)
         if not weapon_stats:
             await ctx.send(f"Equipped weapon: **{weapon}** (not found in weapon database).")
             return
@@ -2803,13 +2498,13 @@ class RPGCog(commands.Cog):
         items = inv.split(",") if inv else []
         weapon_counts = {}
         for item in items:
-            if item in WEAPON_ITEMS:
+            if item in GAME_DATA.weapon_items:
                 weapon_counts[item] = weapon_counts.get(item, 0) + 1
         if not weapon_counts:
             await ctx.send("You have no weapons in your inventory.")
             return
         lines = [
-            f"{amount}x {name} (DMG: {WEAPON_ITEMS[name]['damage']}, {WEAPON_ITEMS[name].get('rarity', 'common').capitalize()})"
+            f"{amount}x {name} (DMG: {GAME_DATA.weapon_items[name]['damage']}, {GAME_DATA.weapon_items[name].get('rarity', 'common').capitalize()})"
             for name, amount in weapon_counts.items()
         ]
         await ctx.send("**Your Weapons:**\n" + "\n".join(lines))
@@ -2818,65 +2513,135 @@ class RPGCog(commands.Cog):
     @rpg_started()
     async def weapon_info(self, ctx, *, weapon_name: str):
         """Show info about any weapon in the game."""
-        weapon_name = weapon_name.strip().lower()
-        found = next((w for w in WEAPON_ITEMS if w.lower() == weapon_name), None)
+        found, suggestion = GAME_DATA.weapon_names.resolve(weapon_name)
         if not found:
-            await ctx.send("That weapon does not exist.")
+            await ctx.send(f"That weapon does not exist.{did_you_mean(suggestion)}")
             return
-        weapon_stats = WEAPON_ITEMS[found]
+        weapon_stats = GAME_DATA.weapon_items[found]
         desc = f"**{found}**\nDamage: {weapon_stats['damage']}\nRarity: {weapon_stats.get('rarity', 'common').capitalize()}"
         if weapon_stats.get("effect"):
             desc += f"\nSpecial Effect: {weapon_stats['effect']}"
         await ctx.send(desc)
 
+    @weapon_info.autocomplete("weapon_name")
+    async def weapon_info_autocomplete(self, interaction: discord.Interaction, current: str):
+        return [
+            discord.app_commands.Choice(name=f"{name} (DMG: {GAME_DATA.weapon_items[name]['damage']})"[:100], value=name[:100])
+            for name in GAME_DATA.weapon_names.complete(current)
+        ]
+
+    @commands.hybrid_command(name="rpglog", description="Replay your most recent combat logs.")
+    async def rpglog(self, ctx, count: int = 3):
+        count = max(1, min(count, 10))
+        entries = self.battle_logs.recent(ctx.author.id, count)
+        if not entries:
+            await ctx.send("You have no recent combat logs.")
+            return
+        embed = discord.Embed(
+            title="Recent Combat Log",
+            color=discord.Color.dark_red()
+        )
+        for timestamp, title, text in entries:
+            value = f"<t:{int(timestamp)}:R>\n{text}"
+            if len(value) > 1024:
+                value = value[:1021] + "..."
+            embed.add_field(name=title, value=value, inline=False)
+        await ctx.send(embed=embed)
+
+    @commands.hybrid_command(name="rpglocks", description="Show RPG lock-wait metrics (admin only).")
+    @commands.has_guild_permissions(administrator=True)
+    async def rpglocks(self, ctx):
+        embed = discord.Embed(
+            title="RPG Lock Metrics",
+            color=discord.Color.blurple()
+        )
+        metrics = self.locks.snapshot()
+        if not metrics:
+            embed.description = "No locks have been taken yet."
+        for kind, m in metrics.items():
+            embed.add_field(
+                name=kind.capitalize(),
+                value=(
+                    f"Acquired: **{m['acquired']}** (contended: {m['contended']})\n"
+                    f"Avg wait: **{m['avg_wait_ms']:.2f} ms** | Max wait: **{m['max_wait_ms']:.2f} ms**\n"
+                    f"Live locks: {m['live_locks']}"
+                ),
+                inline=False
+            )
+        await ctx.send(embed=embed)
+
     @commands.hybrid_command(name="rpgretreat", description="Retreat from your current encounter (no rewards, no penalty).")
     @rpg_started()
     async def rpgretreat(self, ctx):
+        async with self.battle_lock(ctx.author.id):
+            await self._retreat(ctx)
+
+    async def _retreat(self, ctx):
         user_id = ctx.author.id
-        if user_id not in self.active_battles:
+        # Ends the party's fight for party members, the solo fight otherwise
+        battle = self.battles.end(self.battle_lock_key(user_id))
+        if battle is None:
             await ctx.send("You are not in a battle.")
             return
-        monster = self.active_battles[user_id]
-        monster_name = monster.get("name", "the monster")
-        # Remove from active battles and reset regen remainder
-        if user_id in self.active_parties:
-            party_id = self.active_parties[user_id]
-            if party_id in self.active_battles:
-                del self.active_battles[party_id]
-            self.active_battles.pop(f"{party_id}_regen_remainder", None)
-            self.active_battles.pop(f"{party_id}_state", None)
-            # Optionally notify all party members
-        else:
-            if user_id in self.active_battles:
-                del self.active_battles[user_id]
-            self.active_battles.pop(f"{user_id}_regen_remainder", None)
-            self.active_battles.pop(f"{user_id}_state", None)
+        monster_name = battle.monster.get("name", "the monster")
         await ctx.send(f"You have successfully retreated from your encounter with **{monster_name}**. Live to fight another day!")
 
 # Helper for confirmation
-class ConfirmView(discord.ui.View):
-    def __init__(self, ctx, timeout=20):
-        super().__init__(timeout=timeout)
-        self.value = None
-        self.ctx = ctx
-
-    @discord.ui.button(label="Fight!", style=discord.ButtonStyle.danger)
-    async def confirm(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if interaction.user.id != self.ctx.author.id:
+# The buttons are registered dynamically, so no view object is kept per message. The waiting
+# command owns a future keyed by the token in the custom_id; a click that finds no future
+# (timed out, or sent before a restart) says the encounter expired instead of failing.
+PENDING_CONFIRMS = {}  # {(user_id, token): asyncio.Future}
+
+class ConfirmButton(discord.ui.DynamicItem[discord.ui.Button], template=r"rpgconfirm:(?P<user_id>\d+):(?P<token>[0-9a-f]+):(?P<choice>fight|back)"):
+    def __init__(self, user_id, token, choice):
+        super().__init__(discord.ui.Button(
+            label="Fight!" if choice == "fight" else "Back Out",
+            style=discord.ButtonStyle.danger if choice == "fight" else discord.ButtonStyle.secondary,
+            custom_id=f"rpgconfirm:{user_id}:{token}:{choice}"
+        ))
+        self.user_id = user_id
+        self.token = token
+        self.choice = choice
+
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        return cls(int(match["user_id"]), match["token"], match["choice"])
+
+    async def callback(self, interaction: discord.Interaction):
+        if interaction.user.id != self.user_id:
             await interaction.response.send_message("This is not your encounter!", ephemeral=True)
             return
-        self.value = True
-        self.stop()
-        await interaction.response.edit_message(content="You brace yourself for battle!", view=None)
-
-    @discord.ui.button(label="Back Out", style=discord.ButtonStyle.secondary)
-    async def cancel(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if interaction.user.id != self.ctx.author.id:
-            await interaction.response.send_message("This is not your encounter!", ephemeral=True)
+        future = PENDING_CONFIRMS.pop((self.user_id, self.token), None)
+        if future is None or future.done():
+            await interaction.response.edit_message(content="This encounter has expired. Use `/rpgencounter` again.", view=None)
             return
-        self.value = False
-        self.stop()
-        await interaction.response.edit_message(content="You backed out from the legendary encounter.", view=None)
+        future.set_result(self.choice == "fight")
+        if self.choice == "fight":
+            await interaction.response.edit_message(content="You brace yourself for battle!", view=None)
+        else:
+            await interaction.response.edit_message(content="You backed out from the legendary encounter.", view=None)
+
+class ConfirmView(discord.ui.View):
+    def __init__(self, ctx, timeout=20):
+        super().__init__(timeout=None)
+        self.value = None
+        self.user_id = ctx.author.id
+        self.token = secrets.token_hex(4)
+        self.wait_timeout = timeout
+        self.add_item(ConfirmButton(self.user_id, self.token, "fight"))
+        self.add_item(ConfirmButton(self.user_id, self.token, "back"))
+
+    async def wait(self):
+        """Wait for a choice; returns True if none came within the timeout (like View.wait)."""
+        key = (self.user_id, self.token)
+        PENDING_CONFIRMS[key] = asyncio.get_running_loop().create_future()
+        try:
+            self.value = await asyncio.wait_for(PENDING_CONFIRMS[key], self.wait_timeout)
+            return False
+        except asyncio.TimeoutError:
+            return True
+        finally:
+            PENDING_CONFIRMS.pop(key, None)
 
 async def setup(bot):
     await bot.add_cog(RPGCog(bot))
\ No newline at end of file
@@ -1,37 +1,96 @@
 import discord
 from discord.ext import commands
+from assets.utils.helpers import mention_user
+import asyncio
+import functools
+from assets.utils.gamesessions import GameSessionManager, FINISHED_UNDO_WINDOW
+from assets.utils.gamestate import GameSessionStore
+from assets.utils.ygocards import CARD_NAMES, card_db_available, get_card
+from assets.utils.helpers import truncate
+
+CARD_EMBED_CACHE_SIZE = 512  # rendered /ygocard embeds kept in memory
+FRAME_COLORS = {
+    "normal": discord.Color.from_rgb(253, 230, 138), "effect": discord.Color.from_rgb(255, 139, 83),
+    "ritual": discord.Color.from_rgb(157, 181, 204), "fusion": discord.Color.from_rgb(160, 134, 183),
+    "synchro": discord.Color.from_rgb(204, 204, 204), "xyz": discord.Color.from_rgb(0, 0, 0),
+    "link": discord.Color.from_rgb(0, 0, 139), "spell": discord.Color.from_rgb(29, 158, 116),
+    "trap": discord.Color.from_rgb(188, 90, 132)
+}
+
+@functools.lru_cache(maxsize=CARD_EMBED_CACHE_SIZE)
+def card_embed(card_id):
+    """Render a card once; callers copy the cached embed before adding anything to it."""
+    card = get_card(card_id)
+    frame = (card["frame_type"] or "").split("_")[0]
+    embed = discord.Embed(
+        title=truncate(card["name"], 256),
+        description=truncate(f"**{card['type'] or ''}**\n\n{card['description'] or ''}", 4096),
+        color=FRAME_COLORS.get(frame, discord.Color.blurple())
+    )
+    if card["atk"] is not None:
+        if card["link_val"] is not None:
+            embed.add_field(name="ATK / LINK", value=f"{card['atk']} / {card['link_val']}", inline=True)
+        else:
+            embed.add_field(name="ATK / DEF", value=f"{card['atk']} / {card['def']}", inline=True)
+    if card["level"]:
+        embed.add_field(name="Rank" if frame == "xyz" else "Level", value=str(card["level"]), inline=True)
+    if card["scale"] is not None:
+        embed.add_field(name="Pendulum Scale", value=str(card["scale"]), inline=True)
+    if card["attribute"] or card["race"]:
+        embed.add_field(name="Attribute / Type", value=" / ".join(v for v in (card["attribute"], card["race"]) if v), inline=True)
+    if card["archetype"]:
+        embed.add_field(name="Archetype", value=card["archetype"], inline=True)
+    if card["image_url"]:
+        embed.set_thumbnail(url=card["image_url"])
+    embed.set_footer(text=f"Passcode {card['id']} • {card['sets']} set printing(s)")
+    return embed
 
 class YGOCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        # {guild_id: {game_id: {"players": {user_id: {"life": int, "active": bool}}, "active": bool, "owner": user_id, "lobby": bool}}}
-        self.games = {}
-        # {guild_id: {user_id: game_id}}
-        self.player_games = {}
-
-    def get_next_game_id(self, guild_id):
-        if guild_id not in self.games or not self.games[guild_id]:
-            return 1
-        return max(self.games[guild_id].keys()) + 1
+        # Lobbies/games ({"players": {user_id: {"life": int, "active": bool}}, ...}), queued by max players
+        self.sessions = GameSessionManager()
+        self.game_store = GameSessionStore(self.sessions, "ygo", getattr(bot, "shard_label", "all"))  # Snapshot + life journal, written in batches
+
+    async def cog_load(self):
+        # Restore lobbies and games in one bulk read before any command runs
+        try:
+            self.sessions.restore(*await asyncio.to_thread(self.game_store.load))
+        except Exception as e:
+            print(f"Failed to restore YGO games: {e}")
+        self.game_store.start()
+        self.sessions.reaper.start(self.expire_game)
+
+    async def cog_unload(self):
+        # Write any queued life changes before shutting down
+        self.sessions.reaper.stop()
+        await self.game_store.stop()
+
+    async def expire_game(self, key):
+        # Close a lobby/game the reaper found idle and tell its channel once
+        guild_id, game_id = key
+        game = self.sessions.get(guild_id, game_id)
+        if game is None:
+            return
+        self.cleanup_game(guild_id, game_id)
+        channel = self.bot.get_channel(game["channel_id"]) if game.get("channel_id") else None
+        if channel is None:
+            return
+        what = "Lobby" if game["lobby"] else "Game"
+        minutes = self.sessions.idle_ttl(game) // 60
+        embed = discord.Embed(
+            title=f"Yu-Gi-Oh! {what} {game_id} Expired",
+            description=f"{what} {game_id} had no activity for {minutes} minutes and was closed.\n"
+                        f"Players: {', '.join(mention_user(pid) for pid in game['players'])}",
+            color=discord.Color.orange()
+        )
+        await channel.send(embed=embed)
 
     def get_player_game(self, guild_id, user_id):
-        return self.player_games.get(guild_id, {}).get(user_id)
+        return self.sessions.player_game(guild_id, user_id)
 
     def cleanup_game(self, guild_id, game_id):
-        # Remove game from games dict
-        if guild_id in self.games and game_id in self.games[guild_id]:
-            del self.games[guild_id][game_id]
-            # If no more games, remove the guild entry
-            if not self.games[guild_id]:
-                del self.games[guild_id]
-        # Remove all player references to this game
-        if guild_id in self.player_games:
-            to_remove = [uid for uid, gid in self.player_games[guild_id].items() if gid == game_id]
-            for uid in to_remove:
-                del self.player_games[guild_id][uid]
-            # If no more player refs, remove the guild entry
-            if not self.player_games[guild_id]:
-                del self.player_games[guild_id]
+        self.sessions.cleanup(guild_id, game_id)
 
     @commands.hybrid_command(name="ygostart", description="Create or join a Yu-Gi-Oh! duel lobby (2 or 4 players).")
     @discord.app_commands.describe(
@@ -51,8 +110,8 @@ class YGOCog(commands.Cog):
             return
 
         # Check if user is already in a game or lobby
-        if guild_id in self.player_games and user_id in self.player_games[guild_id]:
-            game_id = self.player_games[guild_id][user_id]
+        game_id = self.sessions.player_game(guild_id, user_id)
+        if game_id is not None:
             embed = discord.Embed(
                 title="Already in a Game or Lobby",
                 description=f"You are already in Game {game_id}. You must leave or wait for it to end before joining/starting another.",
@@ -61,33 +120,25 @@ class YGOCog(commands.Cog):
             await ctx.send(embed=embed)
             return
 
-        # Find an open lobby for this player count
-        open_lobby_id = None
-        if guild_id in self.games:
-            for gid, game in self.games[guild_id].items():
-                if game.get("lobby", False) and len(game["players"]) < players:
-                    open_lobby_id = gid
-                    break
+        # Oldest open lobby for this player count, if any
+        open_lobby_id = self.sessions.find_open_lobby(guild_id, players)
 
         if open_lobby_id is not None:
             # Join the open lobby
-            game = self.games[guild_id][open_lobby_id]
-            game["players"][user_id] = {"life": 8000, "active": True}
-            self.player_games[guild_id][user_id] = open_lobby_id
+            game = self.sessions.get(guild_id, open_lobby_id)
 
             # If lobby is now full, start the game
-            if len(game["players"]) == players:
-                game["active"] = True
-                game["lobby"] = False
+            if self.sessions.add_player(guild_id, open_lobby_id, user_id, {"life": 8000, "active": True}):
+                self.sessions.start(guild_id, open_lobby_id)
                 embed = discord.Embed(
                     title=f"Yu-Gi-Oh! Game {open_lobby_id} Started",
-                    description=f"Players: {', '.join(ctx.guild.get_member(pid).mention for pid in game['players'])}",
+                    description=f"Players: {', '.join(mention_user(pid) for pid in game['players'])}",
                     color=discord.Color.green()
                 )
                 await ctx.send(embed=embed)
                 first = self.pick_first_player(ctx, game)
                 if first:
-                    await ctx.send(f"🎲 {first.mention} goes first!")
+                    await ctx.send(f"🎲 {first} goes first!")
                 await self.show_game_life_totals(ctx, guild_id, open_lobby_id)
             else:
                 embed = discord.Embed(
@@ -99,22 +150,7 @@ class YGOCog(commands.Cog):
             return
 
         # No open lobby, create a new one
-        if guild_id not in self.games:
-            self.games[guild_id] = {}
-        if guild_id not in self.player_games:
-            self.player_games[guild_id] = {}
-
-        game_id = self.get_next_game_id(guild_id)
-        players_dict = {user_id: {"life": 8000, "active": True}}
-
-        self.games[guild_id][game_id] = {
-            "players": players_dict,
-            "active": False,
-            "owner": user_id,
-            "lobby": True,
-            "max_players": players
-        }
-        self.player_games[guild_id][user_id] = game_id
+        game_id, game = self.sessions.create(guild_id, user_id, players, players, {"life": 8000, "active": True}, channel_id=ctx.channel.id)
 
         embed = discord.Embed(
             title=f"Lobby Created for Game {game_id}",
@@ -132,7 +168,7 @@ class YGOCog(commands.Cog):
         user_id = ctx.author.id
 
         # Check if user is already in a game or lobby
-        if guild_id in self.player_games and user_id in self.player_games[guild_id]:
+        if self.sessions.player_game(guild_id, user_id) is not None:
             embed = discord.Embed(
                 title="Already in a Game or Lobby",
                 description="You must leave or wait for your current game to end before joining another.",
@@ -141,7 +177,8 @@ class YGOCog(commands.Cog):
             await ctx.send(embed=embed)
             return
 
-        if guild_id not in self.games or game_id not in self.games[guild_id]:
+        game = self.sessions.get(guild_id, game_id)
+        if game is None:
             embed = discord.Embed(
                 title="Lobby Not Found",
                 description=f"Game {game_id} does not exist.",
@@ -150,7 +187,6 @@ class YGOCog(commands.Cog):
             await ctx.send(embed=embed)
             return
 
-        game = self.games[guild_id][game_id]
         if not game.get("lobby", False):
             embed = discord.Embed(
                 title="Not a Lobby",
@@ -170,23 +206,18 @@ class YGOCog(commands.Cog):
             await ctx.send(embed=embed)
             return
 
-        # Add player to lobby
-        game["players"][user_id] = {"life": 8000, "active": True}
-        self.player_games[guild_id][user_id] = game_id
-
-        # If lobby is now full, start the game
-        if len(game["players"]) == max_players:
-            game["active"] = True
-            game["lobby"] = False
+        # Add player to lobby; if it is now full, start the game
+        if self.sessions.add_player(guild_id, game_id, user_id, {"life": 8000, "active": True}):
+            self.sessions.start(guild_id, game_id)
             embed = discord.Embed(
                 title=f"Yu-Gi-Oh! Game {game_id} Started",
-                description=f"Players: {', '.join(ctx.guild.get_member(pid).mention for pid in game['players'])}",
+                description=f"Players: {', '.join(mention_user(pid) for pid in game['players'])}",
                 color=discord.Color.green()
             )
             await ctx.send(embed=embed)
             first = self.pick_first_player(ctx, game)
             if first:
-                await ctx.send(f"🎲 {first.mention} goes first!")
+                await ctx.send(f"🎲 {first} goes first!")
             await self.show_game_life_totals(ctx, guild_id, game_id)
         else:
             embed = discord.Embed(
@@ -207,7 +238,7 @@ class YGOCog(commands.Cog):
 
         # If game_id is provided, show stats for that game (view only)
         if game_id is not None:
-            if guild_id not in self.games or game_id not in self.games[guild_id]:
+            if self.sessions.get(guild_id, game_id) is None:
                 embed = discord.Embed(
                     title="Game Not Found",
                     description=f"Game {game_id} does not exist.",
@@ -215,17 +246,13 @@ class YGOCog(commands.Cog):
                 )
                 await ctx.send(embed=embed)
                 return
-            game = self.games[guild_id][game_id]
+            game = self.sessions.get(guild_id, game_id)
             await self.show_game_life_totals(ctx, guild_id, game_id)
             return
 
         # Otherwise, default to user's current game (update/view)
         game_id = self.get_player_game(guild_id, user_id)
-        if (
-            not game_id
-            or guild_id not in self.games
-            or game_id not in self.games[guild_id]
-        ):
+        if not game_id or self.sessions.get(guild_id, game_id) is None:
             embed = discord.Embed(
                 title="No Game Running",
                 description="You are not in an active game. Start one with `/ygostart`.",
@@ -234,13 +261,10 @@ class YGOCog(commands.Cog):
             await ctx.send(embed=embed)
             return
 
-        game = self.games[guild_id][game_id]
+        game = self.sessions.get(guild_id, game_id)
         if user_id not in game["players"]:
             # Clean up stale mapping if present
-            if guild_id in self.player_games and user_id in self.player_games[guild_id]:
-                del self.player_games[guild_id][user_id]
-                if not self.player_games[guild_id]:
-                    del self.player_games[guild_id]
+            self.sessions.release_player(guild_id, user_id)
             embed = discord.Embed(
                 title="No Game Running",
                 description="You are not in an active game. Start one with `/ygostart`.",
@@ -251,9 +275,10 @@ class YGOCog(commands.Cog):
         player = game["players"][user_id]
 
         if amount is not None:
-            player["life"] += amount
+            self.sessions.change_life(guild_id, game_id, user_id, amount)
             if player["life"] <= 0:
                 player["active"] = False
+                self.sessions.touch(guild_id, game_id)
                 embed = discord.Embed(
                     title="Player Eliminated",
                     description=f"{ctx.author.mention} has lost all their life points and is eliminated!",
@@ -263,22 +288,24 @@ class YGOCog(commands.Cog):
                 # Check if only one player remains
                 active_players = [uid for uid, pdata in game["players"].items() if pdata["active"]]
                 if len(active_players) == 1:
-                    winner = ctx.guild.get_member(active_players[0])
+                    winner = mention_user(active_players[0])
                     game["active"] = False
                     win_embed = discord.Embed(
                         title="Game Over",
-                        description=f"{winner.mention} is the last duelist standing and wins the game!",
+                        description=f"{winner} is the last duelist standing and wins the game!\n"
+                                    f"Entered the wrong amount? `/ygoundo` within {FINISHED_UNDO_WINDOW // 60} minutes reopens the game.",
                         color=discord.Color.green()
                     )
                     await ctx.send(embed=win_embed)
-                    self.cleanup_game(guild_id, game_id)
+                    # Kept for the undo window instead of cleaned up, so a mistyped lethal change can be undone
+                    self.sessions.finish(guild_id, game_id)
                     return  # <--- Prevent further code from running after cleanup
                 await self.show_game_life_totals(ctx, guild_id, game_id)
                 return
         await self.show_game_life_totals(ctx, guild_id, game_id)
 
     async def show_game_life_totals(self, ctx, guild_id, game_id):
-        game = self.games[guild_id][game_id]
+        game = self.sessions.get(guild_id, game_id)
         embed = discord.Embed(
             title=f"Yu-Gi-Oh! Game {game_id} Life Totals",
             color=discord.Color.blurple()
@@ -290,10 +317,93 @@ class YGOCog(commands.Cog):
             embed.add_field(name=member.display_name if member else str(pid), value=value, inline=False)
         await ctx.send(embed=embed)
 
+    @commands.hybrid_command(name="ygoundo", description="Undo your last life point change in your current Yu-Gi-Oh! game.")
+    async def ygoundo(self, ctx):
+        guild_id = ctx.guild.id
+        user_id = ctx.author.id
+
+        game_id = self.get_player_game(guild_id, user_id)
+        game = self.sessions.get(guild_id, game_id)
+        finished = False
+        if game is None:
+            # A game that just ended on a life change can still be reopened by undoing it
+            game_id, game = self.sessions.finished_game(guild_id, user_id)
+            finished = game is not None
+        if not game or not (game["active"] or finished) or user_id not in game["players"]:
+            embed = discord.Embed(
+                title="No Game Running",
+                description="You are not in an active game. Start one with `/ygostart`.",
+                color=discord.Color.red()
+            )
+            await ctx.send(embed=embed)
+            return
+
+        undone = self.sessions.undo_life(guild_id, game_id, user_id)
+        if undone is None:
+            embed = discord.Embed(
+                title="Nothing to Undo",
+                description=f"You have no life point changes to undo in Game {game_id}.",
+                color=discord.Color.yellow()
+            )
+            await ctx.send(embed=embed)
+            return
+
+        amount, _, value = undone
+        description = f"Reverted **{amount:+d}** life points, now **{value}**."
+        # Undoing the change that eliminated the player puts them back in the duel
+        player = game["players"][user_id]
+        if not player["active"] and value + amount <= 0 < value:
+            player["active"] = True
+            if finished:
+                self.sessions.revive(guild_id, game_id)
+                description += f"\nGame {game_id} is reopened."
+            else:
+                self.sessions.touch(guild_id, game_id)
+            description += f"\n{ctx.author.mention} is back in the duel."
+        embed = discord.Embed(
+            title="Life Change Undone",
+            description=description,
+            color=discord.Color.green()
+        )
+        await ctx.send(embed=embed)
+        if self.sessions.get(guild_id, game_id) is not None:
+            await self.show_game_life_totals(ctx, guild_id, game_id)
+
+    @commands.hybrid_command(name="ygocard", description="Look up a Yu-Gi-Oh! card by name (prefix and fuzzy search).")
+    @discord.app_commands.describe(name="Card name, the start of any word in it, or a close spelling")
+    async def ygocard(self, ctx, *, name: str):
+        if not card_db_available():
+            embed = discord.Embed(
+                title="Card Database Missing",
+                description="The card database has not been imported yet. The bot owner can build it with `python -m assets.utils.ygocards <YGOPRODeck dump>`.",
+                color=discord.Color.red()
+            )
+            await ctx.send(embed=embed)
+            return
+
+        matches = CARD_NAMES.search(name)
+        if not matches:
+            embed = discord.Embed(
+                title="Card Not Found",
+                description=f"No card matches **{truncate(name, 100)}**.",
+                color=discord.Color.red()
+            )
+            await ctx.send(embed=embed)
+            return
+
+        embed = card_embed(matches[0][0]).copy()
+        if matches[0][2] != "exact" and len(matches) > 1:
+            embed.add_field(name="Other Matches", value="\n".join(match[1] for match in matches[1:]), inline=False)
+        await ctx.send(embed=embed)
+
+    @ygocard.autocomplete("name")
+    async def ygocard_autocomplete(self, interaction: discord.Interaction, current: str):
+        return [discord.app_commands.Choice(name=card[:100], value=card[:100]) for card in CARD_NAMES.complete_names(current)]
+
     @commands.hybrid_command(name="ygolobbies", description="List all Yu-Gi-Oh! lobbies and active games in this server.")
     async def ygolobbies(self, ctx):
         guild_id = ctx.guild.id
-        if guild_id not in self.games or not self.games[guild_id]:
+        if not self.sessions.guild_games(guild_id):
             embed = discord.Embed(
                 title="No Lobbies or Games",
                 description="There are currently no lobbies or active games.",
@@ -307,8 +417,8 @@ class YGOCog(commands.Cog):
             color=discord.Color.blurple()
         )
         found = False
-        for game_id, game in self.games[guild_id].items():
-            players = [ctx.guild.get_member(pid).mention for pid in game["players"]]
+        for game_id, game in self.sessions.guild_games(guild_id).items():
+            players = [mention_user(pid) for pid in game["players"]]
             max_players = game.get("max_players", 2)
             if game.get("lobby", False):
                 status = f"Lobby (waiting: {len(players)}/{max_players})"
@@ -333,7 +443,7 @@ class YGOCog(commands.Cog):
 
         # Check if user is in a game/lobby
         game_id = self.get_player_game(guild_id, user_id)
-        if not game_id or guild_id not in self.games or game_id not in self.games[guild_id]:
+        if not game_id or self.sessions.get(guild_id, game_id) is None:
             embed = discord.Embed(
                 title="Not in a Lobby",
                 description="You are not currently in any lobby.",
@@ -342,7 +452,7 @@ class YGOCog(commands.Cog):
             await ctx.send(embed=embed)
             return
 
-        game = self.games[guild_id][game_id]
+        game = self.sessions.get(guild_id, game_id)
         if not game.get("lobby", False):
             embed = discord.Embed(
                 title="Game Already Started",
@@ -352,11 +462,8 @@ class YGOCog(commands.Cog):
             await ctx.send(embed=embed)
             return
 
-        # Remove player from lobby
-        if user_id in game["players"]:
-            del game["players"][user_id]
-        if user_id in self.player_games[guild_id]:
-            del self.player_games[guild_id][user_id]
+        # Remove player from lobby (an emptied lobby is deleted)
+        self.sessions.remove_player(guild_id, game_id, user_id)
 
         embed = discord.Embed(
             title="Left Lobby",
@@ -365,10 +472,6 @@ class YGOCog(commands.Cog):
         )
         await ctx.send(embed=embed)
 
-        # If lobby is empty, delete it
-        if not game["players"]:
-            del self.games[guild_id][game_id]
-
     @commands.hybrid_command(name="ygoforcestart", description="Force start a lobby before max players are reached (owner only).")
     @discord.app_commands.describe(
         game_id="Game ID of the lobby you want to start (optional, defaults to your current lobby)"
@@ -380,7 +483,7 @@ class YGOCog(commands.Cog):
         # Determine which lobby to start
         if game_id is None:
             game_id = self.get_player_game(guild_id, user_id)
-        if not game_id or guild_id not in self.games or game_id not in self.games[guild_id]:
+        if not game_id or self.sessions.get(guild_id, game_id) is None:
             embed = discord.Embed(
                 title="Lobby Not Found",
                 description="You are not in a lobby or the lobby does not exist.",
@@ -389,7 +492,7 @@ class YGOCog(commands.Cog):
             await ctx.send(embed=embed)
             return
 
-        game = self.games[guild_id][game_id]
+        game = self.sessions.get(guild_id, game_id)
         if not game.get("lobby", False):
             embed = discord.Embed(
                 title="Game Already Started",
@@ -410,17 +513,16 @@ class YGOCog(commands.Cog):
             return
 
         # Start the game
-        game["active"] = True
-        game["lobby"] = False
+        self.sessions.start(guild_id, game_id)
         embed = discord.Embed(
             title=f"Yu-Gi-Oh! Game {game_id} Started (Forced)",
-            description=f"Players: {', '.join(ctx.guild.get_member(pid).mention for pid in game['players'])}",
+            description=f"Players: {', '.join(mention_user(pid) for pid in game['players'])}",
             color=discord.Color.green()
         )
         await ctx.send(embed=embed)
         first = self.pick_first_player(ctx, game)
         if first:
-            await ctx.send(f"🎲 {first.mention} goes first!")
+            await ctx.send(f"🎲 {first} goes first!")
         await self.show_game_life_totals(ctx, guild_id, game_id)
 
     @commands.hybrid_command(name="ygosurrender", description="Forfeit the current Yu-Gi-Oh! game (you will be eliminated).")
@@ -428,7 +530,7 @@ class YGOCog(commands.Cog):
         guild_id = ctx.guild.id
         user_id = ctx.author.id
         game_id = self.get_player_game(guild_id, user_id)
-        if not game_id or guild_id not in self.games or game_id not in self.games[guild_id]:
+        if not game_id or self.sessions.get(guild_id, game_id) is None:
             embed = discord.Embed(
                 title="No Game Running",
                 description="There is no active game to forfeit.",
@@ -436,7 +538,7 @@ class YGOCog(commands.Cog):
             )
             await ctx.send(embed=embed)
             return
-        game = self.games[guild_id][game_id]
+        game = self.sessions.get(guild_id, game_id)
         if not game["active"] or user_id not in game["players"] or not game["players"][user_id]["active"]:
             embed = discord.Embed(
                 title="No Game Running",
@@ -446,6 +548,7 @@ class YGOCog(commands.Cog):
             await ctx.send(embed=embed)
             return
         game["players"][user_id]["active"] = False
+        self.sessions.touch(guild_id, game_id)
         embed = discord.Embed(
             title="Player Forfeited",
             description=f"{ctx.author.mention} has forfeited and is eliminated from the game.",
@@ -455,11 +558,11 @@ class YGOCog(commands.Cog):
         # Check if only one player remains
         active_players = [uid for uid, pdata in game["players"].items() if pdata["active"]]
         if len(active_players) == 1:
-            winner = ctx.guild.get_member(active_players[0])
+            winner = mention_user(active_players[0])
             game["active"] = False
             win_embed = discord.Embed(
                 title="Game Over",
-                description=f"{winner.mention} is the last duelist standing and wins the game!",
+                description=f"{winner} is the last duelist standing and wins the game!",
                 color=discord.Color.green()
             )
             await ctx.send(embed=win_embed)
@@ -471,8 +574,7 @@ class YGOCog(commands.Cog):
             return None
         import random
         first_id = random.choice(player_ids)
-        member = ctx.guild.get_member(first_id)
-        return member
+        return mention_user(first_id)
 
 async def setup(bot):
     await bot.add_cog(YGOCog(bot))
\ No newline at end of file
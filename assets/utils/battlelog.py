@@ -0,0 +1,83 @@
+import time
+from collections import deque, OrderedDict
+
+BATTLE_LOG_HISTORY = 20  # rendered combat logs kept per user for /rpglog
+BATTLE_LOG_USERS = 2000  # users whose logs are kept; the least recently fighting are dropped first
+
+# Event kinds emitted by the combat phases
+ATTACK = "attack"
+CRIT = "crit"
+EFFECT = "effect"
+EVADE = "evade"
+SPELL = "spell"
+DEBUFF = "debuff"
+SIGNATURE = "signature"
+REGEN = "regen"
+REVIVE = "revive"
+DEFEAT = "defeat"
+VICTORY = "victory"
+TURN = "turn"
+INFO = "info"
+
+
+class BattleEvent:
+    __slots__ = ("kind", "text")
+
+    def __init__(self, kind, text):
+        self.kind = kind
+        self.text = text
+
+
+class BattleLog:
+    """
+    Ordered list of events produced by one combat action.
+    Phases append events and set the result flags; the text is only rendered once, when sending.
+    """
+    def __init__(self):
+        self.events = []
+        self.player_defeated = False
+        self.monster_defeated = False
+        self.cancelled = False  # The action never happened (bad spell, not enough mana, ...)
+
+    def add(self, kind, text):
+        if text:
+            self.events.append(BattleEvent(kind, text))
+
+    def has(self, kind):
+        return any(e.kind == kind for e in self.events)
+
+    def render(self):
+        lines = []
+        for event in self.events:
+            lines.extend(line.rstrip() for line in event.text.split("\n") if line.strip())
+        return "\n".join(lines)
+
+
+class BattleLogHistory:
+    """
+    Bounded per-user ring buffer of rendered combat logs.
+    At most `users` users are kept; the one who fought least recently is dropped past that.
+    """
+    def __init__(self, size=BATTLE_LOG_HISTORY, users=BATTLE_LOG_USERS):
+        self.size = size
+        self.users = users
+        self.logs = OrderedDict()  # {user_id: deque[(timestamp, title, text)]}, least recent first
+
+    def record(self, user_ids, title, text):
+        if not text:
+            return
+        entry = (time.time(), title, text)
+        for user_id in user_ids:
+            history = self.logs.get(user_id)
+            if history is None:
+                history = self.logs[user_id] = deque(maxlen=self.size)
+            history.append(entry)
+            self.logs.move_to_end(user_id)
+        while len(self.logs) > self.users:
+            self.logs.popitem(last=False)
+
+    def recent(self, user_id, count):
+        history = self.logs.get(user_id)
+        if not history:
+            return []
+        return list(history)[-count:]
@@ -0,0 +1,216 @@
+import time
+import asyncio
+from assets.utils.reaper import IdleReaper
+
+BATTLE_TTL = 30 * 60  # seconds a fight may sit untouched before it is evicted
+PLAYER_STATE_TTL = 30 * 60  # seconds an out-of-battle buff/regen state is kept
+SWEEP_INTERVAL = 30  # seconds between checks of the earliest deadlines
+
+
+class Battle:
+    """
+    One solo or party fight. `kind`/`owner_id` match the cog's battle lock key:
+    ("battle", user_id) for solo fights, ("party", party_id) for party fights.
+    `channel_id` is where the fight started, told when it is evicted.
+    """
+    __slots__ = ("kind", "owner_id", "monster", "participants", "acted", "started_at", "last_active", "channel_id")
+
+    def __init__(self, kind, owner_id, monster, participants, acted=None, started_at=None, last_active=None, channel_id=None):
+        self.kind = kind
+        self.owner_id = owner_id
+        self.monster = monster
+        self.participants = set(participants)
+        self.acted = set(acted or ())  # Party members who attacked this turn
+        self.started_at = started_at or time.time()
+        self.last_active = last_active or self.started_at
+        self.channel_id = channel_id
+
+    @property
+    def key(self):
+        return self.kind, self.owner_id
+
+    def to_dict(self):
+        return {
+            "kind": self.kind, "owner_id": self.owner_id, "monster": self.monster,
+            "participants": self.participants, "acted": self.acted,
+            "started_at": self.started_at, "last_active": self.last_active, "channel_id": self.channel_id
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+
+class PlayerCombatState:
+    """A player's buffs/debuffs (the dict EffectEngine works on) and fractional regen carry-over."""
+    __slots__ = ("effects", "regen_remainder", "mana_regen_remainder", "last_active")
+
+    def __init__(self, effects=None, regen_remainder=0.0, mana_regen_remainder=0.0, last_active=None):
+        self.effects = effects if effects is not None else {}
+        self.regen_remainder = regen_remainder
+        self.mana_regen_remainder = mana_regen_remainder
+        self.last_active = last_active or time.time()
+
+    def to_dict(self):
+        return {
+            "effects": self.effects, "regen_remainder": self.regen_remainder,
+            "mana_regen_remainder": self.mana_regen_remainder, "last_active": self.last_active
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+
+class BattleRegistry:
+    """
+    Active fights keyed by battle lock key plus per-player combat state keyed by user id,
+    both O(1) to look up. Idle reapers evict fights nobody has touched for BATTLE_TTL and
+    player states idle for PLAYER_STATE_TTL, postponing anything `is_busy` reports as in use
+    (e.g. a held battle lock) and states of players still in a fight. Each evicted fight is
+    passed to `on_evict` (a coroutine function) once.
+    """
+    def __init__(self, ttl=BATTLE_TTL, player_ttl=PLAYER_STATE_TTL, sweep_interval=SWEEP_INTERVAL, is_busy=None, on_evict=None):
+        self.ttl = ttl
+        self.player_ttl = player_ttl
+        self.sweep_interval = sweep_interval
+        self.is_busy = is_busy or (lambda key: False)
+        self.on_evict = on_evict
+        self.battles = {}  # {(kind, owner_id): Battle}
+        self.players = {}  # {user_id: PlayerCombatState}
+        self.participant_of = {}  # {user_id: battle key}
+        self.battle_reaper = IdleReaper("battle")
+        self.player_reaper = IdleReaper("player state")
+        self.evicted = {"battles": 0, "players": 0}
+        self._task = None
+
+    def __len__(self):
+        return len(self.battles)
+
+    def __contains__(self, key):
+        return key in self.battles
+
+    def get(self, key):
+        """Return the Battle for a lock key (marking it active), or None."""
+        battle = self.battles.get(key)
+        if battle is not None:
+            battle.last_active = time.time()
+            self.battle_reaper.touch(key, self.ttl, battle.last_active)
+        return battle
+
+    def _track(self, battle):
+        self.battle_reaper.touch(battle.key, self.ttl, battle.last_active)
+        for user_id in battle.participants:
+            self.participant_of[user_id] = battle.key
+
+    def start_battle(self, key, monster, participants, channel_id=None):
+        battle = self.battles[key] = Battle(key[0], key[1], monster, participants, channel_id=channel_id)
+        self._track(battle)
+        for user_id in battle.participants:
+            self.player(user_id)
+        return battle
+
+    def end(self, key):
+        """Remove a fight and its participants' combat state; returns the Battle or None."""
+        battle = self.battles.pop(key, None)
+        if battle is not None:
+            self.battle_reaper.forget(key)
+            for user_id in battle.participants:
+                self.drop_player(user_id)
+                if self.participant_of.get(user_id) == key:
+                    del self.participant_of[user_id]
+        return battle
+
+    def player(self, user_id):
+        state = self.players.get(user_id)
+        if state is None:
+            state = self.players[user_id] = PlayerCombatState()
+        state.last_active = time.time()
+        self.player_reaper.touch(user_id, self.player_ttl, state.last_active)
+        return state
+
+    def player_effects(self, user_id):
+        return self.player(user_id).effects
+
+    def drop_player(self, user_id):
+        self.players.pop(user_id, None)
+        self.player_reaper.forget(user_id)
+
+    def sweep(self, now=None):
+        """Evict fights and player states whose deadlines passed; returns (evicted Battles, player states evicted)."""
+        now = now or time.time()
+        evicted = []
+        for key in self.battle_reaper.due(now):
+            if self.is_busy(key):
+                self.battle_reaper.defer(key, self.sweep_interval, now)
+                continue
+            battle = self.end(key)
+            if battle is not None:
+                evicted.append(battle)
+        idle = 0
+        for user_id in self.player_reaper.due(now):
+            if user_id in self.participant_of:
+                self.player_reaper.defer(user_id, self.player_ttl, now)
+            elif self.players.pop(user_id, None) is not None:
+                idle += 1
+        self.evicted["battles"] += len(evicted)
+        self.evicted["players"] += idle
+        return evicted, idle
+
+    def restore(self, battles, players):
+        """Replace the contents with persisted {key: battle dict} and {user_id: state dict}."""
+        self.battles = {tuple(key): Battle.from_dict(data) for key, data in battles.items()}
+        self.players = {uid: PlayerCombatState.from_dict(data) for uid, data in players.items()}
+        # Deadlines continue from the persisted activity times
+        for battle in self.battles.values():
+            self._track(battle)
+        for user_id, state in self.players.items():
+            self.player_reaper.touch(user_id, self.player_ttl, state.last_active)
+
+    def restore_legacy(self, active_battles, parties):
+        """
+        Convert the old flat active_battles dict ({user_id or party_id: monster,
+        "<id>_state": {...}, "<id>_regen_remainder": float, ...}).
+        """
+        for key, value in active_battles.items():
+            if isinstance(key, str):
+                owner, _, suffix = key.partition("_")
+                if not owner.isdigit():
+                    continue
+                if suffix == "state":
+                    self.player(int(owner)).effects = value
+                elif suffix == "mana_regen_remainder":
+                    self.player(int(owner)).mana_regen_remainder = value
+                elif suffix == "regen_remainder" and int(owner) not in parties:
+                    self.player(int(owner)).regen_remainder = value
+            elif key in parties:
+                self.start_battle(("party", key), value, parties[key]["members"])
+            else:
+                self.start_battle(("battle", key), value, {key})
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                battles, players = self.sweep()
+            except Exception as e:
+                print(f"Failed to sweep battles: {e}")
+                continue
+            if battles or players:
+                print(f"Evicted {len(battles)} idle battles and {players} idle player states")
+            for battle in battles:
+                if self.on_evict is None:
+                    break
+                try:
+                    await self.on_evict(battle)
+                except Exception as e:
+                    print(f"Failed to notify evicted battle {battle.key}: {e}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
@@ -0,0 +1,179 @@
+import sqlite3
+import os
+import json
+import asyncio
+
+DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "data.db")
+
+BATTLE_CHECKPOINT_INTERVAL = 30  # seconds between journal checkpoints
+JOURNAL_COMPACT_THRESHOLD = 500  # journal rows kept before folding them into a fresh snapshot
+
+# Each persisted structure is journaled under its own scope
+SCOPES = ("battle", "player", "party", "member", "meta")
+
+LOAD_SNAPSHOT_SQL = "SELECT seq, data FROM rpg_session_snapshot WHERE owner = ?"
+REPLAY_JOURNAL_SQL = "SELECT scope, key, value FROM rpg_session_journal WHERE owner = ? AND seq > ? ORDER BY seq"
+APPEND_JOURNAL_SQL = "INSERT INTO rpg_session_journal (owner, scope, key, value) VALUES (?, ?, ?, ?)"
+JOURNAL_END_SQL = "SELECT COALESCE(MAX(seq), 0) FROM rpg_session_journal WHERE owner = ?"
+TRUNCATE_JOURNAL_SQL = "DELETE FROM rpg_session_journal WHERE owner = ? AND seq <= ?"
+
+
+def _encode(obj):
+    if isinstance(obj, set):
+        return {"__set__": sorted(obj, key=str)}
+    raise TypeError(f"Cannot persist {type(obj).__name__}")
+
+def _decode(obj):
+    if len(obj) == 1 and "__set__" in obj:
+        return set(obj["__set__"])
+    return obj
+
+def dumps(value):
+    return json.dumps(value, default=_encode, sort_keys=True)
+
+def loads(text):
+    return json.loads(text, object_hook=_decode)
+
+def load_battle_rows(owner):
+    """Return ({scope: {key: value_json}}, journal_length) from `owner`'s snapshot plus replayed journal."""
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute(LOAD_SNAPSHOT_SQL, (owner,))
+    row = cursor.fetchone()
+    snapshot_seq, rows = (row[0], json.loads(row[1])) if row else (0, {})
+    rows = {scope: dict(rows.get(scope, {})) for scope in SCOPES}
+    cursor.execute(REPLAY_JOURNAL_SQL, (owner, snapshot_seq))
+    journal = cursor.fetchall()
+    conn.close()
+    for scope, key, value in journal:
+        if value is None:
+            rows[scope].pop(key, None)
+        else:
+            rows[scope][key] = value
+    return rows, len(journal)
+
+def append_battle_journal(owner, entries, full_rows=None):
+    """
+    Append changed keys to the journal in one transaction.
+    When `full_rows` is given the journal is folded into a new snapshot and truncated.
+    """
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    cursor.executemany(
+        APPEND_JOURNAL_SQL,
+        [(owner, scope, key, value) for scope, key, value in entries]
+    )
+    if full_rows is not None:
+        cursor.execute(JOURNAL_END_SQL, (owner,))
+        seq = cursor.fetchone()[0]
+        cursor.execute(
+            "INSERT OR REPLACE INTO rpg_session_snapshot (owner, seq, data) VALUES (?, ?, ?)",
+            (owner, seq, json.dumps(full_rows))
+        )
+        cursor.execute(TRUNCATE_JOURNAL_SQL, (owner, seq))
+    conn.commit()
+    conn.close()
+
+
+class BattleStateStore:
+    """
+    Persists the RPG cog's parties, party membership, party counter, active battles and player combat state.
+    State is stored as a snapshot plus an append-only journal of changed keys.
+    Each checkpoint serializes the live structures, diffs them against what was last written
+    and journals only the keys that changed; the journal is compacted into a new snapshot
+    once it grows past JOURNAL_COMPACT_THRESHOLD rows.
+    `owner` names the shard range of this process, so processes sharing the database
+    never replay or compact each other's state.
+    """
+    def __init__(self, cog, owner="all", interval=BATTLE_CHECKPOINT_INTERVAL):
+        self.cog = cog
+        self.owner = owner
+        self.interval = interval
+        self.persisted = {scope: {} for scope in SCOPES}  # {scope: {key_json: value_json}} as last written
+        self.journal_length = 0
+        self._task = None
+
+    def load(self):
+        """
+        Read everything back in bulk; returns
+        (battles, players, legacy_battles, active_parties, parties, party_counter).
+        `legacy_battles` holds rows written before battles were keyed by (kind, owner_id).
+        """
+        rows, self.journal_length = load_battle_rows(self.owner)
+        self.persisted = rows
+        battles, legacy_battles = {}, {}
+        for k, v in rows["battle"].items():
+            key = loads(k)
+            if isinstance(key, list):
+                battles[tuple(key)] = loads(v)
+            else:
+                legacy_battles[key] = loads(v)
+        players = {loads(k): loads(v) for k, v in rows["player"].items()}
+        parties = {loads(k): loads(v) for k, v in rows["party"].items()}
+        active_parties = {loads(k): loads(v) for k, v in rows["member"].items()}
+        party_counter = loads(rows["meta"].get(dumps("party_counter"), "1"))
+        return battles, players, legacy_battles, active_parties, parties, party_counter
+
+    def _serialize(self):
+        cog = self.cog
+        rows = {
+            "battle": {dumps(list(k)): dumps(b.to_dict()) for k, b in cog.battles.battles.items()},
+            "player": {dumps(k): dumps(p.to_dict()) for k, p in cog.battles.players.items()},
+            "party": {dumps(k): dumps(v) for k, v in cog.parties.items()},
+            "member": {dumps(k): dumps(v) for k, v in cog.active_parties.items()},
+            "meta": {dumps("party_counter"): dumps(cog.party_counter)}
+        }
+        entries = []
+        for scope in SCOPES:
+            old, new = self.persisted[scope], rows[scope]
+            for key, value in new.items():
+                if old.get(key) != value:
+                    entries.append((scope, key, value))
+            for key in old.keys() - new.keys():
+                entries.append((scope, key, None))
+        return rows, entries
+
+    def _prepare(self):
+        # Serialize on the event loop so the writer thread never sees a dict mid-mutation
+        rows, entries = self._serialize()
+        if not entries:
+            return None
+        compact = self.journal_length + len(entries) > JOURNAL_COMPACT_THRESHOLD
+        return rows, entries, rows if compact else None
+
+    def _commit(self, rows, entries, full_rows):
+        self.persisted = rows
+        self.journal_length = 0 if full_rows is not None else self.journal_length + len(entries)
+
+    def flush(self):
+        prepared = self._prepare()
+        if prepared:
+            rows, entries, full_rows = prepared
+            append_battle_journal(self.owner, entries, full_rows)
+            self._commit(rows, entries, full_rows)
+
+    async def checkpoint(self):
+        prepared = self._prepare()
+        if not prepared:
+            return
+        rows, entries, full_rows = prepared
+        await asyncio.to_thread(append_battle_journal, self.owner, entries, full_rows)
+        self._commit(rows, entries, full_rows)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.checkpoint()
+            except Exception as e:
+                print(f"Failed to checkpoint battle state: {e}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self.flush()
@@ -0,0 +1,256 @@
+import random
+import datetime
+from functools import partial
+
+# Rarity scaling factors for weapon special effects
+RARITY_SCALE = {
+    "common": 1.0,
+    "uncommon": 1.2,
+    "rare": 1.5,
+    "epic": 2.0,
+    "legendary": 3.0,
+    "raid": 4.0
+}
+
+
+class CombatHit:
+    """Mutable state for one hit; registry handlers read and update it in place."""
+    __slots__ = ("cog", "user_id", "monster", "base_dmg", "hp", "max_hp", "crit", "bonus_spell_dmg", "messages")
+
+    def __init__(self, cog, user_id, monster, base_dmg=0, hp=0, max_hp=0, crit=False, bonus_spell_dmg=0):
+        self.cog = cog
+        self.user_id = user_id
+        self.monster = monster
+        self.base_dmg = base_dmg
+        self.hp = hp
+        self.max_hp = max_hp
+        self.crit = crit
+        self.bonus_spell_dmg = bonus_spell_dmg
+        self.messages = []
+
+    def player_state(self, user_id=None):
+        return self.cog.battles.player_effects(user_id or self.user_id)
+
+
+# --- Weapon special effects: handler(effects, hit, scale, amount, scaled) ---
+
+def _bonus_damage(effects, hit, scale, amount, scaled, message):
+    bonus = int(scaled)
+    hit.base_dmg += bonus
+    hit.messages.append(message.format(bonus=bonus))
+
+def _bonus_vs(effects, hit, scale, amount, scaled, keyword, message):
+    if keyword in hit.monster["name"].lower():
+        _bonus_damage(effects, hit, scale, amount, scaled, message)
+
+def _monster_debuff(effects, hit, scale, amount, scaled, chance, debuff, turns, message):
+    if random.random() < chance * scale:
+        effects.apply(hit.monster, debuff, int(turns * scale), monster=True)
+        hit.messages.append(message)
+
+def _stun(effects, hit, scale, amount, scaled):
+    if random.random() < 0.25 * scale:
+        hit.monster["stunned"] = True
+        hit.messages.append("You stunned the monster!")
+
+def _heal_on_crit(effects, hit, scale, amount, scaled):
+    if hit.crit:
+        heal = int(hit.max_hp * 0.2 * scale)
+        hit.hp = min(hit.max_hp, hit.hp + heal)
+        hit.messages.append(f"You healed {heal} HP on crit!")
+
+def _lifesteal(effects, hit, scale, amount, scaled):
+    heal = int(hit.base_dmg * 0.5 * scale)
+    hit.hp = min(hit.max_hp, hit.hp + heal)
+    hit.messages.append(f"You lifesteal {heal} HP!")
+
+def _ignore_defense(effects, hit, scale, amount, scaled):
+    hit.base_dmg += int(hit.monster.get("defense", 0) * scale)
+    hit.messages.append("You ignore the monster's defense!")
+
+def _multi_hit(effects, hit, scale, amount, scaled):
+    extra_hits = random.randint(1, int(2 * scale))
+    extra_dmg = extra_hits * int(amount)
+    hit.base_dmg += extra_dmg
+    hit.messages.append(f"Multi-hit! You strike {1 + extra_hits} times for {extra_dmg} bonus damage!")
+
+def _reap(effects, hit, scale, amount, scaled):
+    monster = hit.monster
+    if monster["hp"] < monster["max_hp"] * 0.25:
+        hit.base_dmg += int(monster["max_hp"] * 0.2 * scale)
+        hit.messages.append("Reap! Extra damage to weakened foes!")
+
+def _never_miss(effects, hit, scale, amount, scaled):
+    hit.monster["evasion_chance"] = 0
+    hit.messages.append("Your attack cannot miss!")
+
+def _leadership(effects, hit, scale, amount, scaled):
+    cog = hit.cog
+    if hit.user_id in cog.active_parties:
+        party_id = cog.active_parties[hit.user_id]
+        for pid in cog.parties[party_id]["members"]:
+            if pid != hit.user_id:
+                effects.apply(hit.player_state(pid), "leadership", int(2 * scale))
+        hit.messages.append("Your leadership inspires your party!")
+
+def _instant_kill(effects, hit, scale, amount, scaled):
+    if random.random() < 0.05 * scale:
+        hit.monster["hp"] = 0
+        hit.messages.append("**INSTANT KILL!**")
+
+def _bonus_spell(effects, hit, scale, amount, scaled):
+    hit.base_dmg += int(hit.bonus_spell_dmg * 1.5 * scale)
+    hit.messages.append("Your spell power surges with this weapon!")
+
+def _revive_on_death(effects, hit, scale, amount, scaled):
+    if hit.hp <= 0:
+        hit.hp = int(hit.max_hp * 0.5 * scale)
+        hit.messages.append("You are revived by the Phoenix Bow!")
+
+def _double_damage_night(effects, hit, scale, amount, scaled):
+    if 0 <= datetime.datetime.utcnow().hour < 6:
+        hit.base_dmg *= 2 * scale
+        hit.messages.append("It's night! Double damage!")
+
+WEAPON_EFFECT_HANDLERS = {
+    "bonus_vs_dragon": partial(_bonus_vs, keyword="dragon", message="Bonus damage vs Dragon! (+{bonus})"),
+    "stun": _stun,
+    "heal_on_crit": _heal_on_crit,
+    "burn": partial(_monster_debuff, chance=0.3, debuff="burn", turns=3, message="The monster is burning!"),
+    "lifesteal": _lifesteal,
+    "ignore_defense": _ignore_defense,
+    "multi_hit": _multi_hit,
+    "curse": partial(_monster_debuff, chance=0.2, debuff="curse", turns=2, message="The monster is cursed and will take extra damage!"),
+    "bleed": partial(_monster_debuff, chance=0.3, debuff="bleed", turns=3, message="The monster is bleeding!"),
+    "reap": _reap,
+    "smite": partial(_bonus_vs, keyword="undead", message="Smite! Bonus damage to undead!"),
+    "never_miss": _never_miss,
+    "leadership": _leadership,
+    "instant_kill": _instant_kill,
+    "memory_wipe": partial(_monster_debuff, chance=0.15, debuff="memory_wipe", turns=2, message="The monster is confused and loses its next turn!"),
+    "blind": partial(_monster_debuff, chance=0.2, debuff="blind", turns=2, message="The monster is blinded and its accuracy drops!"),
+    "infinite_power": partial(_bonus_damage, message="Infinite Power! Massive bonus damage!"),
+    "bonus_spell": _bonus_spell,
+    "pierce": partial(_bonus_damage, message="Piercing attack! Ignores some defense."),
+    "revive_on_death": _revive_on_death,
+    "sleep": partial(_monster_debuff, chance=0.2, debuff="sleep", turns=2, message="The monster is put to sleep!"),
+    "double_damage_night": _double_damage_night,
+}
+
+
+class WeaponEffectRegistry:
+    """
+    Weapon name -> special-effect callable with its rarity scale and effect amount pre-bound.
+    Built once from the weapon catalogues; effect names with no handler are collected in `unknown`.
+    """
+    def __init__(self, effects, *catalogues):
+        self.by_weapon = {}
+        self.unknown = {}  # {effect name: [weapon names]}
+        for catalogue in catalogues:
+            for name, item in catalogue.items():
+                effect = item.get("effect")
+                if not effect:
+                    continue
+                handler = WEAPON_EFFECT_HANDLERS.get(effect)
+                if handler is None:
+                    self.unknown.setdefault(effect, []).append(name)
+                    continue
+                scale = RARITY_SCALE.get(item.get("rarity", "common"), 1.0)
+                amount = item.get("effect_amount", 1)
+                self.by_weapon[name] = partial(handler, effects, scale=scale, amount=amount, scaled=amount * scale)
+
+    def apply(self, weapon, hit):
+        handler = self.by_weapon.get(weapon)
+        if handler:
+            handler(hit)
+
+
+# --- Monster signature attacks: handler(effects, hit) ---
+
+def _signature_strike(effects, hit, message, damage=0.0, flat=0, debuff=None):
+    monster = hit.monster
+    dmg = int(monster["atk"] * damage + flat) if damage else 0
+    hit.messages.append(message.format(name=monster["name"], damage=dmg))
+    if dmg:
+        hit.hp -= dmg
+    if debuff:
+        effects.apply(hit.player_state(), debuff[0], debuff[1])
+
+def _signature_regenerate(effects, hit, message, heal_pct, below_half=False):
+    monster = hit.monster
+    heal = int(monster["max_hp"] * heal_pct)
+    hit.messages.append(message.format(name=monster["name"], heal=heal))
+    if not below_half or monster["hp"] <= monster["max_hp"] // 2:
+        monster["hp"] = min(monster["max_hp"], monster["hp"] + heal)
+
+def _signature_drain(effects, hit, message, damage):
+    monster = hit.monster
+    dmg = int(monster["atk"] * damage)
+    hit.messages.append(message.format(name=monster["name"], damage=dmg))
+    hit.hp -= dmg
+    monster["hp"] = min(monster["max_hp"], monster["hp"] + dmg)
+
+def _signature_evasion(effects, hit, message, amount):
+    monster = hit.monster
+    hit.messages.append(message.format(name=monster["name"]))
+    monster["evasion_chance"] = monster.get("evasion_chance", 0) + amount
+
+def _signature_multi_strike(effects, hit):
+    monster = hit.monster
+    hits = random.randint(2, 4)
+    total = 0
+    for _ in range(hits):
+        hit_dmg = max(1, int(monster["atk"] * 0.5))
+        hit.hp -= hit_dmg
+        total += hit_dmg
+    hit.messages.append(f"**Signature Attack!** The {monster['name']} uses Multi-Strike and hits you {hits} times for {total} total damage!")
+
+SIGNATURE_HANDLERS = {
+    "Regenerating Smash": partial(_signature_regenerate, message="**Signature Attack!** The {name} uses Regenerating Smash and regenerates {heal} HP!", heal_pct=0.15),
+    "Labyrinth Charge": partial(_signature_strike, message="**Signature Attack!** The {name} charges and lowers your defense!", damage=0.7, debuff=("defense_down", 2)),
+    "Commanding Strike": partial(_signature_strike, message="**Signature Attack!** The {name} uses Commanding Strike for {damage} bonus damage!", damage=0.5),
+    "Arcane Blast": partial(_signature_strike, message="**Signature Attack!** The {name} unleashes Arcane Blast for {damage} magic damage!", damage=0.7, flat=10),
+    "Frost Nova": partial(_signature_strike, message="**Signature Attack!** The {name} uses Frost Nova and chills you, lowering your defense!"),
+    "Flame Burst": partial(_signature_strike, message="**Signature Attack!** The {name} uses Flame Burst and burns you for 3 turns!", debuff=("burn", 3)),
+    "Surprise Chomp": partial(_signature_strike, message="**Signature Attack!** The {name} uses Surprise Chomp for {damage} surprise damage!", damage=0.8),
+    "Venom Breath": partial(_signature_strike, message="**Signature Attack!** The {name} uses Venom Breath and poisons you for 3 turns!", debuff=("poison", 3)),
+    "Earthquake": partial(_signature_strike, message="**Signature Attack!** The {name} uses Earthquake for {damage} earth-shaking damage!", damage=0.6, debuff=("defense_down", 2)),
+    "Death Ray": partial(_signature_strike, message="**Signature Attack!** The {name} uses Death Ray for {damage} necrotic damage!", damage=1.2),
+    "Multi-Strike": _signature_multi_strike,
+    "Hellfire": partial(_signature_strike, message="**Signature Attack!** The {name} uses Hellfire for {damage} fire damage!", damage=0.7),
+    "Aerial Assault": partial(_signature_evasion, message="**Signature Attack!** The {name} uses Aerial Assault and increases its evasion!", amount=0.1),
+    "Blood Drain": partial(_signature_drain, message="**Signature Attack!** The {name} uses Blood Drain, draining {damage} HP from you!", damage=0.5),
+    "Inferno Breath": partial(_signature_strike, message="**Signature Attack!** The {name} breathes inferno for {damage} damage!", damage=1.0),
+    "Titanic Slam": partial(_signature_strike, message="**Signature Attack!** The {name} uses Titanic Slam for {damage} crushing damage!", damage=0.9),
+    "Rebirth Flame": partial(_signature_regenerate, message="**Signature Attack!** The {name} uses Rebirth Flame and revives itself for {heal} HP!", heal_pct=0.5, below_half=True),
+    "Shadow Slash": partial(_signature_strike, message="**Signature Attack!** The {name} uses Shadow Slash for {damage} shadow damage!", damage=0.8),
+    "Cataclysm": partial(_signature_strike, message="**Signature Attack!** The {name} uses Cataclysm for {damage} catastrophic damage!", damage=1.5),
+    "Tsunami": partial(_signature_strike, message="**Signature Attack!** The {name} unleashes Tsunami, dealing {damage} water damage to all party members!", damage=1.2),
+    "Judgment Ray": partial(_signature_strike, message="**Signature Attack!** The {name} fires Judgment Ray, dealing {damage} holy damage and lowering defense!", damage=1.3, debuff=("defense_down", 2)),
+    "Volcanic Eruption": partial(_signature_strike, message="**Signature Attack!** The {name} causes a Volcanic Eruption, burning you for 3 turns!", damage=1.1, debuff=("burn", 3)),
+    "Thunderstorm": partial(_signature_strike, message="**Signature Attack!** The {name} summons a Thunderstorm, stunning you for 1 turn!", damage=1.0, debuff=("stun", 1)),
+    "Armor Break": partial(_signature_strike, message="**Signature Attack!** The {name} uses Armor Break, lowering your defense!", damage=0.5, debuff=("defense_down", 2)),
+}
+
+# Signature attacks that always fire once chosen, without the second per-rarity roll
+UNCONDITIONAL_SIGNATURES = {"Multi-Strike"}
+
+
+class SignatureAttackRegistry:
+    """Signature attack name -> pre-bound callable, validated against the monster catalogue."""
+    def __init__(self, effects, monsters):
+        self.by_name = {name: partial(handler, effects) for name, handler in SIGNATURE_HANDLERS.items()}
+        self.unknown = {}  # {sign_attack: [monster names]}
+        for monster in monsters:
+            sign_attack = monster.get("sign_attack")
+            if sign_attack and sign_attack not in self.by_name:
+                self.unknown.setdefault(sign_attack, []).append(monster.get("name", "?"))
+
+    def get(self, sign_attack):
+        return self.by_name.get(sign_attack)
+
+
+def report_unknown(kind, unknown):
+    """Print one startup warning per unknown effect name found in the data files."""
+    for name, owners in sorted(unknown.items()):
+        print(f"Unknown {kind} '{name}' used by: {', '.join(sorted(set(owners)))}")
@@ -0,0 +1,62 @@
+import sqlite3
+import os
+import json
+import hashlib
+import asyncio
+import discord
+
+DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "data.db")
+
+FINGERPRINT_KEY = "command_tree_fingerprint"
+
+_sync_lock = asyncio.Lock()
+
+
+def get_meta(key):
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute("SELECT value FROM bot_meta WHERE key = ?", (key,))
+    result = cursor.fetchone()
+    conn.close()
+    return result[0] if result else None
+
+def set_meta(key, value):
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute("INSERT OR REPLACE INTO bot_meta (key, value) VALUES (?, ?)", (key, value))
+    conn.commit()
+    conn.close()
+
+
+def _command_payload(command, tree):
+    # Command.to_dict takes the tree from discord.py 2.4 on
+    try:
+        return command.to_dict(tree)
+    except TypeError:
+        return command.to_dict()
+
+def command_tree_fingerprint(tree):
+    """
+    Stable SHA-256 of the global command tree: the exact payloads Discord would receive
+    (names, descriptions, parameters, permissions), ordered by type and name.
+    """
+    payloads = []
+    for command_type in (discord.AppCommandType.chat_input, discord.AppCommandType.user, discord.AppCommandType.message):
+        for command in tree.get_commands(type=command_type):
+            payloads.append(_command_payload(command, tree))
+    payloads.sort(key=lambda p: (p.get("type", 1), p["name"]))
+    encoded = json.dumps(payloads, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+async def sync_commands(bot, force=False):
+    """
+    Sync the global command tree only when its fingerprint differs from the last successful sync.
+    Returns (synced, count, fingerprint); count is None when the sync was skipped.
+    """
+    async with _sync_lock:
+        fingerprint = command_tree_fingerprint(bot.tree)
+        if not force and await asyncio.to_thread(get_meta, FINGERPRINT_KEY) == fingerprint:
+            return False, None, fingerprint
+        synced = await bot.tree.sync()
+        await asyncio.to_thread(set_meta, FINGERPRINT_KEY, fingerprint)
+        return True, len(synced), fingerprint
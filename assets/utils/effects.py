@@ -0,0 +1,125 @@
+MODIFIER_STATS = ("atk", "def", "evasion", "spell_dmg")  # Order of the modifier tuple returned to combat
+FLAT_STATS = {"atk", "def", "spell_dmg"}  # Scaled part is truncated to an int; chance stats stay fractional
+STACKING_RULES = {"replace", "refresh", "stack"}
+
+
+def compile_modifier(spec, stat):
+    """Turn {"base", "scale", "cap"} into a function of the caster's bonus_spell_dmg."""
+    base = spec.get("base", 0)
+    scale = spec.get("scale", 0)
+    cap = spec.get("cap")
+    if not scale:
+        return lambda bonus: base
+    if stat in FLAT_STATS:
+        return lambda bonus: base + int(bonus * scale)
+    if cap is not None:
+        return lambda bonus: base + max(-cap, min(cap, bonus * scale))
+    return lambda bonus: base + bonus * scale
+
+
+class CompiledEffect:
+    __slots__ = ("name", "bucket", "duration", "stacking", "modifiers", "damage_pct", "message")
+
+    def __init__(self, name, spec, monster=False):
+        self.name = name
+        self.bucket = "debuffs" if monster or spec.get("kind", "debuff") == "debuff" else "buffs"
+        self.duration = spec.get("duration", 1)
+        self.stacking = spec.get("stacking", "replace")
+        if self.stacking not in STACKING_RULES:
+            raise ValueError(f"Effect '{name}' has unknown stacking rule '{self.stacking}'")
+        self.modifiers = []
+        for stat, modifier in spec.get("modifiers", {}).items():
+            if stat not in MODIFIER_STATS:
+                raise ValueError(f"Effect '{name}' modifies unknown stat '{stat}'")
+            self.modifiers.append((MODIFIER_STATS.index(stat), compile_modifier(modifier, stat)))
+        tick = spec.get("tick", {})
+        self.damage_pct = tick.get("damage_pct", 0)
+        self.message = tick.get("message")
+
+
+class EffectEngine:
+    """
+    Buff/debuff engine compiled from the "effects" section of spells.json.
+    Each entity's effects live in {name: turns_left} dicts; a turn only visits the
+    effects present in those dicts and looks each one up in a prebuilt dispatch table.
+    """
+    def __init__(self, definitions):
+        self.player = {name: CompiledEffect(name, spec) for name, spec in definitions.get("player", {}).items()}
+        self.monster = {name: CompiledEffect(name, spec, monster=True) for name, spec in definitions.get("monster", {}).items()}
+
+    def apply(self, state, name, turns=None, monster=False):
+        """Add an effect to a player state (or monster dict) following its stacking rule."""
+        table = self.monster if monster else self.player
+        effect = table.get(name)
+        bucket = effect.bucket if effect else "debuffs"
+        stacking = effect.stacking if effect else "replace"
+        if turns is None:
+            turns = effect.duration if effect else 1
+        effects = state.setdefault(bucket, {})
+        current = effects.get(name, 0)
+        if stacking == "refresh":
+            effects[name] = max(current, turns)
+        elif stacking == "stack":
+            effects[name] = current + turns
+        else:
+            effects[name] = turns
+
+    @staticmethod
+    def _tick(effects, name):
+        turns = effects[name] - 1
+        if turns <= 0:
+            del effects[name]
+        else:
+            effects[name] = turns
+
+    def process_player(self, player_state, max_hp, bonus_spell_dmg):
+        """
+        Apply and decrement a player's active buffs/debuffs.
+        Returns ((atk_mod, def_mod, evasion_mod, spell_dmg_mod), hp_loss).
+        """
+        mods = [0, 0, 0, 0]
+        hp_loss = 0
+        for bucket in ("buffs", "debuffs"):
+            effects = player_state.get(bucket)
+            if not effects:
+                continue
+            for name in list(effects):
+                if effects[name] <= 0:
+                    del effects[name]
+                    continue
+                effect = self.player.get(name)
+                if effect:
+                    for index, modifier in effect.modifiers:
+                        mods[index] += modifier(bonus_spell_dmg)
+                    if effect.damage_pct:
+                        hp_loss += int(max_hp * effect.damage_pct)
+                self._tick(effects, name)
+        return tuple(mods), hp_loss
+
+    def process_monster(self, monster):
+        """
+        Apply and decrement a monster's active debuffs. Returns (message, dead).
+        Debuffs tick in the order spells.json declares them, not the order they were applied,
+        so the combat text reads the same whatever order the spells landed in.
+        """
+        effects = monster.setdefault("debuffs", {})
+        messages = []
+        for name, effect in self.monster.items():
+            if effects.get(name, 0) <= 0:
+                continue
+            damage = int(effect.damage_pct * monster["max_hp"]) if effect.damage_pct else 0
+            if damage:
+                monster["hp"] -= damage
+            if effect.message:
+                messages.append(effect.message.format(damage=damage))
+            self._tick(effects, name)
+        # Debuffs without a definition only count down
+        for name in list(effects):
+            if name not in self.monster:
+                if effects[name] <= 0:
+                    del effects[name]
+                else:
+                    self._tick(effects, name)
+        for name in [name for name, turns in effects.items() if turns <= 0]:
+            del effects[name]
+        return "\n".join(messages), monster["hp"] <= 0
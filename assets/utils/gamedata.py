@@ -0,0 +1,113 @@
+import os
+import json
+from functools import cached_property
+from assets.utils.effects import EffectEngine
+from assets.utils.combatregistry import WeaponEffectRegistry, SignatureAttackRegistry, report_unknown
+from assets.utils.nameindex import NameIndex
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data")
+
+
+def load_json(filename):
+    with open(os.path.join(DATA_DIR, filename), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class GameData:
+    """
+    RPG catalogues read from data/ on first use instead of at import time.
+    Each attribute is parsed (and any registry compiled) once, the first time a
+    command touches it, so loading the cogs never waits on the JSON files.
+    """
+    @cached_property
+    def spells_file(self):
+        # Spells per class plus the buff/debuff definitions under "effects"
+        return load_json("spells.json")
+
+    @cached_property
+    def spells(self):
+        return {key: value for key, value in self.spells_file.items() if key != "effects"}
+
+    @cached_property
+    def effects(self):
+        return EffectEngine(self.spells_file.get("effects", {}))
+
+    @cached_property
+    def quests(self):
+        return load_json("default_quests.json")
+
+    @cached_property
+    def items(self):
+        return load_json("default_items.json")
+
+    @cached_property
+    def weapon_items(self):
+        return {item["item_name"]: item for item in self.items if item.get("item_type") == "weapons"}
+
+    @cached_property
+    def rpg_item_names(self):
+        return frozenset(item["item_name"] for item in self.items)
+
+    @cached_property
+    def items_by_name(self):
+        return {item["item_name"]: item for item in self.items}
+
+    @cached_property
+    def market_items(self):
+        # Buyable in /rpgmarket: common to rare consumables, common/uncommon weapons
+        return [
+            item for item in self.items
+            if not item.get("shop_hidden", False) and (
+                (item.get("item_type") == "consumables" and item.get("rarity") in ("common", "uncommon", "rare"))
+                or (item.get("item_type") == "weapons" and item.get("rarity") in ("common", "uncommon"))
+            )
+        ]
+
+    # Name indexes for autocomplete and case-insensitive lookups
+    @cached_property
+    def item_names(self):
+        return NameIndex(self.items_by_name)
+
+    @cached_property
+    def market_names(self):
+        return NameIndex(item["item_name"] for item in self.market_items)
+
+    @cached_property
+    def weapon_names(self):
+        return NameIndex(self.weapon_items)
+
+    @cached_property
+    def spells_by_name(self):
+        return {char_class: {spell["name"]: spell for spell in spells} for char_class, spells in self.spells.items()}
+
+    @cached_property
+    def spell_names(self):
+        return {char_class: NameIndex(spell["name"] for spell in spells) for char_class, spells in self.spells.items()}
+
+    @cached_property
+    def quest_names(self):
+        return NameIndex(quest["quest_name"] for quest in self.quests)
+
+    @cached_property
+    def weapon_stats(self):
+        return load_json("weapon_stats.json")
+
+    @cached_property
+    def monsters(self):
+        return load_json("default_monsters.json")
+
+    @cached_property
+    def weapon_effects(self):
+        # default_items.json wins over weapon_stats.json
+        registry = WeaponEffectRegistry(self.effects, self.weapon_stats, self.weapon_items)
+        report_unknown("weapon effect", registry.unknown)
+        return registry
+
+    @cached_property
+    def signature_attacks(self):
+        registry = SignatureAttackRegistry(self.effects, self.monsters)
+        report_unknown("signature attack", registry.unknown)
+        return registry
+
+
+GAME_DATA = GameData()
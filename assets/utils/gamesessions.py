@@ -0,0 +1,294 @@
+import time
+from assets.utils.reaper import IdleReaper
+from assets.utils.lifehistory import LifeHistory
+
+LOBBY_IDLE_TTL = 15 * 60  # seconds an untouched lobby stays open
+GAME_IDLE_TTL = 3 * 60 * 60  # seconds a started game may go without a life change or join/leave
+FINISHED_UNDO_WINDOW = 2 * 60  # seconds a game ended by a life change can be revived by undoing it
+
+
+class GameSessionManager:
+    """
+    Lobbies and games for the tabletop cogs (MTG, YGO), shared so both index them the same way.
+    Games are plain dicts ({"players": {user_id: {...}}, "active", "lobby", "owner", "max_players", "queue", ...}).
+
+    - games: {guild_id: {game_id: game}}
+    - player_games: {guild_id: {user_id: game_id}}, the player -> game index
+    - open lobbies: {(guild_id, queue): {game_id: None}}, insertion-ordered so the oldest open lobby fills first
+    - next_ids: {guild_id: next game id}, monotonic so ids are never reused
+    A game's own "players" dict is the reverse index used to clean up the player index.
+
+    Changes are tracked for GameSessionStore: `dirty` games get a fresh snapshot, `removed`
+    games are deleted and `journal` holds life changes not yet written.
+    Every change also refreshes the game's deadline in `reaper`, which expires idle lobbies and games.
+    Life changes made through change_life are kept per player in a LifeHistory ring buffer
+    (in memory only) so they can be undone. A game ended by a life change is `finish`ed: it is
+    removed like any other, but it and its histories stay in `finished` for FINISHED_UNDO_WINDOW
+    seconds so undoing the lethal change can `revive` it.
+    """
+    def __init__(self):
+        self.games = {}
+        self.player_games = {}
+        self.open_lobbies = {}
+        self.next_ids = {}
+        self.dirty = set()  # {(guild_id, game_id)}
+        self.removed = set()  # {(guild_id, game_id)}
+        self.journal = []  # [(guild_id, game_id, user_id, field, value, changed_at)]
+        self.reaper = IdleReaper("game")
+        self.histories = {}  # {(guild_id, game_id): {user_id: LifeHistory}}
+        self.finished = {}  # {(guild_id, game_id): (game, seated user ids, deadline)}, oldest first
+        self.finished_players = {}  # {(guild_id, user_id): game_id} for the players of finished games
+
+    def get(self, guild_id, game_id):
+        return self.games.get(guild_id, {}).get(game_id)
+
+    def guild_games(self, guild_id):
+        return self.games.get(guild_id, {})
+
+    def player_game(self, guild_id, user_id):
+        return self.player_games.get(guild_id, {}).get(user_id)
+
+    def seated_players(self, guild_id, game_id):
+        """Players whose current game is still this one (scooped players have been released)."""
+        players = self.player_games.get(guild_id, {})
+        return [uid for uid in self.games[guild_id][game_id]["players"] if players.get(uid) == game_id]
+
+    def find_open_lobby(self, guild_id, queue):
+        """Oldest lobby with a free seat in this queue (format / player count), or None."""
+        return next(iter(self.open_lobbies.get((guild_id, queue), ())), None)
+
+    def _enqueue(self, guild_id, game_id, game):
+        self.open_lobbies.setdefault((guild_id, game["queue"]), {})[game_id] = None
+
+    def _dequeue(self, guild_id, game_id, game):
+        key = (guild_id, game["queue"])
+        lobbies = self.open_lobbies.get(key)
+        if lobbies is not None:
+            lobbies.pop(game_id, None)
+            if not lobbies:
+                del self.open_lobbies[key]
+
+    def create(self, guild_id, owner_id, queue, max_players, owner_data, **fields):
+        """Open a new lobby owned by `owner_id`; returns (game_id, game)."""
+        game_id = self.next_ids.get(guild_id, 1)
+        self.next_ids[guild_id] = game_id + 1
+        game = {
+            "players": {owner_id: owner_data},
+            "active": False,
+            "owner": owner_id,
+            "lobby": True,
+            "max_players": max_players,
+            "queue": queue,
+            **fields
+        }
+        self.games.setdefault(guild_id, {})[game_id] = game
+        self.player_games.setdefault(guild_id, {})[owner_id] = game_id
+        if max_players > 1:
+            self._enqueue(guild_id, game_id, game)
+        self.touch(guild_id, game_id)
+        return game_id, game
+
+    def add_player(self, guild_id, game_id, user_id, player_data):
+        """Seat a player in a lobby; returns True when that filled the lobby."""
+        game = self.games[guild_id][game_id]
+        game["players"][user_id] = player_data
+        self.player_games.setdefault(guild_id, {})[user_id] = game_id
+        self.touch(guild_id, game_id)
+        full = len(game["players"]) >= game["max_players"]
+        if full:
+            self._dequeue(guild_id, game_id, game)
+        return full
+
+    def remove_player(self, guild_id, game_id, user_id):
+        """Take a player out of a lobby; an emptied lobby is deleted. Returns True if it was deleted."""
+        game = self.games[guild_id][game_id]
+        game["players"].pop(user_id, None)
+        self.release_player(guild_id, user_id, game_id)
+        if not game["players"]:
+            self.cleanup(guild_id, game_id)
+            return True
+        if game["lobby"]:
+            self._enqueue(guild_id, game_id, game)
+        return False
+
+    def start(self, guild_id, game_id):
+        game = self.games[guild_id][game_id]
+        game["active"] = True
+        game["lobby"] = False
+        self._dequeue(guild_id, game_id, game)
+        self.touch(guild_id, game_id)
+        return game
+
+    def release_player(self, guild_id, user_id, game_id=None):
+        """Drop a player's game mapping (only if it still points at `game_id`, when given)."""
+        players = self.player_games.get(guild_id)
+        if players is None or user_id not in players:
+            return
+        if game_id is None or players[user_id] == game_id:
+            if players[user_id] in self.games.get(guild_id, {}):
+                self.touch(guild_id, players[user_id])
+            del players[user_id]
+            if not players:
+                del self.player_games[guild_id]
+
+    def cleanup(self, guild_id, game_id):
+        """Delete a game and every player mapping that still points at it."""
+        guild_games = self.games.get(guild_id)
+        game = guild_games.pop(game_id, None) if guild_games else None
+        if game is None:
+            return
+        if not guild_games:
+            del self.games[guild_id]
+        self._dequeue(guild_id, game_id, game)
+        for user_id in game["players"]:
+            self.release_player(guild_id, user_id, game_id)
+        self.dirty.discard((guild_id, game_id))
+        self.removed.add((guild_id, game_id))
+        self.reaper.forget((guild_id, game_id))
+        self.histories.pop((guild_id, game_id), None)
+
+    def finish(self, guild_id, game_id):
+        """Delete a game that just ended, keeping it and its life history for the undo window."""
+        key = (guild_id, game_id)
+        game = self.get(guild_id, game_id)
+        if game is None:
+            return
+        seated = self.seated_players(guild_id, game_id)
+        histories = self.histories.pop(key, None)
+        self.cleanup(guild_id, game_id)
+        self.prune_finished()
+        if histories is not None:
+            self.histories[key] = histories
+        self.finished[key] = (game, seated, time.time() + FINISHED_UNDO_WINDOW)
+        for user_id in game["players"]:
+            self.finished_players[(guild_id, user_id)] = game_id
+
+    def _drop_finished(self, key):
+        game, _, _ = self.finished.pop(key)
+        self.histories.pop(key, None)
+        guild_id, game_id = key
+        for user_id in game["players"]:
+            if self.finished_players.get((guild_id, user_id)) == game_id:
+                del self.finished_players[(guild_id, user_id)]
+
+    def prune_finished(self, now=None):
+        """Forget finished games whose undo window has passed (they are kept in deadline order)."""
+        now = now or time.time()
+        while self.finished:
+            key, (_, _, deadline) = next(iter(self.finished.items()))
+            if deadline > now:
+                break
+            self._drop_finished(key)
+
+    def finished_game(self, guild_id, user_id):
+        """(game_id, game) of the player's game that ended within the undo window, or (None, None)."""
+        self.prune_finished()
+        game_id = self.finished_players.get((guild_id, user_id))
+        if game_id is None:
+            return None, None
+        return game_id, self.finished[(guild_id, game_id)][0]
+
+    def revive(self, guild_id, game_id):
+        """Put a finished game back in play; its players are seated again unless they joined another game."""
+        key = (guild_id, game_id)
+        game, seated, _ = self.finished[key]
+        histories = self.histories.pop(key, None)
+        self._drop_finished(key)
+        if histories is not None:
+            self.histories[key] = histories
+        game["active"] = True
+        self.games.setdefault(guild_id, {})[game_id] = game
+        for user_id in seated:
+            if self.player_game(guild_id, user_id) is None:
+                self.player_games.setdefault(guild_id, {})[user_id] = game_id
+        # The removal may not be written yet; the snapshot from touch replaces it if it was
+        self.removed.discard(key)
+        self.touch(guild_id, game_id)
+        return game
+
+    def idle_ttl(self, game):
+        return LOBBY_IDLE_TTL if game["lobby"] else GAME_IDLE_TTL
+
+    def touch(self, guild_id, game_id):
+        """Mark a game for a fresh snapshot at the next checkpoint."""
+        self.dirty.add((guild_id, game_id))
+        game = self.get(guild_id, game_id)
+        if game is not None:
+            self.reaper.touch((guild_id, game_id), self.idle_ttl(game))
+
+    def record_life(self, guild_id, game_id, user_id, value, source=None):
+        """Journal a player's new life total, or commander damage taken from `source`."""
+        field = "life" if source is None else f"commander:{source}"
+        self.journal.append((guild_id, game_id, user_id, field, value, time.time()))
+        self.reaper.touch((guild_id, game_id), GAME_IDLE_TTL)
+
+    def change_life(self, guild_id, game_id, user_id, amount, source=None):
+        """
+        Add `amount` to a player's life, or to the commander damage taken from `source`,
+        remember it for undo and journal it. Returns the new total.
+        """
+        player = self.games[guild_id][game_id]["players"][user_id]
+        if source is None:
+            player["life"] += amount
+            value = player["life"]
+        else:
+            damage = player.setdefault("commander", {})
+            damage[source] = damage.get(source, 0) + amount
+            value = damage[source]
+        histories = self.histories.setdefault((guild_id, game_id), {})
+        history = histories.get(user_id)
+        if history is None:
+            history = histories[user_id] = LifeHistory()
+        history.push(amount, source or 0)
+        self.record_life(guild_id, game_id, user_id, value, source)
+        return value
+
+    def undo_life(self, guild_id, game_id, user_id):
+        """
+        Revert a player's latest change, also in a finished game; returns
+        (amount reverted, source or None, new total) or None.
+        A finished game is not journaled; reviving it writes a fresh snapshot.
+        """
+        history = self.histories.get((guild_id, game_id), {}).get(user_id)
+        entry = history.pop() if history else None
+        if entry is None:
+            return None
+        amount, source, _ = entry
+        game = self.get(guild_id, game_id)
+        live = game is not None
+        if not live:
+            game = self.finished[(guild_id, game_id)][0]
+        player = game["players"][user_id]
+        if source:
+            player["commander"][source] -= amount
+            value = player["commander"][source]
+        else:
+            player["life"] -= amount
+            value = player["life"]
+        if live:
+            self.record_life(guild_id, game_id, user_id, value, source or None)
+        return amount, source or None, value
+
+    def life_history(self, guild_id, game_id):
+        """{user_id: LifeHistory} for a game (empty when nothing was changed yet)."""
+        return self.histories.get((guild_id, game_id), {})
+
+    def restore(self, games, seated, next_ids):
+        """
+        Replace the contents with persisted {guild_id: {game_id: game}}, the seated players
+        per (guild_id, game_id) and the id counters, then rebuild the player index and lobby queues.
+        Restored games get a full idle TTL from now.
+        """
+        self.games = games
+        self.next_ids = next_ids
+        self.player_games = {}
+        self.open_lobbies = {}
+        for guild_id, guild_games in games.items():
+            for game_id in sorted(guild_games):
+                game = guild_games[game_id]
+                for user_id in seated.get((guild_id, game_id), ()):
+                    self.player_games.setdefault(guild_id, {})[user_id] = game_id
+                if game["lobby"] and len(game["players"]) < game["max_players"]:
+                    self._enqueue(guild_id, game_id, game)
+                self.reaper.touch((guild_id, game_id), self.idle_ttl(game))
+                self.next_ids[guild_id] = max(self.next_ids.get(guild_id, 1), game_id + 1)
@@ -0,0 +1,219 @@
+import sqlite3
+import os
+import json
+import asyncio
+
+DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "data.db")
+
+GAME_CHECKPOINT_INTERVAL = 5  # seconds between batched writes
+GAME_JOURNAL_COMPACT_THRESHOLD = 100  # journal rows per game before it is folded into a fresh snapshot
+
+# Every statement is scoped by `owner` (the shard range of the process, see assets/utils/shards.py),
+# so processes sharing the database never restore, expire or delete each other's games
+LOAD_SNAPSHOTS_SQL = "SELECT guild_id, game_id, seq, data FROM tabletop_game_snapshot WHERE owner = ? AND kind = ?"
+# Ordered like idx_tabletop_life_journal_owner_game so the replay walks the index instead of sorting;
+# rows only need to be in seq order within a game
+LOAD_JOURNAL_SQL = (
+    "SELECT seq, guild_id, game_id, user_id, field, value FROM tabletop_life_journal "
+    "WHERE owner = ? AND kind = ? ORDER BY guild_id, game_id, seq"
+)
+LOAD_GAME_IDS_SQL = "SELECT guild_id, next_id FROM tabletop_game_ids WHERE owner = ? AND kind = ?"
+APPEND_LIFE_SQL = (
+    "INSERT INTO tabletop_life_journal (owner, kind, guild_id, game_id, user_id, field, value, changed_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+JOURNAL_END_SQL = "SELECT COALESCE(MAX(seq), 0) FROM tabletop_life_journal"
+SAVE_SNAPSHOT_SQL = (
+    "INSERT OR REPLACE INTO tabletop_game_snapshot (owner, kind, guild_id, game_id, seq, data) VALUES (?, ?, ?, ?, ?, ?)"
+)
+COMPACT_JOURNAL_SQL = (
+    "DELETE FROM tabletop_life_journal WHERE owner = ? AND kind = ? AND guild_id = ? AND game_id = ? AND seq <= ?"
+)
+REMOVE_GAME_SQL = {
+    table: f"DELETE FROM {table} WHERE owner = ? AND kind = ? AND guild_id = ? AND game_id = ?"
+    for table in ("tabletop_game_snapshot", "tabletop_life_journal")
+}
+SAVE_GAME_IDS_SQL = "INSERT OR REPLACE INTO tabletop_game_ids (owner, kind, guild_id, next_id) VALUES (?, ?, ?, ?)"
+
+
+def encode_game(game, seated):
+    return json.dumps({"game": game, "seated": sorted(seated)})
+
+def decode_game(text):
+    """Return (game, seated user ids); JSON object keys are turned back into user ids."""
+    data = json.loads(text)
+    game = data["game"]
+    game["players"] = {int(uid): player for uid, player in game["players"].items()}
+    for player in game["players"].values():
+        if "commander" in player:
+            player["commander"] = {int(uid): damage for uid, damage in player["commander"].items()}
+    return game, data["seated"]
+
+def apply_life(game, user_id, field, value):
+    """Replay one journal row; values are totals, so replaying a row twice is harmless."""
+    player = game["players"].get(user_id)
+    if player is None:
+        return
+    if field == "life":
+        player["life"] = value
+    elif field.startswith("commander:"):
+        player.setdefault("commander", {})[int(field.split(":", 1)[1])] = value
+
+def load_games(kind, owner="all"):
+    """
+    Return ({guild_id: {game_id: game}}, {(guild_id, game_id): [seated user ids]},
+    {guild_id: next game id}, {(guild_id, game_id): journal rows}) for one game kind ("mtg", "ygo")
+    and one shard owner.
+    """
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute(LOAD_SNAPSHOTS_SQL, (owner, kind))
+    games, seated, snapshot_seqs = {}, {}, {}
+    for guild_id, game_id, seq, data in cursor.fetchall():
+        game, seated[(guild_id, game_id)] = decode_game(data)
+        games.setdefault(guild_id, {})[game_id] = game
+        snapshot_seqs[(guild_id, game_id)] = seq
+    cursor.execute(LOAD_JOURNAL_SQL, (owner, kind))
+    journal_counts = {}
+    for seq, guild_id, game_id, user_id, field, value in cursor.fetchall():
+        key = (guild_id, game_id)
+        if key in snapshot_seqs and seq > snapshot_seqs[key]:
+            apply_life(games[guild_id][game_id], user_id, field, value)
+            journal_counts[key] = journal_counts.get(key, 0) + 1
+    cursor.execute(LOAD_GAME_IDS_SQL, (owner, kind))
+    next_ids = dict(cursor.fetchall())
+    conn.close()
+    return games, seated, next_ids, journal_counts
+
+def write_games(kind, owner, journal, snapshots, removed, next_ids):
+    """
+    One transaction: append life journal rows, rewrite snapshots (folding their journal rows in),
+    delete finished games and store the per-guild id counters.
+    """
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    cursor.executemany(
+        APPEND_LIFE_SQL,
+        [(owner, kind, *entry) for entry in journal]
+    )
+    if snapshots:
+        cursor.execute(JOURNAL_END_SQL)
+        seq = cursor.fetchone()[0]
+        cursor.executemany(
+            SAVE_SNAPSHOT_SQL,
+            [(owner, kind, guild_id, game_id, seq, data) for guild_id, game_id, data in snapshots]
+        )
+        cursor.executemany(
+            COMPACT_JOURNAL_SQL,
+            [(owner, kind, guild_id, game_id, seq) for guild_id, game_id, _ in snapshots]
+        )
+    for sql in REMOVE_GAME_SQL.values():
+        cursor.executemany(
+            sql,
+            [(owner, kind, guild_id, game_id) for guild_id, game_id in removed]
+        )
+    cursor.executemany(
+        SAVE_GAME_IDS_SQL,
+        [(owner, kind, guild_id, next_id) for guild_id, next_id in next_ids.items()]
+    )
+    conn.commit()
+    conn.close()
+
+
+class GameSessionStore:
+    """
+    Persists a GameSessionManager's lobbies and games as one snapshot row per game plus an
+    append-only journal of life changes. Commands only queue changes on the manager; a
+    background task writes them in one batch every `interval` seconds, off the event loop.
+    A game's journal is folded into a fresh snapshot once it passes GAME_JOURNAL_COMPACT_THRESHOLD rows.
+    `owner` names the shard range of this process, so processes sharing the database only
+    restore (and so only expire and delete) the games of their own guilds.
+    """
+    def __init__(self, sessions, kind, owner="all", interval=GAME_CHECKPOINT_INTERVAL):
+        self.sessions = sessions
+        self.kind = kind
+        self.owner = owner
+        self.interval = interval
+        self.persisted_ids = {}  # {guild_id: next_id} as last written
+        self.journal_counts = {}  # {(guild_id, game_id): journal rows since its snapshot}
+        self._task = None
+
+    def load(self):
+        """Read every game back in bulk; returns (games, seated, next_ids) for GameSessionManager.restore."""
+        games, seated, next_ids, self.journal_counts = load_games(self.kind, self.owner)
+        self.persisted_ids = dict(next_ids)
+        return games, seated, next_ids
+
+    def _prepare(self):
+        # Take the queued changes and serialize on the event loop so the writer thread never sees a dict mid-mutation
+        sessions = self.sessions
+        journal, dirty, removed = sessions.journal, sessions.dirty, sessions.removed
+        sessions.journal, sessions.dirty, sessions.removed = [], set(), set()
+        journal = [entry for entry in journal if (entry[0], entry[1]) not in removed]
+        counts = {}
+        for entry in journal:
+            key = (entry[0], entry[1])
+            counts[key] = counts.get(key, 0) + 1
+            if self.journal_counts.get(key, 0) + counts[key] > GAME_JOURNAL_COMPACT_THRESHOLD:
+                dirty.add(key)
+        snapshots = [
+            (guild_id, game_id, encode_game(sessions.games[guild_id][game_id], sessions.seated_players(guild_id, game_id)))
+            for guild_id, game_id in dirty if sessions.get(guild_id, game_id) is not None
+        ]
+        next_ids = {g: n for g, n in sessions.next_ids.items() if self.persisted_ids.get(g) != n}
+        if not (journal or snapshots or removed or next_ids):
+            return None
+        return journal, snapshots, removed, next_ids, counts, dirty
+
+    def _commit(self, snapshots, removed, next_ids, counts):
+        for key, count in counts.items():
+            self.journal_counts[key] = self.journal_counts.get(key, 0) + count
+        for guild_id, game_id, _ in snapshots:
+            self.journal_counts.pop((guild_id, game_id), None)
+        for key in removed:
+            self.journal_counts.pop(key, None)
+        self.persisted_ids.update(next_ids)
+
+    def _requeue(self, journal, removed, dirty):
+        # A failed write keeps its changes queued for the next checkpoint
+        sessions = self.sessions
+        sessions.journal[:0] = journal
+        sessions.dirty |= {key for key in dirty if sessions.get(*key) is not None}
+        sessions.removed |= removed
+
+    def flush(self):
+        prepared = self._prepare()
+        if prepared:
+            journal, snapshots, removed, next_ids, counts, _ = prepared
+            write_games(self.kind, self.owner, journal, snapshots, removed, next_ids)
+            self._commit(snapshots, removed, next_ids, counts)
+
+    async def checkpoint(self):
+        prepared = self._prepare()
+        if not prepared:
+            return
+        journal, snapshots, removed, next_ids, counts, dirty = prepared
+        try:
+            await asyncio.to_thread(write_games, self.kind, self.owner, journal, snapshots, removed, next_ids)
+        except Exception:
+            self._requeue(journal, removed, dirty)
+            raise
+        self._commit(snapshots, removed, next_ids, counts)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.checkpoint()
+            except Exception as e:
+                print(f"Failed to checkpoint {self.kind} games: {e}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self.flush()
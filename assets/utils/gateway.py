@@ -0,0 +1,157 @@
+"""
+Gateway intents and member-cache settings, plus on-demand member lookups for lean mode.
+
+Memory benchmark (needs TOKEN; logs in once per mode and prints RSS and cache sizes):
+
+    python -m assets.utils.gateway [seconds]
+"""
+import os
+import sys
+import json
+import asyncio
+import subprocess
+import discord
+
+MEMBER_QUERY_LIMIT = 100  # user ids per gateway member request (Discord's cap)
+SMALL_GUILD_CHUNK_LIMIT = 250  # guilds up to this size are chunked whole on demand
+
+
+def lean_mode_enabled():
+    return os.getenv("LEAN_MODE", "").lower() in ("1", "true", "yes", "on")
+
+def build_intents(lean=False):
+    """
+    Full mode keeps Intents.all(). Lean mode subscribes only to what the cogs use: guilds,
+    members (welcome/autorole and member lookups), bans, messages and message content for
+    prefix commands. Presences, typing, voice, reactions and invites are dropped.
+    """
+    if not lean:
+        return discord.Intents.all()
+    intents = discord.Intents.none()
+    intents.guilds = True
+    intents.members = True
+    intents.moderation = True
+    intents.guild_messages = True
+    intents.dm_messages = True
+    intents.message_content = True
+    return intents
+
+def member_cache_flags(intents, lean=False):
+    """Lean mode only keeps members that join while the bot is running (plus whatever is fetched on demand)."""
+    if not lean:
+        return discord.MemberCacheFlags.from_intents(intents)
+    flags = discord.MemberCacheFlags.none()
+    flags.joined = True  # also what lets chunk()/query_members(cache=True) keep their results
+    return flags
+
+def bot_options(lean=None):
+    """Keyword arguments for the bot constructor for the configured mode."""
+    lean = lean_mode_enabled() if lean is None else lean
+    intents = build_intents(lean)
+    return {
+        "intents": intents,
+        "member_cache_flags": member_cache_flags(intents, lean),
+        "chunk_guilds_at_startup": not lean
+    }
+
+
+async def guild_members_among(guild, user_ids):
+    """
+    Return {user_id: Member} for the ids in `user_ids` that belong to `guild`.
+    Cached members are used first; the rest are requested from the gateway in batches
+    of MEMBER_QUERY_LIMIT, so nothing depends on the guild having been chunked.
+    """
+    user_ids = [int(uid) for uid in user_ids]
+    found = {}
+    missing = []
+    for uid in user_ids:
+        member = guild.get_member(uid)
+        if member is not None:
+            found[uid] = member
+        else:
+            missing.append(uid)
+    if not missing or guild.chunked:
+        return found
+    for start in range(0, len(missing), MEMBER_QUERY_LIMIT):
+        batch = missing[start:start + MEMBER_QUERY_LIMIT]
+        try:
+            members = await guild.query_members(user_ids=batch, limit=len(batch), cache=True)
+        except discord.ClientException:
+            # Members intent disabled: fall back to REST lookups
+            members = []
+            for uid in batch:
+                try:
+                    members.append(await guild.fetch_member(uid))
+                except discord.NotFound:
+                    pass
+        for member in members:
+            found[member.id] = member
+    return found
+
+async def ensure_small_guild_chunked(guild):
+    """Chunk a small guild on first need so its member checks become cache hits."""
+    if (guild.member_count or 0) <= SMALL_GUILD_CHUNK_LIMIT:
+        await ensure_guild_chunked(guild)
+
+async def ensure_guild_chunked(guild):
+    """Chunk a guild of any size (one streamed gateway request); returns False without the members intent."""
+    if not guild.chunked:
+        try:
+            await guild.chunk(cache=True)
+        except discord.ClientException:
+            return False
+    return True
+
+
+# --- Memory benchmark ---
+
+def _rss_mb():
+    import resource  # Unix only; imported here so the cogs still load on Windows
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+def _measure(lean, seconds):
+    """Log in with one mode's settings, idle for `seconds` after ready, then print stats as JSON."""
+    client = discord.AutoShardedClient(**bot_options(lean))
+    result = {}
+
+    @client.event
+    async def on_ready():
+        await asyncio.sleep(seconds)
+        result.update({
+            "mode": "lean" if lean else "full",
+            "guilds": len(client.guilds),
+            "cached_members": sum(len(g.members) for g in client.guilds),
+            "cached_users": len(client.users),
+            "rss_mb": round(_rss_mb(), 1)
+        })
+        await client.close()
+
+    client.run(os.getenv("TOKEN"), log_handler=None)
+    print(json.dumps(result))
+
+def run_benchmark(seconds=60):
+    """Measure full and lean mode in separate processes so neither inherits the other's heap."""
+    rows = []
+    for lean in (False, True):
+        out = subprocess.run(
+            [sys.executable, "-m", "assets.utils.gateway", "--measure", "lean" if lean else "full", str(seconds)],
+            capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()
+        rows.append(json.loads(out[-1]))
+    print(f"{'mode':<6} {'guilds':>7} {'members':>9} {'users':>9} {'rss MB':>8}")
+    for row in rows:
+        print(f"{row['mode']:<6} {row['guilds']:>7} {row['cached_members']:>9} {row['cached_users']:>9} {row['rss_mb']:>8}")
+    full, lean = rows
+    if full["rss_mb"]:
+        print(f"Lean mode uses {100 * (1 - lean['rss_mb'] / full['rss_mb']):.0f}% less peak RSS.")
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv, find_dotenv
+    load_dotenv(find_dotenv() or os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", ".env"))
+    if len(sys.argv) > 2 and sys.argv[1] == "--measure":
+        _measure(sys.argv[2] == "lean", int(sys.argv[3]) if len(sys.argv) > 3 else 60)
+    else:
+        run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 60)
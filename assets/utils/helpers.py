@@ -1,3 +1,6 @@
+import re
+import unicodedata
+
 def format_message(content):
     return f"`{content}*"
 
@@ -11,6 +14,10 @@ def mention_channel(channel_id):
     """Return a mention string for a channel ID."""
     return f"<#{channel_id}>" if channel_id else "Not set"
 
+def mention_user(user_id):
+    """Return a mention string for a user ID (renders without the member being cached)."""
+    return f"<@{user_id}>"
+
 def mention_role(role_id):
     """Return a mention string for a role ID."""
     return f"<@&{role_id}>" if role_id else "Not set"
@@ -30,4 +37,10 @@ def truncate(text, max_length=100):
 
 def is_admin(member):
     """Check if a member has administrator permissions."""
-    return member.guild_permissions.administrator
\ No newline at end of file
+    return member.guild_permissions.administrator
+
+def normalize_name(text):
+    """Lowercase, strip accents and punctuation and collapse spaces, for name lookups ("Æther-Vial" -> "aether vial")."""
+    text = unicodedata.normalize("NFKD", text.replace("Æ", "Ae").replace("æ", "ae"))
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", text.replace("'", "")).split())
\ No newline at end of file
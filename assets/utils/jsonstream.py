@@ -0,0 +1,52 @@
+import re
+import json
+
+READ_CHUNK_SIZE = 1 << 20  # characters read from the file at a time
+
+
+def iter_json_array(path, key=None, chunk_size=READ_CHUNK_SIZE):
+    """
+    Yield the elements of a JSON array one at a time without loading the whole file.
+    The array is the top-level value, or with `key` the value of that key in the top-level
+    object ({"data": [...]}); anything after the array is never read.
+    """
+    decoder = json.JSONDecoder()
+    opening = re.compile(r'"%s"\s*:\s*\[' % re.escape(key)) if key else None
+    with open(path, encoding="utf-8") as f:
+        buffer, pos, eof, started = "", 0, False, False
+        while True:
+            if not started and opening is not None:
+                match = opening.search(buffer)
+                if match is None:
+                    chunk = f.read(chunk_size)
+                    if not chunk:
+                        raise ValueError(f"{path} has no \"{key}\" array")
+                    buffer += chunk
+                    continue
+                buffer, pos, started = buffer[match.end():], 0, True
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos == len(buffer):
+                if eof:
+                    raise ValueError(f"{path} ended before the JSON array was closed")
+                buffer, pos = f.read(chunk_size), 0
+                eof = not buffer
+                continue
+            if not started:
+                if buffer[pos] != "[":
+                    raise ValueError(f"{path} is not a JSON array")
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == "]":
+                return
+            try:
+                item, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # The element runs past the end of the buffer: read more and retry
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    raise
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+            yield item
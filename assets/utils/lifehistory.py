@@ -0,0 +1,48 @@
+import time
+from array import array
+
+LIFE_HISTORY_SIZE = 32  # changes kept per player per game
+
+
+class LifeHistory:
+    """
+    Fixed-size ring buffer of one player's life and commander damage changes, kept in three
+    parallel arrays instead of per-change objects: the delta, its source (0 for life,
+    otherwise the user id of the commander that dealt the damage) and when it happened.
+    Once full the oldest change is overwritten.
+    """
+    __slots__ = ("size", "deltas", "sources", "times", "start", "count")
+
+    def __init__(self, size=LIFE_HISTORY_SIZE):
+        self.size = size
+        self.deltas = array("q", [0]) * size
+        self.sources = array("Q", [0]) * size
+        self.times = array("d", [0.0]) * size
+        self.start = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def push(self, delta, source=0, at=None):
+        index = (self.start + self.count) % self.size
+        self.deltas[index] = delta
+        self.sources[index] = source
+        self.times[index] = at or time.time()
+        if self.count == self.size:
+            self.start = (self.start + 1) % self.size
+        else:
+            self.count += 1
+
+    def pop(self):
+        """Remove and return the newest change as (delta, source, timestamp), or None."""
+        if not self.count:
+            return None
+        self.count -= 1
+        index = (self.start + self.count) % self.size
+        return self.deltas[index], self.sources[index], self.times[index]
+
+    def newest_first(self):
+        for offset in range(self.count - 1, -1, -1):
+            index = (self.start + offset) % self.size
+            yield self.deltas[index], self.sources[index], self.times[index]
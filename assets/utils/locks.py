@@ -0,0 +1,66 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+
+class LockManager:
+    """
+    Per-key asyncio locks for combat and party state.
+    Keys are (kind, id) pairs such as ("battle", user_id), ("party", party_id) or ("raid", guild_id),
+    so actions on the same battle are serialized while different battles stay fully parallel.
+    Locks are created on demand and dropped once nobody holds or waits on them.
+    """
+    def __init__(self):
+        self._locks = {}  # {(kind, key): [asyncio.Lock, holders + waiters]}
+        self.metrics = {}  # {kind: {"acquired", "contended", "wait_total", "wait_max"}}
+
+    @asynccontextmanager
+    async def hold(self, kind, key):
+        entry = self._locks.get((kind, key))
+        if entry is None:
+            entry = self._locks[(kind, key)] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        lock = entry[0]
+        contended = lock.locked()
+        start = time.perf_counter()
+        try:
+            await lock.acquire()
+        except BaseException:
+            self._release_ref(kind, key, entry)
+            raise
+        self._record(kind, time.perf_counter() - start, contended)
+        try:
+            yield
+        finally:
+            lock.release()
+            self._release_ref(kind, key, entry)
+
+    def _release_ref(self, kind, key, entry):
+        entry[1] -= 1
+        if entry[1] <= 0 and self._locks.get((kind, key)) is entry:
+            del self._locks[(kind, key)]
+
+    def _record(self, kind, waited, contended):
+        m = self.metrics.setdefault(kind, {"acquired": 0, "contended": 0, "wait_total": 0.0, "wait_max": 0.0})
+        m["acquired"] += 1
+        if contended:
+            m["contended"] += 1
+        m["wait_total"] += waited
+        m["wait_max"] = max(m["wait_max"], waited)
+
+    def is_locked(self, kind, key):
+        entry = self._locks.get((kind, key))
+        return bool(entry and entry[0].locked())
+
+    def snapshot(self):
+        """Return lock-wait metrics per kind, with average wait in milliseconds."""
+        result = {}
+        for kind, m in self.metrics.items():
+            result[kind] = {
+                "acquired": m["acquired"],
+                "contended": m["contended"],
+                "avg_wait_ms": (m["wait_total"] / m["acquired"] * 1000) if m["acquired"] else 0.0,
+                "max_wait_ms": m["wait_max"] * 1000,
+                "live_locks": sum(1 for k in self._locks if k[0] == kind)
+            }
+        return result
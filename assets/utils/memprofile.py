@@ -0,0 +1,133 @@
+import os
+import gc
+import sys
+import time
+import tracemalloc
+import discord
+
+SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "memprofile")
+TRACE_FRAMES = 10
+
+# Frames from the profiler itself would otherwise dominate every diff
+SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+# (cog name, dotted attribute path) pairs whose sizes are reported by /memprofile
+COG_STRUCTURES = [
+    ("RPGCog", "battles.battles"),
+    ("RPGCog", "battles.players"),
+    ("RPGCog", "active_parties"),
+    ("RPGCog", "parties"),
+    ("RPGCog", "raid_turn_actions"),
+    ("MTGCog", "sessions.games"),
+    ("MTGCog", "sessions.player_games"),
+    ("MTGCog", "sessions.histories"),
+    ("YGOCog", "sessions.games"),
+    ("YGOCog", "sessions.player_games"),
+    ("YGOCog", "sessions.histories"),
+    ("EcoCog", "shop_indexes"),
+]
+
+
+def deep_sizeof(obj, seen=None):
+    """Approximate retained size of a container tree in bytes (shared objects counted once)."""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), seen)
+    elif hasattr(obj, "__slots__"):
+        size += sum(deep_sizeof(getattr(obj, slot), seen) for slot in obj.__slots__ if hasattr(obj, slot))
+    return size
+
+def structure_sizes(bot):
+    """Return [(label, entries, bytes)] for the per-cog state listed in COG_STRUCTURES."""
+    rows = []
+    for cog_name, attr in COG_STRUCTURES:
+        value = bot.get_cog(cog_name)
+        for part in attr.split("."):
+            value = getattr(value, part, None)
+        if value is None:
+            continue
+        rows.append((f"{cog_name}.{attr}", len(value), deep_sizeof(value)))
+    return rows
+
+def live_views():
+    """Count live ui.View instances by class, including views discord.py no longer dispatches to."""
+    counts = {}
+    for obj in gc.get_objects():
+        if isinstance(obj, discord.ui.View):
+            name = type(obj).__name__
+            counts[name] = counts.get(name, 0) + 1
+    return counts
+
+
+class MemoryProfiler:
+    """
+    Wraps tracemalloc for operators: start tracing, take snapshots, diff each snapshot
+    against the previous one and dump snapshots to disk for offline analysis
+    (load them with tracemalloc.Snapshot.load).
+    """
+    def __init__(self, frames=TRACE_FRAMES):
+        self.frames = frames
+        self.last = None  # (taken_at, Snapshot)
+
+    @property
+    def tracing(self):
+        return tracemalloc.is_tracing()
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        self.last = None
+
+    def stop(self):
+        tracemalloc.stop()
+        self.last = None
+
+    def take(self):
+        """Take a snapshot; returns (snapshot, previous snapshot or None)."""
+        snapshot = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+        previous = self.last[1] if self.last else None
+        self.last = (time.time(), snapshot)
+        return snapshot, previous
+
+    @staticmethod
+    def top(snapshot, limit=10):
+        return snapshot.statistics("lineno")[:limit]
+
+    @staticmethod
+    def diff(snapshot, previous, limit=10):
+        return snapshot.compare_to(previous, "lineno")[:limit] if previous else []
+
+    def dump(self):
+        """Write the latest snapshot (taking one if needed) to SNAPSHOT_DIR; returns the path."""
+        if self.last is None:
+            self.take()
+        taken_at, snapshot = self.last
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        path = os.path.join(SNAPSHOT_DIR, f"snapshot-{time.strftime('%Y%m%d-%H%M%S', time.localtime(taken_at))}.tracemalloc")
+        snapshot.dump(path)
+        return path
+
+
+def format_site(stat):
+    frame = stat.traceback[0]
+    return f"{os.path.basename(frame.filename)}:{frame.lineno}"
+
+def format_bytes(size):
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
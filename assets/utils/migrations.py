@@ -0,0 +1,358 @@
+import sqlite3
+import os
+import time
+
+DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "data.db")
+
+
+def table_columns(cursor, table):
+    cursor.execute(f"PRAGMA table_info({table})")
+    return {row[1] for row in cursor.fetchall()}
+
+def add_column(cursor, table, column, definition):
+    """ALTER TABLE ... ADD COLUMN, skipped when the column already exists."""
+    if column not in table_columns(cursor, table):
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+def has_unique_key(cursor, table, columns):
+    """True if a unique index or primary key on `table` covers exactly `columns`."""
+    cursor.execute(f"PRAGMA index_list({table})")
+    for row in cursor.fetchall():
+        name, unique = row[1], row[2]
+        if not unique:
+            continue
+        cursor.execute(f"PRAGMA index_info({name})")
+        if [r[2] for r in cursor.fetchall()] == list(columns):
+            return True
+    return False
+
+
+# --- Migrations (never edit one that has shipped; add a new one instead) ---
+
+def _baseline(cursor):
+    # The schema table.py used to create; IF NOT EXISTS keeps this safe on existing databases
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS welcome (
+        guild_id TEXT PRIMARY KEY,
+        channel TEXT,
+        message TEXT,
+        autorole TEXT,
+        image_url TEXT
+    )
+    """)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS prefixes (
+        guild_id TEXT PRIMARY KEY,
+        prefix TEXT
+    )
+    """)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS mutes (
+        guild_id TEXT PRIMARY KEY,
+        mute_role TEXT
+    )
+    """)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS logs (
+        guild_id TEXT PRIMARY KEY,
+        log_channel TEXT
+    )
+    """)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS announcements (
+        guild_id TEXT PRIMARY KEY,
+        announcement_channel TEXT
+    )
+    """)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS modmail (
+        guild_id TEXT PRIMARY KEY,
+        modmail_channel TEXT
+    )
+    """)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS eco_shop (
+        guild_id TEXT,
+        item_name TEXT,
+        command_name TEXT,
+        price INTEGER,
+        description TEXT,
+        effect TEXT DEFAULT NULL,
+        rarity TEXT DEFAULT NULL,
+        item_type TEXT DEFAULT NULL
+    )
+    """)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS eco_players (
+        user_id TEXT PRIMARY KEY,
+        coins INTEGER DEFAULT 0,
+        bank INTEGER DEFAULT 0,
+        inventory TEXT DEFAULT '',
+        daily_streak INTEGER DEFAULT 0,
+        last_daily TEXT DEFAULT NULL
+    )
+    """)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS eco_cooldowns (
+        user_id TEXT,
+        command TEXT,
+        last_used TEXT,
+        PRIMARY KEY (user_id, command)
+    )
+    """)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS bans (
+        guild_id TEXT,
+        user_id TEXT,
+        user_tag TEXT,
+        reason TEXT,
+        banned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS rpg_stats (
+        user_id TEXT PRIMARY KEY,
+        level INTEGER DEFAULT 1,
+        exp INTEGER DEFAULT 0,
+        hp INTEGER DEFAULT 20,
+        max_hp INTEGER DEFAULT 20,
+        atk INTEGER DEFAULT 5,
+        defense INTEGER DEFAULT 2,
+        char_class TEXT DEFAULT NULL,
+        weapon TEXT DEFAULT '',
+        quest TEXT DEFAULT '',
+        quest_progress INTEGER DEFAULT 0,
+        skill_points INTEGER DEFAULT 5,
+        strength INTEGER DEFAULT 0,
+        dexterity INTEGER DEFAULT 0,
+        intelligence INTEGER DEFAULT 0,
+        exp_to_next INTEGER DEFAULT 27,
+        hp_regen INTEGER DEFAULT 0.2,
+        mana INTEGER DEFAULT 5,
+        mana_regen INTEGER DEFAULT 0.2,
+        max_mana INTEGER DEFAULT 5,
+        crit_chance REAL DEFAULT 0.01,
+        crit_damage REAL DEFAULT 1.0,
+        evasion_chance REAL DEFAULT 0.01,
+        bonus_spell_dmg INTEGER DEFAULT 0
+    )
+    """)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS rpg_monsters (
+        guild_id TEXT,
+        name TEXT,
+        hp INTEGER,
+        max_hp INTEGER,
+        hp_regen INTEGER DEFAULT 0,
+        atk INTEGER,
+        defense INTEGER,
+        crit_chance REAL DEFAULT 0.0,
+        crit_damage REAL DEFAULT 1.0,
+        mana INTEGER DEFAULT 0,
+        mana_regen INTEGER DEFAULT 0,
+        max_mana INTEGER DEFAULT 0,
+        exp INTEGER,
+        loot TEXT,
+        description TEXT,
+        rarity TEXT,
+        evasion_chance REAL DEFAULT 0.0,
+        bonus_spell_dmg INTEGER DEFAULT 0,
+        sign_attack TEXT DEFAULT NULL,
+        PRIMARY KEY (guild_id, name)
+    )
+    """)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS rpg_quests (
+        guild_id TEXT,
+        quest_name TEXT,
+        description TEXT,
+        target TEXT,
+        amount INTEGER,
+        reward TEXT,
+        PRIMARY KEY (guild_id, quest_name)
+    )
+    """)
+
+def _missing_columns(cursor):
+    add_column(cursor, "eco_players", "luck_expiry", "TEXT DEFAULT NULL")
+    add_column(cursor, "rpg_stats", "equipped_spells", "TEXT DEFAULT ''")
+
+def _raid_state(cursor):
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS rpg_raid_state (
+        guild_id TEXT PRIMARY KEY,
+        boss_name TEXT,
+        boss_hp INTEGER,
+        boss_max_hp INTEGER,
+        boss_data TEXT,
+        participants TEXT,
+        last_spawn TEXT
+    )
+    """)
+
+def _session_journal(cursor):
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS rpg_session_snapshot (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        seq INTEGER NOT NULL,
+        data TEXT NOT NULL
+    )
+    """)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS rpg_session_journal (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        scope TEXT NOT NULL,
+        key TEXT NOT NULL,
+        value TEXT
+    )
+    """)
+
+def _lookup_indexes(cursor):
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_eco_shop_guild_command ON eco_shop (guild_id, command_name)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_bans_guild_user ON bans (guild_id, user_id)")
+    # Databases created before eco_cooldowns had its primary key may hold duplicate keys
+    if not has_unique_key(cursor, "eco_cooldowns", ("user_id", "command")):
+        cursor.execute("""
+            DELETE FROM eco_cooldowns WHERE rowid NOT IN (
+                SELECT MAX(rowid) FROM eco_cooldowns GROUP BY user_id, command
+            )
+        """)
+        cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_eco_cooldowns_key ON eco_cooldowns (user_id, command)")
+
+def _query_plan_indexes(cursor):
+    # Indexes backing the hot queries registered in assets/utils/queryplans.py
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_eco_shop_guild_item ON eco_shop (guild_id, item_name)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_eco_shop_item ON eco_shop (item_name)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_eco_shop_guild_effect ON eco_shop (guild_id, effect)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_eco_players_wealth ON eco_players ((coins + bank) DESC)")
+
+def _bot_meta(cursor):
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS bot_meta (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    )
+    """)
+
+def _session_owner(cursor):
+    # Each shard range (process) keeps its own parties and battles in the shared database
+    cursor.execute("ALTER TABLE rpg_session_snapshot RENAME TO rpg_session_snapshot_old")
+    cursor.execute("""
+    CREATE TABLE rpg_session_snapshot (
+        owner TEXT PRIMARY KEY,
+        seq INTEGER NOT NULL,
+        data TEXT NOT NULL
+    )
+    """)
+    cursor.execute("INSERT INTO rpg_session_snapshot (owner, seq, data) SELECT 'all', seq, data FROM rpg_session_snapshot_old")
+    cursor.execute("DROP TABLE rpg_session_snapshot_old")
+    add_column(cursor, "rpg_session_journal", "owner", "TEXT NOT NULL DEFAULT 'all'")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_rpg_session_journal_owner ON rpg_session_journal (owner, seq)")
+
+def _tabletop_games(cursor):
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS tabletop_game_snapshot (
+        kind TEXT NOT NULL,
+        guild_id INTEGER NOT NULL,
+        game_id INTEGER NOT NULL,
+        seq INTEGER NOT NULL,
+        data TEXT NOT NULL,
+        PRIMARY KEY (kind, guild_id, game_id)
+    )
+    """)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS tabletop_life_journal (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        kind TEXT NOT NULL,
+        guild_id INTEGER NOT NULL,
+        game_id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        field TEXT NOT NULL,
+        value INTEGER NOT NULL,
+        changed_at REAL NOT NULL
+    )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_tabletop_life_journal_game ON tabletop_life_journal (kind, guild_id, game_id, seq)")
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS tabletop_game_ids (
+        kind TEXT NOT NULL,
+        guild_id INTEGER NOT NULL,
+        next_id INTEGER NOT NULL,
+        PRIMARY KEY (kind, guild_id)
+    )
+    """)
+
+def _tabletop_owner(cursor):
+    # Each shard range (process) restores, expires and deletes only its own guilds' games
+    for table in ("tabletop_game_snapshot", "tabletop_life_journal", "tabletop_game_ids"):
+        add_column(cursor, table, "owner", "TEXT NOT NULL DEFAULT 'all'")
+    cursor.execute("DROP INDEX IF EXISTS idx_tabletop_life_journal_game")
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_tabletop_life_journal_owner_game ON tabletop_life_journal (owner, kind, guild_id, game_id, seq)"
+    )
+
+MIGRATIONS = [
+    (1, "baseline schema", _baseline),
+    (2, "add eco_players.luck_expiry and rpg_stats.equipped_spells", _missing_columns),
+    (3, "create rpg_raid_state", _raid_state),
+    (4, "create rpg session snapshot and journal", _session_journal),
+    (5, "add shop, ban and cooldown lookup indexes", _lookup_indexes),
+    (6, "add shop item, collectible and leaderboard indexes", _query_plan_indexes),
+    (7, "create bot_meta", _bot_meta),
+    (8, "scope rpg session snapshot and journal by shard owner", _session_owner),
+    (9, "create tabletop game snapshot, life journal and id counters", _tabletop_games),
+    (10, "scope tabletop games by shard owner", _tabletop_owner),
+]
+
+
+def applied_versions(cursor):
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        applied_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        duration_ms REAL
+    )
+    """)
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+def run_migrations(db_path=None):
+    """
+    Apply every pending migration in version order, each in its own transaction.
+    Returns [(version, name, duration_ms)] for the migrations applied by this call.
+    """
+    db_path = db_path or DB_PATH
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    # Autocommit mode so BEGIN/COMMIT below are the only transaction boundaries
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    cursor = conn.cursor()
+    applied = []
+    try:
+        done = applied_versions(cursor)
+        for version, name, migrate in MIGRATIONS:
+            if version in done:
+                continue
+            cursor.execute("BEGIN IMMEDIATE")
+            # Another process sharing the database may have applied it while we waited for the lock
+            cursor.execute("SELECT 1 FROM schema_migrations WHERE version = ?", (version,))
+            if cursor.fetchone():
+                cursor.execute("ROLLBACK")
+                continue
+            start = time.perf_counter()
+            try:
+                migrate(cursor)
+                duration_ms = (time.perf_counter() - start) * 1000
+                cursor.execute(
+                    "INSERT INTO schema_migrations (version, name, duration_ms) VALUES (?, ?, ?)",
+                    (version, name, duration_ms)
+                )
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+            print(f"Applied migration {version} ({name}) in {duration_ms:.1f} ms")
+            applied.append((version, name, duration_ms))
+    finally:
+        conn.close()
+    return applied
@@ -0,0 +1,267 @@
+"""
+Offline Magic: The Gathering card database built from a Scryfall bulk-data file
+(https://scryfall.com/docs/api/bulk-data; "Default Cards" or "Oracle Cards").
+
+Import or refresh it with:
+
+    python -m assets.utils.mtgcards path/to/default-cards.json
+
+The import builds a new file and swaps it in, so the bot can keep serving lookups meanwhile;
+reload the MTG cog afterwards to drop its cached card embeds.
+"""
+import os
+import sys
+import time
+import sqlite3
+import difflib
+from assets.utils.helpers import normalize_name
+from assets.utils.jsonstream import iter_json_array
+
+CARD_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "mtgcards.db")
+
+IMPORT_BATCH_SIZE = 5000  # rows per executemany during an import
+FUZZY_CANDIDATES = 200  # rows pulled from the index before ranking by similarity
+FUZZY_CUTOFF = 0.6
+WORD_CUTOFF = 0.7  # similarity needed to correct a single misspelled word
+
+# Layouts that are not real cards
+SKIPPED_LAYOUTS = {"token", "double_faced_token", "emblem", "art_series", "vanguard", "scheme", "planar"}
+
+CARD_COLUMNS = (
+    "oracle_id", "name", "name_norm", "mana_cost", "cmc", "type_line", "oracle_text", "power",
+    "toughness", "loyalty", "colors", "set_code", "set_name", "rarity", "released_at", "image_url", "scryfall_uri"
+)
+CARD_FIELDS = (
+    "oracle_id", "name", "mana_cost", "type_line", "oracle_text", "power", "toughness", "loyalty",
+    "colors", "set_code", "set_name", "rarity", "image_url", "scryfall_uri", "printings"
+)
+
+
+def card_row(card):
+    """Flatten a Scryfall card object into a CARD_COLUMNS tuple (multi-faced cards join their faces)."""
+    faces = card.get("card_faces") or []
+    first = faces[0] if faces else {}
+
+    def joined(key, separator=" // "):
+        if card.get(key):
+            return card[key]
+        values = [face[key] for face in faces if face.get(key)]
+        return separator.join(values) if values else None
+
+    if card.get("oracle_text") is not None or not faces:
+        oracle_text = card.get("oracle_text")
+    else:
+        oracle_text = "\n\n".join(f"**{face['name']}**\n{face.get('oracle_text', '')}" for face in faces)
+    images = card.get("image_uris") or first.get("image_uris") or {}
+    colors = card.get("colors") if card.get("colors") is not None else first.get("colors", [])
+    return (
+        card.get("oracle_id") or first.get("oracle_id") or card["id"],
+        card["name"],
+        normalize_name(card["name"]),
+        joined("mana_cost"),
+        card.get("cmc"),
+        joined("type_line"),
+        oracle_text,
+        card.get("power", first.get("power")),
+        card.get("toughness", first.get("toughness")),
+        card.get("loyalty", first.get("loyalty")),
+        "".join(colors),
+        card.get("set"),
+        card.get("set_name"),
+        card.get("rarity"),
+        card.get("released_at") or "",
+        images.get("normal") or images.get("large") or images.get("small"),
+        card.get("scryfall_uri")
+    )
+
+def _create_schema(cursor):
+    cursor.execute(f"""
+    CREATE TABLE cards (
+        oracle_id TEXT PRIMARY KEY,
+        {", ".join(f"{column} {'REAL' if column == 'cmc' else 'TEXT'}" for column in CARD_COLUMNS[1:])},
+        printings INTEGER NOT NULL DEFAULT 1
+    )
+    """)
+    cursor.execute("""
+    CREATE VIRTUAL TABLE cards_fts USING fts5(
+        name, type_line, oracle_text,
+        content='cards', content_rowid='rowid',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """)
+    # Distinct words of card names, for correcting misspelled query words
+    cursor.execute("CREATE TABLE name_words (word TEXT PRIMARY KEY) WITHOUT ROWID")
+
+# One row per oracle card: every printing bumps the count, the newest printing supplies set and image
+_UPSERT_CARD = f"""
+INSERT INTO cards ({", ".join(CARD_COLUMNS)}) VALUES ({", ".join("?" for _ in CARD_COLUMNS)})
+ON CONFLICT (oracle_id) DO UPDATE SET
+    printings = cards.printings + 1,
+    {", ".join(
+        f"{column} = CASE WHEN excluded.released_at > cards.released_at THEN excluded.{column} ELSE cards.{column} END"
+        for column in CARD_COLUMNS[1:]
+    )}
+"""
+
+def import_cards(source, db_path=None, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Stream a Scryfall bulk file into a fresh database, then swap it in place of the old one.
+    Returns (printings read, cards stored, seconds).
+    """
+    db_path = db_path or CARD_DB_PATH
+    start = time.perf_counter()
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    building = db_path + ".building"
+    if os.path.exists(building):
+        os.remove(building)
+    conn = sqlite3.connect(building)
+    cursor = conn.cursor()
+    # Nothing to protect in a file that is discarded if the import fails
+    cursor.execute("PRAGMA journal_mode = OFF")
+    cursor.execute("PRAGMA synchronous = OFF")
+    _create_schema(cursor)
+    printings, batch = 0, []
+    for card in iter_json_array(source):
+        if card.get("object") != "card" or card.get("layout") in SKIPPED_LAYOUTS:
+            continue
+        batch.append(card_row(card))
+        printings += 1
+        if len(batch) >= batch_size:
+            cursor.executemany(_UPSERT_CARD, batch)
+            batch = []
+    cursor.executemany(_UPSERT_CARD, batch)
+    # Indexes are built once after the bulk load instead of row by row
+    cursor.execute("CREATE INDEX idx_cards_name_norm ON cards (name_norm)")
+    cursor.execute("SELECT name_norm FROM cards")
+    words = {word for (name_norm,) in cursor.fetchall() for word in name_norm.split()}
+    cursor.executemany("INSERT INTO name_words (word) VALUES (?)", [(word,) for word in words])
+    cursor.execute("INSERT INTO cards_fts (cards_fts) VALUES ('rebuild')")
+    cursor.execute("INSERT INTO cards_fts (cards_fts) VALUES ('optimize')")
+    cursor.execute("ANALYZE")
+    cursor.execute("SELECT COUNT(*) FROM cards")
+    cards = cursor.fetchone()[0]
+    conn.commit()
+    conn.close()
+    os.replace(building, db_path)
+    return printings, cards, time.perf_counter() - start
+
+
+def card_db_available(db_path=None):
+    return os.path.exists(db_path or CARD_DB_PATH)
+
+def _connect(db_path=None):
+    return sqlite3.connect(f"file:{db_path or CARD_DB_PATH}?mode=ro", uri=True)
+
+def get_card(oracle_id, db_path=None):
+    """Return the card as a dict of CARD_FIELDS, or None."""
+    conn = _connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT {', '.join(CARD_FIELDS)} FROM cards WHERE oracle_id = ?", (oracle_id,))
+    row = cursor.fetchone()
+    conn.close()
+    return dict(zip(CARD_FIELDS, row)) if row else None
+
+def _fts_prefix_query(tokens, operator):
+    return f" {operator} ".join(f'name : "{token}"*' for token in tokens)
+
+def _name_matches(cursor, norm, limit):
+    """[(oracle_id, name, match)] from the exact, prefix and word-prefix indexes, best first."""
+    results = []
+    cursor.execute("SELECT oracle_id, name FROM cards WHERE name_norm = ? LIMIT ?", (norm, limit))
+    results += [(oracle_id, name, "exact") for oracle_id, name in cursor.fetchall()]
+    # Range scan on the name index: every name starting with the query
+    cursor.execute(
+        "SELECT oracle_id, name FROM cards WHERE name_norm > ? AND name_norm < ? ORDER BY name_norm LIMIT ?",
+        (norm, norm + "\x7f", limit)
+    )
+    results += [(oracle_id, name, "prefix") for oracle_id, name in cursor.fetchall()]
+    if len(results) < limit:
+        # Every word of the query starts a word of the name, in any order ("bolt light")
+        cursor.execute(
+            "SELECT c.oracle_id, c.name FROM cards_fts JOIN cards c ON c.rowid = cards_fts.rowid "
+            "WHERE cards_fts MATCH ? ORDER BY rank LIMIT ?",
+            (_fts_prefix_query(norm.split(), "AND"), limit)
+        )
+        results += [(oracle_id, name, "words") for oracle_id, name in cursor.fetchall()]
+    return results
+
+def _correct_word(cursor, word):
+    """Up to three name words close to `word` (same first letter, similar length); `word` itself if it exists."""
+    cursor.execute("SELECT 1 FROM name_words WHERE word = ?", (word,))
+    if cursor.fetchone():
+        return [word]
+    cursor.execute(
+        "SELECT word FROM name_words WHERE word > ? AND word < ? AND length(word) BETWEEN ? AND ?",
+        (word[0], word[0] + "\x7f", len(word) - 2, len(word) + 2)
+    )
+    return difflib.get_close_matches(word, [row[0] for row in cursor.fetchall()], n=3, cutoff=WORD_CUTOFF)
+
+def _fuzzy_matches(cursor, norm, limit):
+    """
+    Misspelled names: correct each word against the name vocabulary and pull names containing the
+    corrections (or, failing that, any word sharing a three-letter start), then rank by similarity.
+    """
+    corrections = [words for words in (_correct_word(cursor, token) for token in norm.split()) if words]
+    queries = []
+    if corrections:
+        queries.append(" AND ".join("(" + " OR ".join(f'name : "{word}"' for word in words) + ")" for words in corrections))
+    queries.append(_fts_prefix_query(sorted({token[:3] for token in norm.split()}), "OR"))
+    rows = []
+    for query in queries:
+        cursor.execute(
+            "SELECT c.oracle_id, c.name, c.name_norm FROM cards_fts JOIN cards c ON c.rowid = cards_fts.rowid "
+            "WHERE cards_fts MATCH ? ORDER BY rank LIMIT ?",
+            (query, FUZZY_CANDIDATES)
+        )
+        rows = cursor.fetchall()
+        if rows:
+            break
+    scored = []
+    for oracle_id, name, name_norm in rows:
+        ratio = difflib.SequenceMatcher(None, norm, name_norm).ratio()
+        if ratio >= FUZZY_CUTOFF:
+            scored.append((ratio, oracle_id, name))
+    scored.sort(key=lambda item: -item[0])
+    return [(oracle_id, name, "fuzzy") for _, oracle_id, name in scored[:limit]]
+
+def search_cards(query, limit=5, db_path=None):
+    """
+    Return up to `limit` (oracle_id, name, match) tuples, best first; `match` is "exact",
+    "prefix", "words" or "fuzzy" (the latter only when nothing else matched).
+    """
+    norm = normalize_name(query)
+    if not norm:
+        return []
+    conn = _connect(db_path)
+    cursor = conn.cursor()
+    try:
+        results = _name_matches(cursor, norm, limit) or _fuzzy_matches(cursor, norm, limit)
+    finally:
+        conn.close()
+    seen, unique = set(), []
+    for row in results:
+        if row[0] not in seen:
+            seen.add(row[0])
+            unique.append(row)
+    return unique[:limit]
+
+def complete_names(prefix, limit=25, db_path=None):
+    """Card names for slash command autocomplete (no fuzzy pass, so it stays cheap per keystroke)."""
+    norm = normalize_name(prefix)
+    if not norm or not card_db_available(db_path):
+        return []
+    conn = _connect(db_path)
+    cursor = conn.cursor()
+    try:
+        names = [name for _, name, _ in _name_matches(cursor, norm, limit)]
+    finally:
+        conn.close()
+    return list(dict.fromkeys(names))[:limit]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("usage: python -m assets.utils.mtgcards path/to/scryfall-bulk.json")
+        sys.exit(2)
+    printings, cards, seconds = import_cards(sys.argv[1])
+    print(f"Imported {printings} printings as {cards} cards into {CARD_DB_PATH} in {seconds:.1f} s")
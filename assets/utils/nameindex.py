@@ -0,0 +1,191 @@
+import time
+import heapq
+import difflib
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from assets.utils.helpers import normalize_name
+
+FUZZY_CUTOFF = 0.6  # similarity a misspelled name needs to be suggested
+FUZZY_CANDIDATES = 20  # names sharing the most trigrams that are ranked by similarity
+INVENTORY_TTL = 60  # seconds a cached inventory is trusted (other shard processes write the same rows)
+INVENTORY_CACHE_SIZE = 4096  # players whose inventory is kept for autocomplete
+
+
+def compact_name(text):
+    """Normalized name without spaces, so "healthpotion" and "Health Potion" compare equal."""
+    return normalize_name(text).replace(" ", "")
+
+def trigrams(key):
+    padded = f"$${key}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def did_you_mean(suggestion):
+    """Sentence appended to a "not found" reply, empty without a suggestion."""
+    return f" Did you mean **{suggestion}**?" if suggestion else ""
+
+
+class NameIndex:
+    """
+    Sorted, normalized names for autocomplete and case/space-insensitive lookups.
+
+    Built from (name, value) pairs (or plain names, which are their own value); a value may be
+    listed under several names, e.g. a shop item under its command name and its item name.
+    `names` holds every (normalized name, value) and `words` every (name suffix starting at a
+    word, value), both sorted, so completing "pot" finds "Health Potion" with two bisects and
+    a query costs O(log n + matches).
+
+    Misspellings go through a trigram index over the compact names, built on the first miss:
+    the names sharing the most trigrams with the query are ranked by similarity, so "pheonix
+    down" suggests "Phoenix Down" without comparing against every name.
+    """
+    def __init__(self, entries=()):
+        self.names = []  # [(normalized name, value)] sorted
+        self.words = []  # [(suffix, value)] sorted
+        self.exact = {}  # {compact name: value}
+        self.grams = None  # {trigram: {compact name}}, built on the first fuzzy lookup
+        for entry in entries:
+            name, value = entry if isinstance(entry, tuple) else (entry, entry)
+            self._insert(name, value, self.names.append, self.words.append)
+        self.names.sort()
+        self.words.sort()
+
+    def _insert(self, name, value, add_name, add_word):
+        norm = normalize_name(name)
+        if not norm:
+            return
+        add_name((norm, value))
+        self.exact.setdefault(norm.replace(" ", ""), value)
+        start = norm.find(" ")
+        while start != -1:
+            add_word((norm[start + 1:], value))
+            start = norm.find(" ", start + 1)
+
+    def __len__(self):
+        return len(self.exact)
+
+    def add(self, name, value=None):
+        """Index one more name (e.g. a new shop item) without rebuilding."""
+        value = name if value is None else value
+        self._insert(name, value, lambda entry: insort(self.names, entry), lambda entry: insort(self.words, entry))
+        self.grams = None
+
+    def discard(self, value):
+        """Drop every name of `value`."""
+        self.names = [entry for entry in self.names if entry[1] != value]
+        self.words = [entry for entry in self.words if entry[1] != value]
+        self.exact = {key: found for key, found in self.exact.items() if found != value}
+        # A name shared with another value points at that one now
+        for norm, found in self.names:
+            self.exact.setdefault(norm.replace(" ", ""), found)
+        self.grams = None
+
+    def get(self, text):
+        """The value whose name matches `text` ignoring case, accents and spaces, or None."""
+        return self.exact.get(compact_name(text or ""))
+
+    def suggest(self, text, limit=3):
+        """Values whose names are close to a misspelled `text`, best first."""
+        key = compact_name(text or "")
+        if not key:
+            return []
+        if self.grams is None:
+            grams = {}
+            for name in self.exact:
+                for gram in trigrams(name):
+                    grams.setdefault(gram, set()).add(name)
+            self.grams = grams
+        shared = {}
+        for gram in trigrams(key):
+            for name in self.grams.get(gram, ()):
+                shared[name] = shared.get(name, 0) + 1
+        candidates = heapq.nlargest(FUZZY_CANDIDATES, shared, key=shared.get)
+        scored = sorted(
+            ((difflib.SequenceMatcher(None, key, name).ratio(), name) for name in candidates),
+            key=lambda item: -item[0]
+        )
+        values = [self.exact[name] for ratio, name in scored if ratio >= FUZZY_CUTOFF]
+        return list(dict.fromkeys(values))[:limit]
+
+    def resolve(self, text):
+        """(value, None) on an exact match, otherwise (None, closest value or None) for a "did you mean"."""
+        value = self.get(text)
+        if value is not None:
+            return value, None
+        suggestions = self.suggest(text, limit=1)
+        return None, suggestions[0] if suggestions else None
+
+    @staticmethod
+    def _prefixed(entries, prefix, limit):
+        found = []
+        for index in range(bisect_left(entries, (prefix,)), len(entries)):
+            key, value = entries[index]
+            if not key.startswith(prefix) or (limit is not None and len(found) >= limit):
+                break
+            found.append(value)
+        return found
+
+    def complete(self, text, limit=25):
+        """
+        Values whose name starts with `text`, then those with a later word starting with it;
+        an empty `text` lists the first names alphabetically. `limit=None` returns every match.
+        """
+        norm = normalize_name(text or "")
+        values = self._prefixed(self.names, norm, limit)
+        if norm and (limit is None or len(values) < limit):
+            values += self._prefixed(self.words, norm, None if limit is None else limit * 2)
+        values = list(dict.fromkeys(values))
+        return values if limit is None else values[:limit]
+
+
+class Inventory:
+    """One player's inventory string with its item counts and a NameIndex over the distinct items."""
+    __slots__ = ("text", "counts", "index", "expires")
+
+    def __init__(self, text, expires):
+        self.text = text
+        self.counts = {}
+        for item in text.split(",") if text else []:
+            self.counts[item] = self.counts.get(item, 0) + 1
+        self.index = NameIndex(self.counts)
+        self.expires = expires
+
+
+class InventoryCache:
+    """
+    Recently seen inventories, so autocomplete does not read eco_players on every keystroke.
+    Every inventory write in this process calls `invalidate`; the TTL covers writes made by
+    other processes. Least recently used players are dropped past `size` entries.
+    """
+    def __init__(self, ttl=INVENTORY_TTL, size=INVENTORY_CACHE_SIZE):
+        self.ttl = ttl
+        self.size = size
+        self.entries = OrderedDict()  # {user_id: Inventory}
+
+    def store(self, user_id, text):
+        """Cache a freshly read inventory string; an unchanged one keeps its built index."""
+        text = text or ""
+        now = time.time()
+        inventory = self.entries.get(user_id)
+        if inventory is not None and inventory.text == text:
+            inventory.expires = now + self.ttl
+        else:
+            inventory = Inventory(text, now + self.ttl)
+            self.entries[user_id] = inventory
+        self.entries.move_to_end(user_id)
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+        return inventory
+
+    def get(self, user_id, load):
+        """The cached Inventory, or `load(user_id)` (returning the inventory string) on a miss."""
+        inventory = self.entries.get(user_id)
+        if inventory is not None and inventory.expires > time.time():
+            self.entries.move_to_end(user_id)
+            return inventory
+        return self.store(user_id, load(user_id))
+
+    def invalidate(self, user_id):
+        self.entries.pop(user_id, None)
+
+
+INVENTORIES = InventoryCache()
@@ -0,0 +1,159 @@
+"""
+Query-plan regression check for the hot SQL statements used by the cogs.
+
+Builds a throwaway database from the migrations, fills it with realistic row counts,
+runs EXPLAIN QUERY PLAN for every registered query and reports any full table scan
+or temp B-tree sort. The queries are imported from the cogs, so run it where the bot's
+dependencies are installed, after touching a query or an index:
+
+    python -m assets.utils.queryplans
+"""
+import sqlite3
+import os
+import sys
+import random
+import tempfile
+from assets.utils.migrations import run_migrations
+from assets.utils import raidstate, battlestate, gamestate
+from assets.cogs import configcog, modcog, ecocog, rpgcog
+
+# (name, sql, params, ordered) - `ordered` queries may walk an index in order (ORDER BY ... LIMIT).
+# The statements are the modules' own constants, so a changed query is checked as it actually runs.
+HOT_QUERIES = [
+    ("prefix lookup", configcog.GET_PREFIX_SQL, ("1",), False),
+    ("welcome lookup", configcog.GET_WELCOME_SQL, ("1",), False),
+    ("log channel lookup", configcog.GET_LOG_CHANNEL_SQL, ("1",), False),
+    ("announcement channel lookup", configcog.GET_ANNOUNCEMENT_CHANNEL_SQL, ("1",), False),
+    ("mute role lookup", configcog.GET_MUTE_ROLE_SQL, ("1",), False),
+    ("modmail channel lookup", configcog.GET_MODMAIL_CHANNEL_SQL, ("1",), False),
+    ("unban", modcog.REMOVE_BAN_SQL, ("1", "1"), False),
+    ("get_player", ecocog.GET_PLAYER_SQL, ("1",), False),
+    *(
+        (f"update {column}", sql, (1, "1"), False)
+        for column, sql in ecocog.UPDATE_PLAYER_SQL.items()
+    ),
+    ("get_luck_expiry", ecocog.GET_LUCK_EXPIRY_SQL, ("1",), False),
+    ("get_cooldown", ecocog.GET_COOLDOWN_SQL, ("1", "daily"), False),
+    ("get_shop_items", ecocog.GET_SHOP_ITEMS_SQL, ("1",), False),
+    ("get_shop_item", ecocog.GET_SHOP_ITEM_SQL, ("1", "Item 1"), False),
+    ("get_shop_item_by_command", ecocog.GET_SHOP_ITEM_BY_COMMAND_SQL, ("1", "item1"), False),
+    ("get_shop_item_any", ecocog.GET_SHOP_ITEM_ANY_SQL, ("Item 1",), False),
+    ("update_shop_price", ecocog.UPDATE_SHOP_PRICE_SQL, (1, "1", "item1"), False),
+    ("remove_shop_item", ecocog.REMOVE_SHOP_ITEM_SQL, ("1", "item1"), False),
+    ("get_all_collectibles", ecocog.GET_COLLECTIBLES_SQL, ("1",), False),
+    ("get_richest_players", ecocog.GET_RICHEST_PLAYERS_SQL, (100, 200), True),
+    ("get_richest_among", ecocog.players_among_sql(3), ("1", "2", "3"), False),
+    ("rpg wallet", rpgcog.GET_WALLET_SQL, ("1",), False),
+    ("add_item_to_inventories", rpgcog.many_inventories_sql(3), ("1", "2", "3"), False),
+    ("get_rpg_stats", rpgcog.GET_RPG_STATS_SQL, ("1",), False),
+    ("get_many_rpg_stats", rpgcog.many_rpg_stats_sql(3), ("1", "2", "3"), False),
+    (
+        "update_rpg_stats",
+        rpgcog.update_rpg_stats_sql(rpgcog.RPG_STAT_COLUMNS),
+        (0,) * len(rpgcog.RPG_STAT_COLUMNS) + ("1",),
+        False
+    ),
+    ("rpg_stats exists", rpgcog.RPG_STATS_EXISTS_SQL, ("1",), False),
+    ("delete rpg_stats", rpgcog.DELETE_RPG_STATS_SQL, ("1",), False),
+    ("get equipped spells", rpgcog.GET_EQUIPPED_SPELLS_SQL, ("1",), False),
+    ("set equipped spells", rpgcog.SET_EQUIPPED_SPELLS_SQL, ("", "1"), False),
+    ("load_raid_state", raidstate.LOAD_RAID_STATE_SQL, ("1",), False),
+    ("save_raid_progress", raidstate.SAVE_RAID_PROGRESS_SQL, (1, "[]", "1"), False),
+    ("clear_raid_state", raidstate.CLEAR_RAID_STATE_SQL, ("1",), False),
+    ("battle snapshot", battlestate.LOAD_SNAPSHOT_SQL, ("all",), False),
+    ("battle journal replay", battlestate.REPLAY_JOURNAL_SQL, ("all", 0), False),
+    ("battle journal end", battlestate.JOURNAL_END_SQL, ("all",), False),
+    ("battle journal truncate", battlestate.TRUNCATE_JOURNAL_SQL, ("all", 0), False),
+    ("tabletop snapshot load", gamestate.LOAD_SNAPSHOTS_SQL, ("all", "mtg"), False),
+    ("tabletop journal replay", gamestate.LOAD_JOURNAL_SQL, ("all", "mtg"), False),
+    ("tabletop journal append", gamestate.APPEND_LIFE_SQL, ("all", "mtg", 1, 1, 1, "life", 20, 0.0), False),
+    ("tabletop journal compaction", gamestate.COMPACT_JOURNAL_SQL, ("all", "mtg", 1, 1, 0), False),
+    ("tabletop game ids load", gamestate.LOAD_GAME_IDS_SQL, ("all", "mtg"), False),
+    *(
+        (f"tabletop remove from {table}", sql, ("all", "mtg", 1, 1), False)
+        for table, sql in gamestate.REMOVE_GAME_SQL.items()
+    ),
+]
+
+ROW_COUNTS = {
+    "guilds": 500, "players": 20000, "shop_items_per_guild": 40, "bans": 5000, "cooldowns": 40000,
+    "tabletop_games": 2000, "life_changes": 20000
+}
+
+
+def populate(cursor, counts=ROW_COUNTS):
+    """Fill a fresh database with enough rows for the planner to behave like production."""
+    rng = random.Random(0)
+    guilds = [str(g) for g in range(counts["guilds"])]
+    players = [str(p) for p in range(counts["players"])]
+    cursor.executemany("INSERT INTO prefixes (guild_id, prefix) VALUES (?, 't!')", [(g,) for g in guilds])
+    cursor.executemany("INSERT INTO welcome (guild_id, channel) VALUES (?, '1')", [(g,) for g in guilds])
+    cursor.executemany(
+        "INSERT INTO eco_players (user_id, coins, bank, inventory) VALUES (?, ?, ?, '')",
+        [(p, rng.randint(0, 100000), rng.randint(0, 100000)) for p in players]
+    )
+    cursor.executemany(
+        "INSERT INTO eco_shop (guild_id, item_name, command_name, price, description, effect) VALUES (?, ?, ?, 100, '', ?)",
+        [
+            (g, f"Item {i}", f"item{i}", "collectible:rare" if i % 5 == 0 else None)
+            for g in guilds for i in range(counts["shop_items_per_guild"])
+        ]
+    )
+    cursor.executemany(
+        "INSERT OR IGNORE INTO eco_cooldowns (user_id, command, last_used) VALUES (?, ?, '')",
+        [(rng.choice(players), rng.choice(["daily", "work", "steal", "rpgraid_1"])) for _ in range(counts["cooldowns"])]
+    )
+    cursor.executemany(
+        "INSERT INTO bans (guild_id, user_id, user_tag) VALUES (?, ?, '')",
+        [(rng.choice(guilds), rng.choice(players)) for _ in range(counts["bans"])]
+    )
+    cursor.executemany("INSERT INTO rpg_stats (user_id) VALUES (?)", [(p,) for p in players[: len(players) // 4]])
+    games = [
+        (rng.choice(["mtg", "ygo"]), rng.randrange(counts["guilds"]), game_id)
+        for game_id in range(counts["tabletop_games"])
+    ]
+    cursor.executemany(
+        "INSERT INTO tabletop_game_snapshot (kind, guild_id, game_id, seq, data) VALUES (?, ?, ?, 0, '{}')", games
+    )
+    cursor.executemany(
+        "INSERT INTO tabletop_life_journal (kind, guild_id, game_id, user_id, field, value, changed_at) VALUES (?, ?, ?, ?, 'life', ?, 0)",
+        [(*rng.choice(games), rng.randrange(counts["players"]), rng.randint(0, 40)) for _ in range(counts["life_changes"])]
+    )
+    cursor.execute("ANALYZE")
+
+def plan_problems(plan_rows, ordered=False):
+    """Return the EXPLAIN QUERY PLAN details that indicate a full scan or a temp B-tree."""
+    problems = []
+    for row in plan_rows:
+        detail = row[-1]
+        if "USE TEMP B-TREE" in detail:
+            problems.append(detail)
+        elif detail.startswith("SCAN ") and not (ordered and "USING" in detail and "INDEX" in detail):
+            problems.append(detail)
+    return problems
+
+def check_query_plans(queries=HOT_QUERIES, counts=ROW_COUNTS):
+    """Return {query name: [problem details]} for every registered query whose plan regressed."""
+    failures = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "plans.db")
+        run_migrations(db_path)
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+        populate(cursor, counts)
+        conn.commit()
+        for name, sql, params, ordered in queries:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            problems = plan_problems(cursor.fetchall(), ordered)
+            if problems:
+                failures[name] = problems
+        conn.close()
+    return failures
+
+
+if __name__ == "__main__":
+    failures = check_query_plans()
+    for name, problems in failures.items():
+        print(f"FAIL {name}: {'; '.join(problems)}")
+    print(f"{len(HOT_QUERIES) - len(failures)}/{len(HOT_QUERIES)} hot queries use an index.")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,200 @@
+import sqlite3
+import os
+import json
+import asyncio
+import datetime
+
+DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "data.db")
+
+RAID_CHECKPOINT_INTERVAL = 60  # seconds between background checkpoints
+
+# Boss fields that change during a fight; everything else is the static template
+MUTABLE_BOSS_FIELDS = ("hp", "debuffs", "stunned", "taunted", "regen_remainder")
+
+LOAD_RAID_STATE_SQL = "SELECT boss_name, boss_hp, boss_max_hp, boss_data, participants, last_spawn FROM rpg_raid_state WHERE guild_id = ?"
+SAVE_RAID_PROGRESS_SQL = "UPDATE rpg_raid_state SET boss_hp = ?, participants = ? WHERE guild_id = ?"
+CLEAR_RAID_STATE_SQL = "DELETE FROM rpg_raid_state WHERE guild_id = ?"
+
+
+def load_raid_state(guild_id):
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute(LOAD_RAID_STATE_SQL, (str(guild_id),))
+    row = cursor.fetchone()
+    conn.close()
+    if not row:
+        return None
+    boss_name, boss_hp, boss_max_hp, boss_data, participants, last_spawn = row
+    return {
+        "boss_name": boss_name,
+        "boss_hp": boss_hp,
+        "boss_max_hp": boss_max_hp,
+        "boss_data": json.loads(boss_data),
+        "participants": set(json.loads(participants)),
+        "last_spawn": datetime.datetime.fromisoformat(last_spawn) if last_spawn else None
+    }
+
+def save_raid_state(guild_id, state):
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute(
+        """INSERT OR REPLACE INTO rpg_raid_state
+        (guild_id, boss_name, boss_hp, boss_max_hp, boss_data, participants, last_spawn)
+        VALUES (?, ?, ?, ?, ?, ?, ?)""",
+        (
+            str(guild_id),
+            state["boss_name"],
+            state["boss_hp"],
+            state["boss_max_hp"],
+            json.dumps(state["boss_data"]),
+            json.dumps(list(state["participants"])),
+            state["last_spawn"].isoformat() if state["last_spawn"] else None
+        )
+    )
+    conn.commit()
+    conn.close()
+
+def save_raid_progress(rows):
+    """Write only the mutable HP/participant columns for many raids in one transaction."""
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    cursor.executemany(
+        SAVE_RAID_PROGRESS_SQL,
+        [(hp, json.dumps(participants), str(guild_id)) for guild_id, hp, participants in rows]
+    )
+    conn.commit()
+    conn.close()
+
+def clear_raid_state(guild_id):
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute(CLEAR_RAID_STATE_SQL, (str(guild_id),))
+    conn.commit()
+    conn.close()
+
+
+class RaidState:
+    """
+    The single live copy of a guild's raid.
+    `template` is the static (party-scaled) boss definition and is only written once,
+    `boss` is the dict the combat code mutates, and `participants` shrinks as players fall.
+    """
+    def __init__(self, guild_id, template, hp, participants, last_spawn):
+        self.guild_id = guild_id
+        self.template = {k: v for k, v in template.items() if k not in MUTABLE_BOSS_FIELDS}
+        self.boss = dict(self.template)
+        self.boss["hp"] = hp
+        self.boss["regen_remainder"] = 0.0
+        self.participants = set(participants)
+        self.last_spawn = last_spawn
+
+    @property
+    def hp(self):
+        return self.boss["hp"]
+
+    @property
+    def max_hp(self):
+        return self.template["max_hp"]
+
+    def to_row(self):
+        return {
+            "boss_name": self.template["name"],
+            "boss_hp": self.hp,
+            "boss_max_hp": self.max_hp,
+            "boss_data": self.template,
+            "participants": self.participants,
+            "last_spawn": self.last_spawn
+        }
+
+    @classmethod
+    def from_row(cls, guild_id, row):
+        template = dict(row["boss_data"])
+        template.setdefault("max_hp", row["boss_max_hp"])
+        return cls(guild_id, template, row["boss_hp"], row["participants"], row["last_spawn"])
+
+
+class RaidStateManager:
+    """
+    Keeps one authoritative RaidState per guild in memory.
+    Attacks only mark a raid dirty; dirty raids are checkpointed by a background
+    task, and immediately on boss defeat (via clear) or shutdown (via stop).
+    """
+    def __init__(self, interval=RAID_CHECKPOINT_INTERVAL):
+        self.interval = interval
+        self.states = {}  # {guild_id: RaidState or None (known to have no raid)}
+        self.dirty = set()
+        self._task = None
+
+    def get(self, guild_id):
+        if guild_id not in self.states:
+            row = load_raid_state(guild_id)
+            self.states[guild_id] = RaidState.from_row(guild_id, row) if row else None
+        return self.states[guild_id]
+
+    def create(self, guild_id, boss, participants, last_spawn):
+        state = RaidState(guild_id, boss, boss["hp"], participants, last_spawn)
+        self.states[guild_id] = state
+        self.dirty.discard(guild_id)
+        # New template: write the full row once
+        save_raid_state(guild_id, state.to_row())
+        return state
+
+    def mark_dirty(self, guild_id):
+        if self.states.get(guild_id) is not None:
+            self.dirty.add(guild_id)
+
+    def remove_participant(self, guild_id, user_id):
+        state = self.get(guild_id)
+        if state and user_id in state.participants:
+            state.participants.discard(user_id)
+            self.dirty.add(guild_id)
+
+    def clear(self, guild_id):
+        self.states[guild_id] = None
+        self.dirty.discard(guild_id)
+        clear_raid_state(guild_id)
+
+    def _collect_dirty(self):
+        # Snapshot on the event loop so the writer thread never sees a set mid-mutation
+        rows = []
+        for guild_id in self.dirty:
+            state = self.states.get(guild_id)
+            if state is not None:
+                rows.append((guild_id, state.hp, list(state.participants)))
+        self.dirty.clear()
+        return rows
+
+    def flush(self):
+        rows = self._collect_dirty()
+        if rows:
+            save_raid_progress(rows)
+        return len(rows)
+
+    async def checkpoint(self):
+        rows = self._collect_dirty()
+        if not rows:
+            return
+        try:
+            await asyncio.to_thread(save_raid_progress, rows)
+        except Exception:
+            # Retry these raids on the next checkpoint
+            self.dirty.update(guild_id for guild_id, _, _ in rows)
+            raise
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.checkpoint()
+            except Exception as e:
+                print(f"Failed to checkpoint raid state: {e}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self.flush()
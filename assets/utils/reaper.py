@@ -0,0 +1,104 @@
+import time
+import heapq
+import asyncio
+
+REAP_INTERVAL = 30  # seconds between checks of the earliest deadlines
+
+
+class IdleReaper:
+    """
+    Expires keys nobody has touched within their TTL, without scanning every tracked key.
+    Deadlines sit in a min-heap; touching a key only moves its deadline in a dict, and a
+    popped heap entry whose key was touched since is pushed back with the newer deadline.
+    A check therefore costs O((expired + rescheduled) log n).
+
+    Owners either call `due()` from their own loop or `start(on_expire)` for a background task
+    that awaits `on_expire(key)` once per expired key. `on_expire` may return a number of
+    seconds to keep the key alive instead (e.g. while it is locked).
+    """
+    def __init__(self, name, interval=REAP_INTERVAL):
+        self.name = name
+        self.interval = interval
+        self.deadlines = {}  # {key: deadline}
+        self.scheduled = {}  # {key: deadline of its live heap entry}
+        self.heap = []  # [(deadline, seq, key)]
+        self.seq = 0  # tie-breaker so keys never need to be comparable
+        self.expired = 0
+        self.deferred = 0
+        self.last_run = None
+        self._task = None
+
+    def __len__(self):
+        return len(self.deadlines)
+
+    def __contains__(self, key):
+        return key in self.deadlines
+
+    def _push(self, key, deadline):
+        self.seq += 1
+        heapq.heappush(self.heap, (deadline, self.seq, key))
+        self.scheduled[key] = deadline
+
+    def touch(self, key, ttl, now=None):
+        """Mark `key` active; it expires `ttl` seconds from now unless touched again."""
+        deadline = (now or time.time()) + ttl
+        self.deadlines[key] = deadline
+        # Only an earlier deadline needs a new heap entry; later ones are picked up when the old entry pops
+        if key not in self.scheduled or deadline < self.scheduled[key]:
+            self._push(key, deadline)
+
+    def forget(self, key):
+        self.deadlines.pop(key, None)
+        self.scheduled.pop(key, None)
+
+    def due(self, now=None):
+        """Pop and return every key whose deadline has passed."""
+        now = now or time.time()
+        expired = []
+        while self.heap and self.heap[0][0] <= now:
+            deadline, _, key = heapq.heappop(self.heap)
+            if self.scheduled.get(key) != deadline:
+                continue  # Forgotten, or superseded by an earlier entry
+            del self.scheduled[key]
+            current = self.deadlines[key]
+            if current > now:
+                self._push(key, current)
+            else:
+                del self.deadlines[key]
+                expired.append(key)
+        self.expired += len(expired)
+        self.last_run = now
+        return expired
+
+    def defer(self, key, delay, now=None):
+        """Put an expired key back for another `delay` seconds (counted as deferred, not expired)."""
+        self.expired -= 1
+        self.deferred += 1
+        self.touch(key, delay, now)
+
+    def stats(self):
+        return {
+            "tracked": len(self.deadlines), "heap": len(self.heap), "expired": self.expired,
+            "deferred": self.deferred, "last_run": self.last_run,
+            "next_deadline": self.heap[0][0] if self.heap else None
+        }
+
+    async def _run(self, on_expire):
+        while True:
+            await asyncio.sleep(self.interval)
+            for key in self.due():
+                try:
+                    delay = await on_expire(key)
+                    if delay:
+                        self.defer(key, delay)
+                except Exception as e:
+                    print(f"Failed to expire {self.name} {key}: {e}")
+
+    def start(self, on_expire):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(on_expire))
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
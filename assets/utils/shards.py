@@ -0,0 +1,122 @@
+import os
+import time
+from collections import deque
+
+EVENT_RATE_WINDOW = 60  # seconds of events kept for the per-shard rate
+
+
+def parse_shard_ids(text):
+    """Parse "0-3", "4,5,7" or "0-1,4" into a sorted list of shard ids."""
+    ids = set()
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            low, high = part.split("-", 1)
+            ids.update(range(int(low), int(high) + 1))
+        else:
+            ids.add(int(part))
+    return sorted(ids)
+
+def shard_config_from_env():
+    """
+    Read SHARD_COUNT and SHARD_IDS from the environment.
+    Returns (shard_count, shard_ids); both None lets discord.py pick the recommended count
+    and run every shard in this process.
+    """
+    count = os.getenv("SHARD_COUNT")
+    ids = os.getenv("SHARD_IDS")
+    shard_count = int(count) if count else None
+    shard_ids = parse_shard_ids(ids) if ids else None
+    if shard_ids is not None:
+        if shard_count is None:
+            raise ValueError("SHARD_IDS requires SHARD_COUNT")
+        if shard_ids[-1] >= shard_count:
+            raise ValueError(f"SHARD_IDS {ids} out of range for SHARD_COUNT {shard_count}")
+    return shard_count, shard_ids
+
+def shard_label(shard_count=None, shard_ids=None):
+    """Stable name for the shard range this process owns, used to scope per-process persisted state."""
+    if shard_ids is None:
+        return "all"
+    return f"{','.join(str(i) for i in shard_ids)}/{shard_count}"
+
+
+class ShardMetrics:
+    """
+    Per-shard gateway counters: connects, disconnects, resumes, readiness and a sliding
+    one-minute event rate for the events the cogs handle (messages, interactions, member joins).
+    Latency and guild counts are read live from the bot when a report is built.
+    """
+    def __init__(self, window=EVENT_RATE_WINDOW):
+        self.window = window
+        self.shards = {}  # {shard_id: {"connects", "disconnects", "resumes", "ready_at", "events": deque}}
+
+    def _shard(self, shard_id):
+        shard = self.shards.get(shard_id)
+        if shard is None:
+            shard = self.shards[shard_id] = {
+                "connects": 0, "disconnects": 0, "resumes": 0, "ready_at": None, "events": deque(), "total": 0
+            }
+        return shard
+
+    def record_event(self, shard_id):
+        if shard_id is None:
+            return
+        shard = self._shard(shard_id)
+        now = time.monotonic()
+        events = shard["events"]
+        events.append(now)
+        shard["total"] += 1
+        while events and events[0] < now - self.window:
+            events.popleft()
+
+    def attach(self, bot):
+        """Register the gateway and event listeners on `bot`."""
+        async def on_shard_connect(shard_id):
+            self._shard(shard_id)["connects"] += 1
+
+        async def on_shard_disconnect(shard_id):
+            self._shard(shard_id)["disconnects"] += 1
+
+        async def on_shard_resumed(shard_id):
+            self._shard(shard_id)["resumes"] += 1
+
+        async def on_shard_ready(shard_id):
+            self._shard(shard_id)["ready_at"] = time.time()
+
+        async def on_message(message):
+            self.record_event(message.guild.shard_id if message.guild else 0)
+
+        async def on_interaction(interaction):
+            self.record_event(interaction.guild.shard_id if interaction.guild else 0)
+
+        async def on_member_join(member):
+            self.record_event(member.guild.shard_id)
+
+        for listener in (on_shard_connect, on_shard_disconnect, on_shard_resumed, on_shard_ready,
+                         on_message, on_interaction, on_member_join):
+            bot.add_listener(listener)
+
+    def report(self, bot):
+        """Return [(shard_id, stats)] for every shard this process runs."""
+        now = time.monotonic()
+        guild_counts = {}
+        for guild in bot.guilds:
+            guild_counts[guild.shard_id] = guild_counts.get(guild.shard_id, 0) + 1
+        rows = []
+        for shard_id, latency in sorted(bot.latencies):
+            shard = self._shard(shard_id)
+            recent = sum(1 for t in shard["events"] if t >= now - self.window)
+            rows.append((shard_id, {
+                "latency_ms": latency * 1000 if latency == latency else None,  # NaN until the first heartbeat
+                "guilds": guild_counts.get(shard_id, 0),
+                "events_per_min": recent * 60 / self.window,
+                "events_total": shard["total"],
+                "connects": shard["connects"],
+                "disconnects": shard["disconnects"],
+                "resumes": shard["resumes"],
+                "ready_at": shard["ready_at"]
+            }))
+        return rows
@@ -0,0 +1,173 @@
+"""
+Offline Yu-Gi-Oh! card database built from a YGOPRODeck card dump
+(the {"data": [...]} JSON returned by https://db.ygoprodeck.com/api/v7/cardinfo.php).
+
+Import or refresh it with:
+
+    python -m assets.utils.ygocards path/to/cardinfo.json
+
+The import builds a new file and swaps it in; the name index notices the new file on its
+next lookup, reload the YGO cog to also drop its cached card embeds.
+"""
+import os
+import sys
+import time
+import sqlite3
+from assets.utils.helpers import normalize_name
+from assets.utils.nameindex import NameIndex
+from assets.utils.jsonstream import iter_json_array
+
+CARD_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "ygocards.db")
+
+IMPORT_BATCH_SIZE = 5000  # rows per executemany during an import
+
+CARD_COLUMNS = (
+    "id", "name", "name_norm", "type", "frame_type", "description", "atk", "def", "level", "race",
+    "attribute", "archetype", "link_val", "scale", "image_url", "sets"
+)
+
+
+def card_row(card):
+    """Flatten a YGOPRODeck card object into a CARD_COLUMNS tuple."""
+    images = card.get("card_images") or [{}]
+    sets = card.get("card_sets") or []
+    return (
+        card["id"],
+        card["name"],
+        normalize_name(card["name"]),
+        card.get("type"),
+        card.get("frameType"),
+        card.get("desc"),
+        card.get("atk"),
+        card.get("def"),
+        card.get("level"),
+        card.get("race"),
+        card.get("attribute"),
+        card.get("archetype"),
+        card.get("linkval"),
+        card.get("scale"),
+        images[0].get("image_url_small") or images[0].get("image_url"),
+        len(sets)
+    )
+
+def import_cards(source, db_path=None, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Stream a YGOPRODeck dump into a fresh database, then swap it in place of the old one.
+    Returns (cards stored, seconds).
+    """
+    db_path = db_path or CARD_DB_PATH
+    start = time.perf_counter()
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    building = db_path + ".building"
+    if os.path.exists(building):
+        os.remove(building)
+    conn = sqlite3.connect(building)
+    cursor = conn.cursor()
+    # Nothing to protect in a file that is discarded if the import fails
+    cursor.execute("PRAGMA journal_mode = OFF")
+    cursor.execute("PRAGMA synchronous = OFF")
+    cursor.execute(f"""
+    CREATE TABLE cards (
+        id INTEGER PRIMARY KEY,
+        {", ".join(f"{column} {'INTEGER' if column in ('atk', 'def', 'level', 'link_val', 'scale', 'sets') else 'TEXT'}" for column in CARD_COLUMNS[1:])}
+    )
+    """)
+    insert = f"INSERT OR REPLACE INTO cards ({', '.join(CARD_COLUMNS)}) VALUES ({', '.join('?' for _ in CARD_COLUMNS)})"
+    batch = []
+    for card in iter_json_array(source, key="data"):
+        batch.append(card_row(card))
+        if len(batch) >= batch_size:
+            cursor.executemany(insert, batch)
+            batch = []
+    cursor.executemany(insert, batch)
+    cursor.execute("CREATE INDEX idx_cards_name_norm ON cards (name_norm)")
+    cursor.execute("SELECT COUNT(*) FROM cards")
+    cards = cursor.fetchone()[0]
+    conn.commit()
+    conn.close()
+    os.replace(building, db_path)
+    return cards, time.perf_counter() - start
+
+
+def card_db_available(db_path=None):
+    return os.path.exists(db_path or CARD_DB_PATH)
+
+def get_card(card_id, db_path=None):
+    """Return the card as a dict of CARD_COLUMNS, or None."""
+    conn = sqlite3.connect(f"file:{db_path or CARD_DB_PATH}?mode=ro", uri=True)
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT {', '.join(CARD_COLUMNS)} FROM cards WHERE id = ?", (card_id,))
+    row = cursor.fetchone()
+    conn.close()
+    return dict(zip(CARD_COLUMNS, row)) if row else None
+
+
+class CardNameIndex:
+    """
+    In-memory NameIndex of every card name for autocomplete and lookups, loaded from the
+    database on first use and rebuilt when the database file is replaced.
+    "magician" completes to "Dark Magician" and a query costs O(log n + matches); the whole
+    index is a few MB for every printed card.
+    """
+    def __init__(self, db_path=None):
+        self.db_path = db_path or CARD_DB_PATH
+        self.loaded_mtime = None
+        self.index = NameIndex()  # card name -> id
+        self.display = {}  # {id: name}
+
+    def _ensure_loaded(self):
+        try:
+            mtime = os.path.getmtime(self.db_path)
+        except OSError:
+            return False
+        if mtime != self.loaded_mtime:
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+            cursor = conn.cursor()
+            cursor.execute("SELECT id, name FROM cards")
+            rows = cursor.fetchall()
+            conn.close()
+            self.index = NameIndex((name, card_id) for card_id, name in rows)
+            self.display = dict(rows)
+            self.loaded_mtime = mtime
+        return True
+
+    def complete(self, text, limit=25):
+        """Card ids whose name starts with `text`, then those with a later word starting with it."""
+        if not normalize_name(text) or not self._ensure_loaded():
+            return []
+        return self.index.complete(text, limit)
+
+    def complete_names(self, text, limit=25):
+        return [self.display[card_id] for card_id in self.complete(text, limit)]
+
+    def search(self, text, limit=5):
+        """
+        Return up to `limit` (id, name, match) tuples, best first; `match` is "exact", "prefix"
+        or "fuzzy" (close spellings, only when nothing else matched).
+        """
+        if not normalize_name(text) or not self._ensure_loaded():
+            return []
+        results = []
+        card_id = self.index.get(text)
+        if card_id is not None:
+            results.append((card_id, "exact"))
+        results += [(card_id, "prefix") for card_id in self.index.complete(text, limit)]
+        if not results:
+            results = [(card_id, "fuzzy") for card_id in self.index.suggest(text, limit)]
+        seen, unique = set(), []
+        for card_id, match in results:
+            if card_id not in seen:
+                seen.add(card_id)
+                unique.append((card_id, self.display[card_id], match))
+        return unique[:limit]
+
+
+CARD_NAMES = CardNameIndex()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("usage: python -m assets.utils.ygocards path/to/cardinfo.json")
+        sys.exit(2)
+    cards, seconds = import_cards(sys.argv[1])
+    print(f"Imported {cards} cards into {CARD_DB_PATH} in {seconds:.1f} s")
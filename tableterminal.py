@@ -4,7 +4,13 @@ import os
 from dotenv import load_dotenv, find_dotenv
 import sqlite3
 import asyncio
+import time
 from pathlib import Path
+from assets.utils.migrations import run_migrations
+from assets.utils.commandsync import sync_commands
+from assets.utils.shards import shard_config_from_env, shard_label, ShardMetrics
+from assets.utils.gateway import lean_mode_enabled, bot_options
+from assets.cogs.configcog import GET_PREFIX_SQL, GET_WELCOME_SQL
 
 DB_PATH = os.path.join(os.path.dirname(__file__), "data", "data.db")
 
@@ -16,17 +22,25 @@ load_dotenv(env_path)
 TOKEN = os.getenv("TOKEN")
 
 # Initialize the bot with a command prefix
-intents = discord.Intents.all()
+# LEAN_MODE=1 subscribes only to the intents the cogs use and skips caching every member
+LEAN_MODE = lean_mode_enabled()
 
 def get_prefix(bot, message):
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
-    cursor.execute("SELECT prefix FROM prefixes WHERE guild_id = ?", (str(message.guild.id),))
+    cursor.execute(GET_PREFIX_SQL, (str(message.guild.id),))
     result = cursor.fetchone()
     conn.close()
     return result[0] if result else "t!"
 
-bot = commands.Bot(command_prefix=get_prefix, intents=intents)
+# SHARD_COUNT / SHARD_IDS (e.g. "0-3") split one deployment's shards across processes
+SHARD_COUNT, SHARD_IDS = shard_config_from_env()
+bot = commands.AutoShardedBot(
+    command_prefix=get_prefix, shard_count=SHARD_COUNT, shard_ids=SHARD_IDS, **bot_options(LEAN_MODE)
+)
+bot.shard_label = shard_label(SHARD_COUNT, SHARD_IDS)
+bot.shard_metrics = ShardMetrics()
+bot.shard_metrics.attach(bot)
 
 # Remove the default help command to avoid conflicts
 bot.remove_command("help")
@@ -35,25 +49,44 @@ bot.remove_command("help")
 @bot.event
 async def on_ready():
     print(f"Logged in as {bot.user} (ID: {bot.user.id})")
+    print(f"Running shards {bot.shard_label} ({len(bot.guilds)} guilds, {'lean' if LEAN_MODE else 'full'} member cache)")
     print("------")
+    # on_ready fires again on every reconnect; only hit the sync endpoint when the tree changed
     try:
-        synced = await bot.tree.sync()
-        print(f"Synced {len(synced)} slash commands.")
+        synced, count, fingerprint = await sync_commands(bot)
+        if synced:
+            print(f"Synced {count} slash commands (tree {fingerprint[:12]}).")
+        else:
+            print(f"Slash commands unchanged (tree {fingerprint[:12]}), skipped sync.")
     except Exception as e:
         print(f"Failed to sync slash commands: {e}")
 
-# Dynamically load all cogs from the assets/cogs folder
+# Dynamically load all cogs from the assets/cogs folder (resolved from this file, not the working directory)
 COGS_FOLDER = "assets.cogs"
+COGS_PATH = Path(__file__).parent / "assets" / "cogs"
+
+async def load_cog(cog_name):
+    """Load one extension; returns (cog_name, seconds, error or None)."""
+    start = time.perf_counter()
+    try:
+        await bot.load_extension(f"{COGS_FOLDER}.{cog_name}")
+        error = None
+    except Exception as e:
+        error = e
+    return cog_name, time.perf_counter() - start, error
 
 async def load_cogs():
-    for filename in os.listdir("./assets/cogs"):
-        if filename.endswith(".py") and not filename.startswith("__"):
-            cog_name = filename[:-3]
-            try:
-                await bot.load_extension(f"{COGS_FOLDER}.{cog_name}")
-                print(f"Loaded cog: {cog_name}")
-            except Exception as e:
-                print(f"Failed to load cog {cog_name}: {e}")
+    # Cogs don't depend on each other, so their setup/cog_load coroutines run concurrently.
+    # Heavy RPG catalogues are parsed lazily (assets/utils/gamedata.py), not at import.
+    start = time.perf_counter()
+    cog_names = sorted(path.stem for path in COGS_PATH.glob("*.py") if not path.name.startswith("__"))
+    results = await asyncio.gather(*(load_cog(cog_name) for cog_name in cog_names))
+    for cog_name, seconds, error in sorted(results, key=lambda r: r[1], reverse=True):
+        if error is None:
+            print(f"Loaded cog: {cog_name} ({seconds * 1000:.1f} ms)")
+        else:
+            print(f"Failed to load cog {cog_name} after {seconds * 1000:.1f} ms: {error}")
+    print(f"Loaded {sum(1 for r in results if r[2] is None)}/{len(results)} cogs in {(time.perf_counter() - start) * 1000:.1f} ms")
 
 # Event: When the bot joins a new guild
 @bot.event
@@ -199,12 +232,12 @@ async def on_guild_remove(guild):
 async def on_member_join(member):
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
-    cursor.execute("SELECT channel, message, image_url, autorole FROM welcome WHERE guild_id = ?", (str(member.guild.id),))
+    cursor.execute(GET_WELCOME_SQL, (str(member.guild.id),))
     result = cursor.fetchone()
     conn.close()
 
     if result:
-        channel_id, welcome_message, image_url, autorole_id = result
+        channel_id, welcome_message, autorole_id, image_url = result
         # Replace placeholders
         welcome_message = welcome_message.replace("{user}", member.mention).replace("{server}", member.guild.name)
         try:
@@ -231,6 +264,8 @@ async def on_member_join(member):
 # Run the bot
 if __name__ == "__main__":
     async def main():
+        # Bring the database schema up to date before any cog touches it
+        await asyncio.to_thread(run_migrations, DB_PATH)
         await load_cogs()
         await bot.start(TOKEN)
     asyncio.run(main())
\ No newline at end of file